@@ -1,12 +1,12 @@
 # backend/app.py
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
 from flask_mail import Mail
 import os
+import sys
 import json
-import joblib
-import pandas as pd
+import time
 import numpy as np
 import logging
 import traceback
@@ -19,10 +19,39 @@ load_dotenv()
 # PATHS
 # --------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# backend/ must be importable when started as backend.app:app from the repo root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from config import Config
+from services.micro_batcher import MicroBatcher
+from services.forest_engine import FlatForest
+from services.machine_state import RollingWindowStore
+from services.model_registry import ModelBundle, ModelRegistry, file_version
+from services.mail_queue import MailQueue
+from services.result_cache import PredictionCache
+from services.history_store import HistoryStore, parse_time
+from services.fleet_rollup import FleetRollups, WINDOWS
+from services.drift_monitor import DriftMonitor
+from services.scoring_kernel import ScoringKernel
+from services.metrics import metrics, stage
+from services.request_profiler import SamplingProfiler
+from services.rate_limiter import AdmissionController, RouteLimit, make_backend
+from utils.jwt_utils import token_required, check_authorization
+from services.stream_ingest import (
+    iter_lines,
+    iter_ndjson_records,
+    iter_csv_records,
+    iter_chunks
+)
+
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 AUTH_HTML = os.path.join(STATIC_DIR, "auth.html")
 DASHBOARD_HTML = os.path.join(STATIC_DIR, "dashboard.html")
 MODEL_PATH = os.path.join(BASE_DIR, "models", "rf_zfail.joblib")
+# FlatForest arrays exported from MODEL_PATH (export_flat_model.py), mmap-able
+FLAT_MODEL_DIR = os.path.join(BASE_DIR, "models", "rf_zfail.flat")
+FLAT_MODEL_META = os.path.join(FLAT_MODEL_DIR, "meta.json")
 STATS_JSON = os.path.join(BASE_DIR, "stats_table.json")
 
 FEATURES = ["TP2", "TP3", "H1", "Oil_temperature", "DV_pressure"]
@@ -32,6 +61,9 @@ Z_THRESHOLD = 3.0
 ALPHA = 1.2
 Z0 = 1.5
 
+# Upper bound on readings accepted by one /predict/batch call
+MAX_BATCH_SIZE = 10000
+
 # --------------------------------------------------
 # APP SETUP
 # --------------------------------------------------
@@ -43,10 +75,10 @@ logging.basicConfig(level=logging.INFO)
 # MAIL SETUP
 # --------------------------------------------------
 app.config.update({
-    "MAIL_SERVER": "smtp.gmail.com",
-    "MAIL_PORT": 465,
-    "MAIL_USE_SSL": True,
-    "MAIL_USE_TLS": False,
+    "MAIL_SERVER": os.getenv("MAIL_SERVER", "smtp.gmail.com"),
+    "MAIL_PORT": int(os.getenv("MAIL_PORT", "465")),
+    "MAIL_USE_SSL": os.getenv("MAIL_USE_SSL", "True") == "True",
+    "MAIL_USE_TLS": os.getenv("MAIL_USE_TLS", "False") == "True",
     "MAIL_USERNAME": os.getenv("MAIL_USERNAME"),
     "MAIL_PASSWORD": os.getenv("MAIL_PASSWORD"),
     "MAIL_DEFAULT_SENDER": os.getenv(
@@ -58,6 +90,129 @@ app.config.update({
 mail = Mail(app)
 app.mail = mail
 
+# OTP mails go through a background queue unless MAIL_ASYNC=False
+app.mail_queue = None
+if Config.MAIL_ASYNC:
+    app.mail_queue = MailQueue(
+        app,
+        mail,
+        workers=Config.MAIL_WORKERS,
+        max_queue=Config.MAIL_QUEUE_SIZE,
+        batch_size=Config.MAIL_BATCH_SIZE,
+        max_retries=Config.MAIL_MAX_RETRIES,
+        backoff=Config.MAIL_RETRY_BACKOFF_S,
+        idle_close=Config.MAIL_IDLE_CLOSE_S,
+    )
+
+# --------------------------------------------------
+# REQUEST METRICS + SAMPLED PROFILING
+# --------------------------------------------------
+request_profiler = SamplingProfiler(Config.PROFILE_SAMPLE_PERCENT, Config.PROFILE_DIR)
+
+@app.before_request
+def _start_request_metrics():
+    metrics.start_flusher()
+    if fleet_rollups is not None:
+        fleet_rollups.start_flusher()
+    if drift_monitor is not None:
+        drift_monitor.start()
+    g.request_t0 = time.perf_counter()
+    g.profiler = request_profiler.maybe_start()
+
+@app.after_request
+def _record_request_metrics(response):
+    # streamed bodies are produced after this hook, so only their setup is timed
+    t0 = g.pop("request_t0", None)
+    if t0 is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe(
+            "pm_http_request_duration_seconds",
+            (("endpoint", endpoint), ("method", request.method), ("status", str(response.status_code))),
+            time.perf_counter() - t0,
+        )
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        request_profiler.stop(profiler, request.path)
+        metrics.inc("pm_profiles_captured_total", ())
+    return response
+
+# --------------------------------------------------
+# ADMISSION CONTROL (rate limits + concurrency caps)
+# --------------------------------------------------
+admission = None
+if Config.RATE_LIMIT_ENABLED:
+    admission = AdmissionController(
+        make_backend(Config.RATE_LIMIT_BACKEND, Config.RATE_LIMIT_MAX_KEYS, Config.RATE_LIMIT_DB_FILE),
+        [
+            RouteLimit("predict", Config.RATE_LIMIT_PREDICT_RPS, Config.RATE_LIMIT_PREDICT_BURST,
+                       Config.CONCURRENCY_PREDICT),
+            RouteLimit("auth", Config.RATE_LIMIT_AUTH_RPS, Config.RATE_LIMIT_AUTH_BURST,
+                       Config.CONCURRENCY_AUTH),
+            RouteLimit("api", Config.RATE_LIMIT_API_RPS, Config.RATE_LIMIT_API_BURST,
+                       Config.CONCURRENCY_API),
+        ],
+    )
+
+def route_class(path):
+    """Limit class of a request path; None for probes and pages, which are never limited."""
+    if path in ("/ready", "/metrics", "/", "/dashboard"):
+        return None
+    if path.startswith("/predict"):
+        return "predict"
+    if path.startswith("/auth/"):
+        return "auth"
+    return "api"
+
+def client_identity(cls, authorization, remote_addr, forwarded_for=None):
+    """(bucket identity, verified JWT claims or None) of the caller."""
+    # a made-up token must not buy a fresh bucket, so only verified ones count;
+    # /auth/* is keyed by address, since those callers have no token yet
+    if cls != "auth" and authorization:
+        claims, error = check_authorization(authorization)
+        if error is None:
+            user = claims.get("id")
+            return f"user:{user if user is not None else claims.get('email')}", claims
+    if Config.RATE_LIMIT_TRUST_PROXY and forwarded_for:
+        return "ip:" + forwarded_for.split(",")[0].strip(), None
+    return f"ip:{remote_addr}", None
+
+def admit_request(path, authorization, remote_addr, forwarded_for=None):
+    """
+    (route class, claims, None) when the request may proceed -- the caller
+    then owes admission.release(route class) -- or (None, None, Rejected).
+    """
+    cls = route_class(path)
+    if admission is None or cls is None:
+        return None, None, None
+    client, claims = client_identity(cls, authorization, remote_addr, forwarded_for)
+    rejected = admission.admit(cls, client)
+    if rejected is not None:
+        metrics.inc("pm_requests_rejected_total", (("class", cls), ("status", str(rejected.status))))
+        return None, None, rejected
+    return cls, claims, None
+
+@app.before_request
+def _admit_request():
+    cls, claims, rejected = admit_request(
+        request.path,
+        request.headers.get("Authorization"),
+        request.remote_addr,
+        request.headers.get("X-Forwarded-For"),
+    )
+    if rejected is not None:
+        return jsonify({"error": rejected.error}), rejected.status, rejected.headers()
+    g.admission_class = cls
+    if claims is not None:
+        # token_required takes these instead of verifying the token again
+        g.jwt_claims = claims
+
+@app.teardown_request
+def _release_admission(exc):
+    # streamed responses (stream_with_context) get here once the body is done
+    cls = g.pop("admission_class", None)
+    if cls is not None:
+        admission.release(cls)
+
 # --------------------------------------------------
 # AUTH BLUEPRINT
 # --------------------------------------------------
@@ -88,21 +243,69 @@ def dashboard_page():
 # --------------------------------------------------
 # HELPERS
 # --------------------------------------------------
-def logistic(x):
-    return 1.0 / (1.0 + np.exp(-x))
+def load_mmap_model(path):
+    """
+    Memory-mapped FlatForest from FLAT_MODEL_DIR, or None if the export is
+    missing or older than the joblib file it came from.
+    """
+    if not os.path.exists(FLAT_MODEL_META):
+        logging.warning("Flat model export not found at %s", FLAT_MODEL_DIR)
+        return None
+    if os.path.exists(path) and os.path.getmtime(path) > os.path.getmtime(FLAT_MODEL_META):
+        logging.warning("Flat model export is older than %s; re-run export_flat_model.py", path)
+        return None
+    try:
+        model = FlatForest.load(FLAT_MODEL_DIR, mmap=True)
+        logging.info("✅ Memory-mapped flat model loaded (%d trees)", model.n_trees)
+        return model
+    except Exception:
+        logging.exception("❌ Failed to load memory-mapped model")
+        return None
 
 def safe_load_model(path):
+    if Config.INFERENCE_ENGINE == "mmap":
+        model = load_mmap_model(path)
+        if model is not None:
+            return model
+
     if not os.path.exists(path):
         logging.error("❌ Model file not found: %s", path)
         return None
     try:
+        import joblib  # pulls in sklearn on unpickle; only needed here
         model = joblib.load(path)
         logging.info("✅ ML model loaded")
-        return model
     except Exception:
         logging.exception("❌ Failed to load model")
         return None
 
+    if Config.INFERENCE_ENGINE in ("flat", "mmap"):
+        try:
+            model = FlatForest.from_sklearn(model)
+            logging.info(
+                "✅ Flat forest engine ready (%d trees, %.1f KB)",
+                model.n_trees, model.nbytes / 1024
+            )
+            return model
+        except Exception:
+            logging.exception("❌ Flat forest export failed, using sklearn")
+    return plain_array_model(model)
+
+def plain_array_model(model):
+    """
+    Let the sklearn model take plain arrays in FEATURES order. Its stored
+    column names are checked once here and then dropped, so scoring does not
+    need a pandas DataFrame just to carry them.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        return model
+    if [str(n) for n in names] != FEATURES:
+        logging.error("❌ Model features %s do not match %s", list(names), FEATURES)
+        return None
+    del model.feature_names_in_
+    return model
+
 def load_stats():
     if not os.path.exists(STATS_JSON):
         raise RuntimeError(
@@ -114,87 +317,552 @@ def load_stats():
     logging.info("✅ Stats loaded from stats_table.json")
     return stats
 
-def z_score_for_row(row, stats):
-    z_scores = {}
-    for f in FEATURES:
-        mu = stats[f]["mean"]
-        sd = stats[f]["std"] if stats[f]["std"] != 0 else 1.0
-        z_scores[f] = (row[f] - mu) / sd
-    return z_scores
+def rf_positive_proba(X, model):
+    """Failure-class probability from the RF for each row of X, or None."""
+    if not (model and hasattr(model, "predict_proba")):
+        return None
+    classes = list(model.classes_)
+    if 1 not in classes:
+        return None
+    with stage("model", "frame"):
+        X = np.asarray(X, dtype=float)
+    with stage("model", "predict_proba"):
+        proba = model.predict_proba(X)
+    return proba[:, classes.index(1)]
+
+def missing_feature_result(payload, feature):
+    return {
+        "status": "Abnormal",
+        "warnings": [f"Missing:{feature}"],
+        "prob_within_2months": 1.0,
+        "raw_inputs": payload
+    }
+
+def score_batch(readings, bundle, source=None):
+    """
+    Score a list of reading dicts in one pass with the given ModelBundle.
+    Returns one result dict per reading, in order, identical to what
+    /predict would return for that reading on its own. A reading with a
+    non-numeric value gets {"error": "Invalid value for <f>"} instead, as
+    in /predict/stream, and the others are still scored. With a
+    ``source``, the scored readings are also passed to record_scored.
+    """
+    results = [None] * len(readings)
+    valid_idx, raw_rows = [], []
+
+    for i, payload in enumerate(readings):
+        missing = next((f for f in FEATURES if f not in payload), None)
+        if missing is not None:
+            results[i] = missing_feature_result(payload, missing)
+            continue
+        error = _numeric_error(payload)
+        if error is not None:
+            results[i] = {"error": error, "raw_inputs": payload}
+            continue
+        valid_idx.append(i)
+        raw_rows.append([float(payload[f]) for f in FEATURES])
+
+    if not raw_rows:
+        return results
+
+    out_of_range, abnormal, prob = score_matrix(np.asarray(raw_rows, dtype=float), bundle)
+
+    if source is not None:
+        record_scored(bundle, [
+            (readings[i].get("machine_id"), source, abnormal[j], prob[j], raw_rows[j])
+            for j, i in enumerate(valid_idx)
+        ])
+
+    for j, i in enumerate(valid_idx):
+        results[i] = {
+            "status": "Abnormal" if abnormal[j] else "Normal",
+            "warnings": [f for f, flag in zip(FEATURES, out_of_range[j]) if flag],
+            "prob_within_2months": float(prob[j]),
+            "raw_inputs": dict(zip(FEATURES, raw_rows[j]))
+        }
+    return results
+
+def score_matrix(raw, bundle):
+    """
+    Vectorized core of score_batch. raw is an (n, len(FEATURES)) float array
+    in FEATURES order. Returns (out_of_range, abnormal, prob) arrays.
+    """
+    kernel = bundle.kernel
+    processed, out_of_range, max_abs_z = kernel.prepare(raw)
+    rf_prob = rf_positive_proba(processed, bundle.model)
+    abnormal, prob = kernel.blend(max_abs_z, rf_prob)
+    # out_of_range is a view into the kernel's scratch buffer
+    return out_of_range.copy(), abnormal, prob
+
+def rf_positive_proba_rows(items):
+    """
+    Per-row form of rf_positive_proba used by the micro-batcher.
+    items are (model, row) pairs; rows queued across a model swap are
+    scored with the model their request started with.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for i, (model, row) in enumerate(items):
+        _, idx, rows = groups.setdefault(id(model), (model, [], []))
+        idx.append(i)
+        rows.append(row)
+    for model, idx, rows in groups.values():
+        proba = rf_positive_proba(rows, model)
+        if proba is not None:
+            for i, p in zip(idx, proba):
+                results[i] = float(p)
+    return results
+
+def load_bundle():
+    version = file_version(MODEL_PATH, STATS_JSON, FLAT_MODEL_META)
+    stats = load_stats()
+    kernel = ScoringKernel(stats, FEATURES, Z_THRESHOLD, ALPHA, Z0)
+    bundle = ModelBundle(safe_load_model(MODEL_PATH), stats, version, kernel)
+    logging.info("Model version %s", version)
+    return bundle
 
-def compute_prob_within_2months(max_abs_z, rf_prob):
-    base_risk = logistic(ALPHA * (max_abs_z - Z0))
-    w_rf = 0.45 if rf_prob is not None else 0.0
-    w_z = 1.0 - w_rf
-    combined = w_z * base_risk + (w_rf * rf_prob if rf_prob else 0.0)
-    return float(np.clip(combined, 0.0, 1.0))
+def validate_bundle(bundle):
+    """Reject a reload that would leave us without a working model or stats."""
+    if bundle.model is None:
+        raise ValueError("model failed to load")
+    for f in FEATURES:
+        for key in ("mean", "std", "min", "max"):
+            if not np.isfinite(float(bundle.stats[f][key])):
+                raise ValueError(f"stats[{f}][{key}] is not finite")
+    probe = np.array([[bundle.stats[f]["mean"] for f in FEATURES]])
+    _, _, prob = score_matrix(probe, bundle)
+    if not (0.0 <= float(prob[0]) <= 1.0):
+        raise ValueError("probe prediction out of range")
 
 # --------------------------------------------------
-# LOAD MODEL & STATS (FAIL FAST)
+# LOAD MODEL & STATS
 # --------------------------------------------------
-model = safe_load_model(MODEL_PATH)
-stats = load_stats()
+# MODEL_WARMUP=eager loads (and fails) at import; "background" starts the
+# load in a thread so the process comes up at once; "lazy" waits for the
+# first request that needs it. Until then /ready answers 503.
+registry = ModelRegistry(
+    load_bundle,
+    validate_bundle,
+    watch_paths=(MODEL_PATH, STATS_JSON, FLAT_MODEL_META),
+    lazy=Config.MODEL_WARMUP != "eager",
+)
+if Config.MODEL_WARMUP == "background":
+    registry.warm_up_async()
+
+@app.before_request
+def _start_model_watcher():
+    # started lazily so each gunicorn worker gets its own watcher thread
+    registry.start_watcher(Config.MODEL_WATCH_INTERVAL_S)
+
+machine_windows = RollingWindowStore(
+    len(FEATURES),
+    window=Config.ROLLING_WINDOW,
+    max_machines=Config.ROLLING_MAX_MACHINES,
+    idle_ttl=Config.ROLLING_IDLE_TTL_S,
+)
+
+predict_batcher = None
+if Config.PREDICT_MICROBATCH:
+    predict_batcher = MicroBatcher(
+        rf_positive_proba_rows,
+        max_batch_size=Config.PREDICT_BATCH_MAX_SIZE,
+        window_ms=Config.PREDICT_BATCH_WINDOW_MS,
+    )
+    logging.info(
+        "Micro-batching enabled (window=%sms, max=%s)",
+        Config.PREDICT_BATCH_WINDOW_MS, Config.PREDICT_BATCH_MAX_SIZE
+    )
+
+prediction_cache = None
+if Config.PREDICT_CACHE:
+    prediction_cache = PredictionCache(
+        max_size=Config.PREDICT_CACHE_SIZE,
+        ttl=Config.PREDICT_CACHE_TTL_S,
+        precision=Config.PREDICT_CACHE_PRECISION,
+    )
+
+# Scored readings go to the history table through a background writer
+history = None
+if Config.HISTORY_ENABLED:
+    history = HistoryStore(
+        Config.HISTORY_DB_FILE,
+        FEATURES,
+        batch_size=Config.HISTORY_BATCH_SIZE,
+        flush_interval=Config.HISTORY_FLUSH_INTERVAL_S,
+        max_queue=Config.HISTORY_QUEUE_SIZE,
+        retention=Config.HISTORY_RETENTION_DAYS * 86400,
+        prune_interval=Config.HISTORY_PRUNE_INTERVAL_S,
+    )
+
+# ...and into the in-memory fleet rollups behind /stats?window=
+fleet_rollups = None
+if Config.FLEET_ROLLUPS:
+    fleet_rollups = FleetRollups(
+        FEATURES,
+        prob_bins=Config.FLEET_PROB_BINS,
+        feature_bins=Config.FLEET_FEATURE_BINS,
+        directory=Config.FLEET_ROLLUP_DIR,
+        flush_interval=Config.FLEET_ROLLUP_FLUSH_INTERVAL_S,
+    )
+
+# PSI / KS of those rollups against the training stats, served on /drift
+drift_monitor = None
+if fleet_rollups is not None and Config.DRIFT_MONITOR:
+    drift_monitor = DriftMonitor(
+        fleet_rollups,
+        lambda: registry.current.stats,
+        window=Config.DRIFT_WINDOW,
+        interval=Config.DRIFT_INTERVAL_S,
+        min_count=Config.DRIFT_MIN_COUNT,
+        psi_warn=Config.DRIFT_PSI_WARN,
+        psi_alert=Config.DRIFT_PSI_ALERT,
+        ks_alert=Config.DRIFT_KS_ALERT,
+    )
+
+def record_scored(bundle, rows):
+    """Pass (machine_id, source, abnormal, prob, raw) rows to history and rollups."""
+    if history is not None:
+        history.record(bundle.version, bundle.kernel, rows)
+    if fleet_rollups is not None:
+        fleet_rollups.observe(bundle.kernel, rows)
+
+def score_single(raw_inputs, bundle):
+    """Clip, z-score and run the RF for one reading -> (status, warnings, prob)."""
+    kernel = bundle.kernel
+    with stage("predict", "kernel"):
+        row, out_of_range, max_abs_z = kernel.prepare_row([raw_inputs[f] for f in FEATURES])
+        warnings_list = [f for f, flag in zip(FEATURES, out_of_range) if flag]
+
+    with stage("predict", "model"):
+        if predict_batcher is not None:
+            rf_prob = predict_batcher.submit((bundle.model, row))
+        else:
+            rf_prob = rf_positive_proba([row], bundle.model)
+            if rf_prob is not None:
+                rf_prob = float(rf_prob[0])
+
+    with stage("predict", "blend"):
+        abnormal, prob = kernel.blend_row(max_abs_z, rf_prob)
+    status = "Abnormal" if abnormal else "Normal"
+    return status, warnings_list, prob
 
 # --------------------------------------------------
 # PREDICT (REAL LOGIC — NOT HARDCODED)
 # --------------------------------------------------
+# The predict_* functions below hold the request handling shared by the
+# Flask views here and the async views in asgi.py: decoded JSON payload in,
+# (response body, status code) out.
+
+def predict_one(payload, bundle):
+    with stage("predict", "validate"):
+        raw_inputs = {}
+        for f in FEATURES:
+            if f not in payload:
+                return missing_feature_result(payload, f), 400
+            raw_inputs[f] = float(payload[f])
+
+    cache_key = None
+    cached = None
+    if prediction_cache is not None:
+        cache_key = prediction_cache.key([raw_inputs[f] for f in FEATURES], bundle.version)
+        cached = prediction_cache.get(cache_key)
+
+    if cached is not None:
+        status, warnings_list, prob = cached
+    else:
+        status, warnings_list, prob = score_single(raw_inputs, bundle)
+        if cache_key is not None:
+            prediction_cache.put(cache_key, (status, warnings_list, prob))
+
+    record_scored(bundle, [(
+        payload.get("machine_id"), "predict", status == "Abnormal", prob,
+        [raw_inputs[f] for f in FEATURES]
+    )])
+
+    return {
+        "status": status,
+        "warnings": warnings_list,
+        "prob_within_2months": prob,
+        "raw_inputs": raw_inputs,
+        "model_version": bundle.version
+    }, 200
+
+def predict_many(payload, bundle):
+    readings = payload.get("readings") if isinstance(payload, dict) else payload
+
+    if not isinstance(readings, list) or not all(isinstance(r, dict) for r in readings):
+        return {"error": "Expected a list of readings"}, 400
+    if len(readings) > MAX_BATCH_SIZE:
+        return {"error": f"Batch too large (max {MAX_BATCH_SIZE})"}, 413
+
+    results = score_batch(readings, bundle, source="batch")
+    return {
+        "count": len(results),
+        "results": results,
+        "model_version": bundle.version
+    }, 200
+
+def predict_rolling_one(payload, bundle):
+    """
+    Add a reading to the machine's window and score the window instead of
+    the single reading: z-scores and the RF use the rolling mean.
+    """
+    machine_id = payload.get("machine_id")
+    if machine_id is None or machine_id == "":
+        return {"error": "machine_id is required"}, 400
+
+    for f in FEATURES:
+        if f not in payload:
+            return missing_feature_result(payload, f), 400
+    raw = np.array([[float(payload[f]) for f in FEATURES]])
+
+    # clipped with the kernel's precomputed bounds
+    processed, out_of_range, _ = bundle.kernel.prepare_row(raw[0].tolist())
+    rolling = machine_windows.update(str(machine_id), processed)
+    _, abnormal, prob = score_matrix(rolling["mean"][np.newaxis, :], bundle)
+
+    record_scored(bundle, [(machine_id, "rolling", abnormal[0], prob[0], raw[0].tolist())])
+
+    return {
+        "machine_id": machine_id,
+        "status": "Abnormal" if abnormal[0] else "Normal",
+        "warnings": [f for f, flag in zip(FEATURES, out_of_range) if flag],
+        "prob_within_2months": float(prob[0]),
+        "raw_inputs": dict(zip(FEATURES, raw[0].tolist())),
+        "model_version": bundle.version,
+        "window_count": rolling["count"],
+        "rolling": {
+            f: {
+                "mean": float(rolling["mean"][i]),
+                "std": float(rolling["std"][i]),
+                "slope": float(rolling["slope"][i])
+            }
+            for i, f in enumerate(FEATURES)
+        }
+    }, 200
+
 @app.route("/predict", methods=["POST"])
+@token_required
 def predict():
+    try:
+        bundle = registry.current
+        with stage("predict", "parse"):
+            payload = request.get_json(force=True)
+        body, code = predict_one(payload, bundle)
+        with stage("predict", "serialize"):
+            response = jsonify(body)
+        return response, code
+
+    except Exception:
+        logging.exception("Unhandled error in /predict")
+        return jsonify({"status": "Abnormal"}), 500
+
+# --------------------------------------------------
+# BATCH PREDICT (N READINGS, ONE MODEL CALL)
+# --------------------------------------------------
+@app.route("/predict/batch", methods=["POST"])
+@token_required
+def predict_batch():
     try:
         payload = request.get_json(force=True)
-        raw_inputs = {}
+        body, code = predict_many(payload, registry.current)
+        return jsonify(body), code
 
+    except Exception:
+        logging.exception("Unhandled error in /predict/batch")
+        return jsonify({"status": "Abnormal"}), 500
+
+# --------------------------------------------------
+# STREAMING PREDICT (NDJSON / CSV IN, NDJSON OUT)
+# --------------------------------------------------
+def _numeric_error(record):
+    try:
         for f in FEATURES:
-            if f not in payload:
-                return jsonify({
-                    "status": "Abnormal",
-                    "warnings": [f"Missing:{f}"],
-                    "prob_within_2months": 1.0,
-                    "raw_inputs": payload
-                }), 400
-            raw_inputs[f] = float(payload[f])
+            if f in record:
+                float(record[f])
+    except (TypeError, ValueError):
+        return f"Invalid value for {f}"
+    return None
 
-        warnings_list = []
-        processed = raw_inputs.copy()
+def score_stream(records, chunk_size, bundle):
+    """Score (line_no, record, error) tuples chunk by chunk, yielding NDJSON lines."""
+    for chunk in iter_chunks(records, chunk_size):
+        checked = [
+            (line_no, record, error or _numeric_error(record))
+            for line_no, record, error in chunk
+        ]
+        scored = iter(score_batch([r for _, r, e in checked if e is None], bundle, source="stream"))
 
-        for f in FEATURES:
-            if raw_inputs[f] < stats[f]["min"] or raw_inputs[f] > stats[f]["max"]:
-                warnings_list.append(f)
-            processed[f] = max(
-                stats[f]["min"],
-                min(raw_inputs[f], stats[f]["max"])
-            )
+        out = []
+        for line_no, record, error in checked:
+            if error is not None:
+                out.append(json.dumps({"line": line_no, "error": error}))
+            else:
+                result = next(scored)
+                result["model_version"] = bundle.version
+                out.append(json.dumps(result))
+        yield "\n".join(out) + "\n"
 
-        z_scores = z_score_for_row(processed, stats)
-        max_abs_z = max(abs(v) for v in z_scores.values())
-        status = "Abnormal" if max_abs_z > Z_THRESHOLD else "Normal"
+@app.route("/predict/stream", methods=["POST"])
+@token_required
+def predict_stream():
+    lines = iter_lines(request.stream)
+    if request.mimetype == "text/csv":
+        records = iter_csv_records(lines)
+    else:
+        records = iter_ndjson_records(lines)
 
-        rf_prob = None
-        if model and hasattr(model, "predict_proba"):
-            X = pd.DataFrame([[processed[f] for f in FEATURES]], columns=FEATURES)
-            proba = model.predict_proba(X)[0]
-            if 1 in list(model.classes_):
-                rf_prob = float(proba[list(model.classes_).index(1)])
+    # one bundle for the whole upload, even if a reload happens mid-stream
+    bundle = registry.current
 
-        prob = compute_prob_within_2months(max_abs_z, rf_prob)
+    def generate():
+        try:
+            yield from score_stream(records, Config.STREAM_CHUNK_SIZE, bundle)
+        except Exception:
+            logging.exception("Unhandled error in /predict/stream")
+            yield json.dumps({"error": "Internal error"}) + "\n"
 
-        return jsonify({
-            "status": status,
-            "warnings": warnings_list,
-            "prob_within_2months": prob,
-            "raw_inputs": raw_inputs
-        }), 200
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# --------------------------------------------------
+# ROLLING PREDICT (PER-MACHINE WINDOW FEATURES)
+# --------------------------------------------------
+@app.route("/predict/rolling", methods=["POST"])
+@token_required
+def predict_rolling():
+    try:
+        bundle = registry.current
+        payload = request.get_json(force=True)
+        body, code = predict_rolling_one(payload, bundle)
+        return jsonify(body), code
 
     except Exception:
-        logging.exception("Unhandled error in /predict")
+        logging.exception("Unhandled error in /predict/rolling")
         return jsonify({"status": "Abnormal"}), 500
 
 # --------------------------------------------------
 # STATS ENDPOINT (REAL DATA)
 # --------------------------------------------------
 @app.route("/stats")
+@token_required
 def stats_endpoint():
-    return jsonify(stats), 200
+    body, code = stats_body(request.args.get("window"), registry.current)
+    return jsonify(body), code
+
+def stats_body(window, bundle):
+    """
+    The training stats table, or with window=hour|day|week the live fleet
+    rollups for that window: abnormal rate, probability histogram and
+    per-feature moments, histograms and drift against the training table.
+    """
+    if not window:
+        return bundle.stats, 200
+    if fleet_rollups is None:
+        return {"error": "Fleet rollups are disabled"}, 404
+    if window not in WINDOWS:
+        return {"error": f"window must be one of {', '.join(WINDOWS)}"}, 400
+    return fleet_rollups.query(window), 200
+
+# --------------------------------------------------
+# PREDICTION HISTORY
+# --------------------------------------------------
+@app.route("/history")
+@token_required
+def history_endpoint():
+    """
+    Scored readings with start <= ts < end (epoch seconds or ISO 8601), for
+    one machine_id or the whole fleet, optionally status=Abnormal|Normal.
+    Pass the returned "next" cursor as ?after= to fetch the following page.
+    """
+    if history is None:
+        return jsonify({"error": "Prediction history is disabled"}), 404
+    args = request.args
+    try:
+        start = parse_time(args.get("start"))
+        end = parse_time(args.get("end"))
+        limit = min(int(args.get("limit", 500)), Config.HISTORY_MAX_PAGE)
+        after = None
+        if args.get("after"):
+            ts, row_id = args["after"].split(":")
+            after = (float(ts), int(row_id))
+    except ValueError:
+        return jsonify({"error": "Invalid start, end, limit or after"}), 400
+    status = args.get("status")
+    if status not in (None, "Abnormal", "Normal"):
+        return jsonify({"error": "status must be Abnormal or Normal"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    rows, next_cursor = history.query(
+        machine_id=args.get("machine_id"), start=start, end=end, status=status,
+        after=after, limit=limit, descending=args.get("order") == "desc",
+    )
+    return jsonify({
+        "count": len(rows),
+        "rows": rows,
+        "next": f"{next_cursor[0]!r}:{next_cursor[1]}" if next_cursor else None
+    }), 200
+
+@app.route("/drift")
+@token_required
+def drift_endpoint():
+    """Per-feature PSI / KS drift of live inputs against stats_table.json."""
+    if drift_monitor is None:
+        return jsonify({"error": "Drift monitoring is disabled"}), 404
+    window = request.args.get("window") or Config.DRIFT_WINDOW
+    if window not in WINDOWS:
+        return jsonify({"error": f"window must be one of {', '.join(WINDOWS)}"}), 400
+    return jsonify(drift_monitor.latest(window)), 200
+
+@app.route("/ready")
+def ready_endpoint():
+    """503 until the model and stats are loaded in this worker; 200 after."""
+    body, code = readiness()
+    headers = {"Retry-After": "1"} if code == 503 else {}
+    return jsonify(body), code, headers
+
+def readiness():
+    if not registry.ready:
+        registry.warm_up_async()
+        return {"ready": False, "error": registry.last_error}, 503
+    bundle = registry.current
+    return {
+        "ready": True,
+        "model_version": bundle.version,
+        "model_loaded": bundle.model is not None,
+        "loaded_at": bundle.loaded_at
+    }, 200
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/predict/cache-metrics")
+@token_required
+def prediction_cache_metrics():
+    if prediction_cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify(dict(prediction_cache.metrics(), enabled=True)), 200
+
+# --------------------------------------------------
+# ADMIN: HOT RELOAD
+# --------------------------------------------------
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    """
+    Reload model + stats in this worker. With several gunicorn workers, set
+    MODEL_WATCH_INTERVAL_S so every worker picks up the new files itself.
+    """
+    if not Config.ADMIN_TOKEN or request.headers.get("X-Admin-Token") != Config.ADMIN_TOKEN:
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        bundle, changed = registry.reload(force=bool(request.args.get("force")))
+    except Exception as e:
+        return jsonify({
+            "error": f"Reload failed: {e}",
+            "model_version": registry.current.version
+        }), 500
+    return jsonify({"model_version": bundle.version, "changed": changed}), 200
 
 # --------------------------------------------------
 # START SERVER
@@ -0,0 +1,238 @@
+# backend/asgi.py
+# Asyncio serving mode: `uvicorn backend.asgi:app` (or gunicorn with
+# -k uvicorn.workers.UvicornWorker). The prediction, stats and health routes
+# are native async handlers that hand scoring to a bounded thread pool, so
+# idle keep-alive connections and slow uploads cost a coroutine, not a
+# worker. Everything else (/auth/*, the pages, /admin/reload) is the Flask
+# app from app.py, run through a WSGI adapter on its own thread pool; bcrypt
+# stays on the PasswordHasher pool as before.
+
+import os
+import sys
+import json
+import time
+import logging
+from contextlib import asynccontextmanager
+from functools import wraps
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import ClientDisconnect
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as core
+from config import Config
+from services.async_pool import AsyncBoundedPool, PoolSaturated
+from services.metrics import metrics, stage
+from services.stream_ingest import aiter_lines, iter_csv_records, iter_ndjson_records
+from utils.jwt_utils import check_authorization
+
+score_pool = AsyncBoundedPool(Config.ASGI_SCORE_WORKERS, Config.ASGI_SCORE_QUEUE, name="score")
+
+
+def json_response(body, status=200, headers=None):
+    # json.dumps, not JSONResponse: readings may carry NaN, as under Flask
+    return Response(json.dumps(body), status_code=status, headers=headers,
+                    media_type="application/json")
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is produced while the request body is still
+    being read. The stock class (for servers below ASGI 2.4) runs a task that
+    calls receive() to watch for disconnects, which would steal the upload's
+    body messages; here a disconnect shows up through request.stream() or a
+    failed send instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+def route(path, auth=True):
+    """
+    Admission control, bearer check, 503 on a full pool, 500 on errors and
+    request timing, like the Flask views and hooks.
+    """
+    def decorate(handler):
+        @wraps(handler)
+        async def endpoint(request):
+            t0 = time.perf_counter()
+            response = None
+            admitted = None
+            try:
+                # a streamed body is still running when this returns, so the
+                # concurrency slot covers its setup only; score_pool bounds the rest
+                admitted, _, rejected = core.admit_request(
+                    path,
+                    request.headers.get("authorization"),
+                    request.client.host if request.client else None,
+                    request.headers.get("x-forwarded-for"),
+                )
+                if rejected is not None:
+                    response = json_response({"error": rejected.error}, rejected.status, rejected.headers())
+                    return response
+                if auth and Config.API_AUTH_REQUIRED:
+                    _, error = check_authorization(request.headers.get("authorization"))
+                    if error is not None:
+                        response = json_response({"error": error}, 401)
+                        return response
+                response = await handler(request)
+                return response
+            except PoolSaturated:
+                response = json_response({"error": "Server busy, please retry shortly"}, 503,
+                                         {"Retry-After": "1"})
+                return response
+            except Exception:
+                logging.exception("Unhandled error in %s", path)
+                response = json_response({"status": "Abnormal"}, 500)
+                return response
+            finally:
+                if admitted is not None:
+                    core.admission.release(admitted)
+                status = str(response.status_code) if response is not None else "500"
+                metrics.observe(
+                    "pm_http_request_duration_seconds",
+                    (("endpoint", path), ("method", request.method), ("status", status)),
+                    time.perf_counter() - t0,
+                )
+        return endpoint
+    return decorate
+
+
+async def current_bundle():
+    # the first load reads files and unpickles the model; keep it off the loop
+    if core.registry.ready:
+        return core.registry.current
+    return await score_pool.run_wait(lambda: core.registry.current)
+
+
+async def read_json(request):
+    with stage("predict", "parse"):
+        return json.loads(await request.body())
+
+
+@route("/predict")
+async def predict(request):
+    payload = await read_json(request)
+    bundle = await current_bundle()
+    body, code = await score_pool.run(core.predict_one, payload, bundle)
+    return json_response(body, code)
+
+
+@route("/predict/batch")
+async def predict_batch(request):
+    payload = await read_json(request)
+    bundle = await current_bundle()
+    body, code = await score_pool.run(core.predict_many, payload, bundle)
+    return json_response(body, code)
+
+
+@route("/predict/rolling")
+async def predict_rolling(request):
+    payload = await read_json(request)
+    bundle = await current_bundle()
+    body, code = await score_pool.run(core.predict_rolling_one, payload, bundle)
+    return json_response(body, code)
+
+
+def _score_lines(lines, header, is_csv, bundle):
+    if is_csv:
+        records = iter_csv_records(([header] if header else []) + lines)
+    else:
+        records = iter_ndjson_records(lines)
+    return "".join(core.score_stream(records, len(lines) + 1, bundle))
+
+
+@route("/predict/stream")
+async def predict_stream(request):
+    is_csv = request.headers.get("content-type", "").split(";")[0].strip() == "text/csv"
+    # one bundle for the whole upload, even if a reload happens mid-stream
+    bundle = await current_bundle()
+    chunk_size = Config.STREAM_CHUNK_SIZE
+
+    async def generate():
+        header = None
+        lines = []
+        try:
+            async for line_no, text in aiter_lines(request.stream()):
+                if is_csv and header is None and text is not None and text.strip():
+                    header = (line_no, text)  # re-sent with every chunk
+                    continue
+                lines.append((line_no, text))
+                if len(lines) >= chunk_size:
+                    yield await score_pool.run_wait(_score_lines, lines, header, is_csv, bundle)
+                    lines = []
+            if lines:
+                yield await score_pool.run_wait(_score_lines, lines, header, is_csv, bundle)
+        except ClientDisconnect:
+            return
+        except Exception:
+            logging.exception("Unhandled error in /predict/stream")
+            yield json.dumps({"error": "Internal error"}) + "\n"
+
+    return UploadStreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@route("/stats")
+async def stats(request):
+    bundle = await current_bundle()
+    window = request.query_params.get("window")
+    if not window:
+        return json_response(bundle.stats)
+    # folds buffered rows and may read other workers' snapshots
+    body, code = await score_pool.run(core.stats_body, window, bundle)
+    return json_response(body, code)
+
+
+@route("/ready", auth=False)
+async def ready(request):
+    body, code = core.readiness()
+    return json_response(body, code, {"Retry-After": "1"} if code == 503 else None)
+
+
+@route("/metrics", auth=False)
+async def metrics_endpoint(request):
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    metrics.start_flusher()
+    if core.fleet_rollups is not None:
+        core.fleet_rollups.start_flusher()
+    if core.drift_monitor is not None:
+        core.drift_monitor.start()
+    if Config.MODEL_WARMUP != "lazy":
+        core.registry.warm_up_async()
+    core.registry.start_watcher(Config.MODEL_WATCH_INTERVAL_S)
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/predict/rolling", predict_rolling, methods=["POST"]),
+        Route("/predict/stream", predict_stream, methods=["POST"]),
+        Route("/stats", stats, methods=["GET"]),
+        Route("/ready", ready, methods=["GET"]),
+        Route("/metrics", metrics_endpoint, methods=["GET"]),
+        Mount("/", app=WSGIMiddleware(core.app, workers=Config.ASGI_WSGI_THREADS)),
+    ],
+    middleware=[
+        # same open CORS policy as flask_cors on the Flask app
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+    ],
+    lifespan=lifespan,
+)
@@ -4,10 +4,20 @@
 
 import sqlite3
 import os
+import threading
 from contextlib import contextmanager
 
 DB_FILE = os.getenv("AUTH_DB_FILE", os.path.join(os.path.dirname(__file__), "auth.db"))
 
+# Per-thread persistent connections (set AUTH_DB_POOL=False for one connection per call)
+POOL_ENABLED = os.getenv("AUTH_DB_POOL", "True") == "True"
+BUSY_TIMEOUT_MS = int(os.getenv("AUTH_DB_BUSY_TIMEOUT_MS", "5000"))
+CACHED_STATEMENTS = int(os.getenv("AUTH_DB_CACHED_STATEMENTS", "128"))
+
+_local = threading.local()
+_pool_stats = {"opened": 0, "closed": 0}
+_pool_stats_lock = threading.Lock()
+
 # Helper to convert MySQL-style %s placeholders to SQLite-friendly ? placeholders.
 def _convert_query(query):
     return query.replace("%s", "?")
@@ -60,8 +70,10 @@ class _CursorWrapper:
         return getattr(self._cursor, "rowcount", -1)
 
 class _ConnectionWrapper:
-    def __init__(self, conn):
+    def __init__(self, conn, pooled=False):
         self._conn = conn
+        # pooled connections belong to the thread, not to the caller
+        self._pooled = pooled
 
     # allow "with get_db_connection() as conn:" usage
     def __enter__(self):
@@ -70,7 +82,8 @@ class _ConnectionWrapper:
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
             self._conn.commit()
-            self._conn.close()
+            if not self._pooled:
+                self._conn.close()
         except Exception:
             pass
         return False
@@ -85,19 +98,87 @@ class _ConnectionWrapper:
         return self._conn.rollback()
 
     def close(self):
+        if self._pooled:
+            return
         try:
             self._conn.close()
         except Exception:
             pass
 
-@contextmanager
-def get_db_connection():
-    """Context manager that yields a connection wrapper (use like: with get_db_connection() as conn:)"""
-    conn = sqlite3.connect(DB_FILE, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+def _open_connection(pooled):
+    conn = sqlite3.connect(
+        DB_FILE,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=CACHED_STATEMENTS,
+    )
     # let rows be accessible by column name
     conn.row_factory = sqlite3.Row
     # enable foreign keys
     conn.execute("PRAGMA foreign_keys = ON;")
+    if pooled:
+        # long-lived connections: WAL lets readers run alongside the writer,
+        # and writers wait for the lock instead of failing with "database is locked"
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
+    with _pool_stats_lock:
+        _pool_stats["opened"] += 1
+    return conn
+
+def _close_connection(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+    with _pool_stats_lock:
+        _pool_stats["closed"] += 1
+
+def _thread_connection():
+    """The calling thread's pooled connection, opened on first use (and after fork)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid() or _local.db_file != DB_FILE:
+        conn = _open_connection(pooled=True)
+        _local.conn = conn
+        _local.pid = os.getpid()
+        _local.db_file = DB_FILE
+        _local.depth = 0
+    return conn
+
+def close_thread_connection():
+    """Close the calling thread's pooled connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        _close_connection(conn)
+    _local.conn = None
+
+def pool_stats():
+    with _pool_stats_lock:
+        return dict(_pool_stats)
+
+@contextmanager
+def _pooled_connection():
+    conn = _thread_connection()
+    _local.depth += 1
+    try:
+        yield _ConnectionWrapper(conn, pooled=True)
+    except BaseException:
+        if _local.depth == 1:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        raise
+    else:
+        # nested uses share the transaction; the outermost one ends it
+        if _local.depth == 1:
+            conn.commit()
+    finally:
+        _local.depth -= 1
+
+@contextmanager
+def _single_use_connection():
+    conn = _open_connection(pooled=False)
     try:
         yield _ConnectionWrapper(conn)
     finally:
@@ -105,7 +186,10 @@ def get_db_connection():
             conn.commit()
         except Exception:
             pass
-        try:
-            conn.close()
-        except Exception:
-            pass
+        _close_connection(conn)
+
+def get_db_connection():
+    """Context manager that yields a connection wrapper (use like: with get_db_connection() as conn:)"""
+    if POOL_ENABLED:
+        return _pooled_connection()
+    return _single_use_connection()
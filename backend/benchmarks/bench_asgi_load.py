@@ -0,0 +1,219 @@
+# backend/benchmarks/bench_asgi_load.py
+# Concurrent-connection capacity of the sync gunicorn deployment vs the
+# asyncio mode (backend.asgi:app under uvicorn workers).
+#
+#   python backend/benchmarks/bench_asgi_load.py --clients 500 --seconds 10
+#
+# Phase 1: ``--clients`` gateways each hold a keep-alive connection and POST
+# /predict every ``--think`` seconds (reconnecting whenever the server closes
+# the connection, as sync workers do after every response).
+# Phase 2: ``--uploads`` clients trickle NDJSON into /predict/stream one line
+# every ``--line-interval`` seconds while one client probes /predict.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+from bench_utils import BACKEND_DIR, summarize, format_summary, auth_headers
+from measure_worker_memory import wait_ready
+
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+
+ROW = {"TP2": 1.0, "TP3": 9.0, "H1": 8.0, "Oil_temperature": 66.0, "DV_pressure": 0.0}
+
+SERVERS = [
+    ("sync gunicorn", ["backend.app:app"]),
+    ("asgi uvicorn", ["backend.asgi:app", "-k", "uvicorn.workers.UvicornWorker"]),
+]
+
+
+class Conn:
+    """Minimal HTTP/1.1 client connection on asyncio streams."""
+
+    def __init__(self, host, port, headers):
+        self.host, self.port = host, port
+        self.headers = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    def send_head(self, method, path, extra=""):
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n{self.headers}{extra}\r\n".encode()
+        )
+
+    async def read_response(self):
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        fields = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                fields[k.strip().lower()] = v.strip()
+        if "content-length" in fields:
+            body = await self.reader.readexactly(int(fields["content-length"]))
+        elif fields.get("transfer-encoding") == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).strip(), 16)
+                body += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            body = await self.reader.read()
+        if fields.get("connection", "").lower() == "close":
+            self.close()
+        return status, body
+
+    async def post_json(self, path, payload):
+        if self.writer is None:
+            await self.open()
+        body = json.dumps(payload).encode()
+        self.send_head("POST", path, f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n")
+        self.writer.write(body)
+        return await self.read_response()
+
+
+async def gateway(host, port, headers, think, deadline, timeout, result):
+    conn = Conn(host, port, headers)
+    await asyncio.sleep(random.uniform(0, think))  # spread the first wave
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(conn.post_json("/predict", ROW), timeout)
+            result["codes"][status] = result["codes"].get(status, 0) + 1
+            if status == 200:
+                result["latencies"].append(time.perf_counter() - t0)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+            result["errors"] += 1
+            conn.close()
+        await asyncio.sleep(think)
+    conn.close()
+
+
+async def slow_upload(host, port, headers, lines, interval, deadline, result):
+    conn = Conn(host, port, headers)
+    try:
+        await conn.open()
+        conn.send_head("POST", "/predict/stream",
+                       "Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n")
+        line = (json.dumps(ROW) + "\n").encode()
+        for _ in range(lines):
+            if time.perf_counter() >= deadline:
+                break
+            conn.writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await conn.writer.drain()
+            await asyncio.sleep(interval)
+        conn.writer.write(b"0\r\n\r\n")
+        status, _ = await asyncio.wait_for(conn.read_response(), 30)
+        result["codes"][status] = result["codes"].get(status, 0) + 1
+    except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+        result["errors"] += 1
+    finally:
+        conn.close()
+
+
+async def probe(host, port, headers, deadline, timeout, result):
+    conn = Conn(host, port, headers)
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(conn.post_json("/predict", ROW), timeout)
+            if status == 200:
+                result["latencies"].append(time.perf_counter() - t0)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+            result["errors"] += 1
+            conn.close()
+        await asyncio.sleep(0.05)
+    conn.close()
+
+
+def new_result():
+    return {"latencies": [], "codes": {}, "errors": 0}
+
+
+async def phase_gateways(args, headers):
+    deadline = time.perf_counter() + args.seconds
+    result = new_result()
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        gateway("127.0.0.1", args.port, headers, args.think, deadline, args.timeout, result)
+        for _ in range(args.clients)
+    ])
+    return result, time.perf_counter() - t0
+
+
+async def phase_uploads(args, headers):
+    deadline = time.perf_counter() + args.seconds
+    uploads, probed = new_result(), new_result()
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        probe("127.0.0.1", args.port, headers, deadline, args.timeout, probed),
+        *[
+            slow_upload("127.0.0.1", args.port, headers, args.upload_lines,
+                        args.line_interval, deadline, uploads)
+            for _ in range(args.uploads)
+        ],
+    )
+    return uploads, probed, time.perf_counter() - t0
+
+
+def run_server(label, target, args, headers):
+    env = dict(os.environ, GUNICORN_PRELOAD="True")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *target,
+         "-w", str(args.workers), "-b", f"127.0.0.1:{args.port}", "--backlog", "4096"],
+        cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_ready(f"http://127.0.0.1:{args.port}", 120):
+            print(f"{label}: server did not come up")
+            return
+        result, elapsed = asyncio.run(phase_gateways(args, headers))
+        s = summarize(result["latencies"], elapsed)
+        print(format_summary(f"{label} gateways", s),
+              f"ok={len(result['latencies'])} codes={result['codes']} errors={result['errors']}")
+
+        uploads, probed, elapsed = asyncio.run(phase_uploads(args, headers))
+        s = summarize(probed["latencies"], elapsed)
+        print(format_summary(f"{label} probe under uploads", s),
+              f"probe errors={probed['errors']} uploads={uploads['codes']} "
+              f"upload errors={uploads['errors']}")
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between a gateway's requests")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-request timeout (counted as an error)")
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--upload-lines", type=int, default=1000)
+    parser.add_argument("--line-interval", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    headers = auth_headers()
+    for label, target in SERVERS:
+        run_server(label, target, args, headers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_auth_db.py
+# Concurrent auth DB load: pooled per-thread connections vs one connection
+# per call. Each "login" reads the user row and each "reset" inserts and
+# reads back an OTP, which is what the auth routes do minus bcrypt/SMTP.
+#
+#   python backend/benchmarks/bench_auth_db.py --threads 16 --ops 300
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from bench_utils import summarize, format_summary
+
+_tmp_db = tempfile.NamedTemporaryFile(prefix="bench_authdb_", suffix=".db", delete=False)
+_tmp_db.close()
+os.environ["AUTH_DB_FILE"] = _tmp_db.name
+
+import auth_database
+import init_auth_db
+from services.user_service import get_user_by_email
+from services.otp_service import create_otp_request, verify_otp
+
+EMAIL = "bench@example.com"
+
+
+def seed():
+    init_auth_db.main()
+    with auth_database.get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT OR IGNORE INTO users (name, email, password_hash) VALUES (%s, %s, %s)",
+                ("bench", EMAIL, "x"),
+            )
+
+
+def run(threads, ops, write_every):
+    latencies, errors = [], {"locked": 0, "other": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        local = []
+        barrier.wait()
+        for i in range(ops):
+            t0 = time.perf_counter()
+            try:
+                get_user_by_email(EMAIL)
+                if i % write_every == 0:
+                    otp, _ = create_otp_request(EMAIL)
+                    verify_otp(EMAIL, otp)
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors["locked" if "locked" in str(e) else "other"] += 1
+            local.append(time.perf_counter() - t0)
+        auth_database.close_thread_connection()
+        with lock:
+            latencies.extend(local)
+
+    before = auth_database.pool_stats()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    t_start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+    after = auth_database.pool_stats()
+    opened = after["opened"] - before["opened"]
+    closed = after["closed"] - before["closed"]
+    return summarize(latencies, elapsed), opened, closed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth DB connection pooling benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=300, help="operations per thread")
+    parser.add_argument("--write-every", type=int, default=5, help="one OTP write per N ops")
+    args = parser.parse_args()
+
+    try:
+        seed()
+        for pooled in (False, True):
+            auth_database.POOL_ENABLED = pooled
+            summary, opened, closed, errors = run(args.threads, args.ops, args.write_every)
+            name = "pooled (WAL)" if pooled else "connect per call"
+            print(format_summary(name, summary))
+            print(f"{'':<32} connections opened={opened} closed={closed} "
+                  f"locked errors={errors['locked']} other errors={errors['other']}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(_tmp_db.name + suffix):
+                os.unlink(_tmp_db.name + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# backend/benchmarks/bench_db_backends.py
+# Run the auth service flow against each DB backend and compare throughput.
+#
+#   python backend/benchmarks/bench_db_backends.py                 # sqlite + mysql
+#   python backend/benchmarks/bench_db_backends.py --backend sqlite
+#
+# The MySQL run needs a reachable MySQL-compatible server (MySQL, MariaDB,
+# or a local container) configured through MYSQL_* env vars; it is skipped
+# with a note if the server cannot be reached. Each backend runs in its own
+# process because database.py binds the backend at import time.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from bench_utils import summarize, format_summary
+
+
+def run_backend(threads, ops):
+    import init_auth_db
+    from services.user_service import create_user, get_user_by_email
+    from services.otp_service import create_otp_request, verify_otp, clear_otps
+
+    init_auth_db.main()
+    run_id = uuid.uuid4().hex[:8]
+
+    # correctness: the same services behave the same way on either backend
+    email = f"bench-{run_id}@example.com"
+    create_user("bench", email, "bench-password")
+    try:
+        create_user("bench", email, "bench-password")
+        raise AssertionError("duplicate email was accepted")
+    except ValueError:
+        pass
+    assert get_user_by_email(email)["email"] == email
+    otp, _ = create_otp_request(email)
+    assert verify_otp(email, otp)[0]
+    clear_otps(email)
+    assert not verify_otp(email, otp)[0]
+
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        local = []
+        barrier.wait()
+        for _ in range(ops):
+            t0 = time.perf_counter()
+            get_user_by_email(email)
+            code, _ = create_otp_request(email)
+            verify_otp(email, code)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    t_start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    clear_otps(email)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth DB backend comparison")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="flows per thread")
+    args = parser.parse_args()
+
+    if args.backend:
+        # child process: DB_BACKEND / AUTH_DB_FILE are already in the env
+        print(json.dumps(run_backend(args.threads, args.ops)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("sqlite", "mysql"):
+            env = dict(os.environ, DB_BACKEND=backend,
+                       AUTH_DB_FILE=os.path.join(tmp, "auth.db"))
+            proc = subprocess.run(
+                [sys.executable, __file__, "--backend", backend,
+                 "--threads", str(args.threads), "--ops", str(args.ops)],
+                env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                last = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+                print(f"{backend:<32} skipped: {last}")
+                continue
+            summary = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(format_summary(f"{backend} ({args.threads} threads)", summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_drift_monitor.py
+# Drift monitor: per-reading cost on the request path, compute() latency,
+# and the PSI/KS it reports for in-distribution vs shifted traffic, against
+# the histogram of a skewed synthetic training set.
+#
+#   python backend/benchmarks/bench_drift_monitor.py --train 200000 --live 20000
+
+import argparse
+import time
+
+import numpy as np
+
+from bench_utils import summarize, format_summary
+
+import app as backend_app
+from services.fleet_rollup import FleetRollups
+from services.drift_monitor import DriftMonitor
+from services.scoring_kernel import ScoringKernel
+
+FEATURES = backend_app.FEATURES
+
+
+def training_stats(x, bins, with_histogram):
+    """stats_table.json entries as save_stats.py writes them."""
+    stats = {}
+    for i, f in enumerate(FEATURES):
+        col = x[:, i]
+        stats[f] = {"mean": float(col.mean()), "std": float(col.std(ddof=1)),
+                    "min": float(col.min()), "max": float(col.max())}
+        if with_histogram:
+            stats[f]["histogram"] = np.histogram(col, bins=bins, range=(col.min(), col.max()))[0].tolist()
+    return stats
+
+
+def sample(rng, n, shift=0.0, scale=1.0):
+    # gamma(2) is skewed like the pressure features in the real table
+    return rng.gamma(2.0, 1.0, size=(n, len(FEATURES))) * scale + shift
+
+
+def drift_report(stats, live, window="hour"):
+    kernel = ScoringKernel(stats, FEATURES, 3.0, 1.2, 1.5)
+    rollups = FleetRollups(FEATURES)
+    rows = [(None, "predict", False, 0.1, r) for r in live.tolist()]
+    for base in range(0, len(rows), 1000):
+        rollups.observe(kernel, rows[base:base + 1000])
+    monitor = DriftMonitor(rollups, lambda: stats, window=window, interval=0)
+    return monitor, monitor.compute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--train", type=int, default=200000)
+    parser.add_argument("--live", type=int, default=20000)
+    parser.add_argument("--bins", type=int, default=50, help="save_stats.py --hist-bins")
+    parser.add_argument("--observe", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    train = sample(rng, args.train)
+    std = train.std(axis=0)
+
+    # request path: the monitor reads the rollups, so a reading costs one observe()
+    stats = training_stats(train, args.bins, True)
+    kernel = ScoringKernel(stats, FEATURES, 3.0, 1.2, 1.5)
+    rollups = FleetRollups(FEATURES)
+    rows = [(None, "predict", False, 0.1, r) for r in sample(rng, args.live).tolist()]
+    t0 = time.perf_counter()
+    for i in range(args.observe):
+        rollups.observe(kernel, [rows[i % len(rows)]])
+    print(f"observe(), one reading per call      {(time.perf_counter() - t0) / args.observe * 1e6:8.2f}us/reading")
+
+    monitor = DriftMonitor(rollups, lambda: stats, interval=0)
+    for window in ("hour", "week"):
+        latencies = []
+        t_start = time.perf_counter()
+        for _ in range(args.repeat):
+            t1 = time.perf_counter()
+            monitor.compute(window)
+            latencies.append(time.perf_counter() - t1)
+        print(format_summary(f"compute({window!r})", summarize(latencies, time.perf_counter() - t_start)))
+
+    cases = {
+        "same distribution": sample(rng, args.live),
+        "mean +0.25 std": sample(rng, args.live, shift=0.25 * std),
+        "mean +0.5 std": sample(rng, args.live, shift=0.5 * std),
+        "spread x1.3": sample(rng, args.live, scale=1.3),
+    }
+    stats = training_stats(train, args.bins, True)
+    for name, live in cases.items():
+        _, report = drift_report(stats, live)
+        feats = report["features"].values()
+        print(f"{name:<20} max PSI {max(s['psi'] for s in feats):6.3f}  "
+              f"max KS {max(s['ks'] for s in feats):6.3f}  status {report['status']}")
+    _, report = drift_report(training_stats(train, args.bins, False), cases["same distribution"])
+    print(f"{'no histogram':<20} status {report['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_fleet_rollup.py
+# Fleet rollups: cost of observe() on the request path, and window query
+# latency as traffic grows, next to recomputing the same figures from the
+# raw readings.
+#
+#   python backend/benchmarks/bench_fleet_rollup.py --volumes 10000,100000,1000000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from bench_utils import summarize, format_summary, random_readings
+
+import app as backend_app
+from services.fleet_rollup import FleetRollups, WINDOWS
+
+FEATURES = backend_app.FEATURES
+WEEK = 7 * 86400
+
+
+def feed(rollups, kernel, rows, ts, chunk=1000):
+    """Observe ``rows`` in chunks stamped with ``ts`` (one timestamp per chunk)."""
+    for base in range(0, len(rows), chunk):
+        rollups.observe(kernel, rows[base:base + chunk], now=ts[base])
+
+
+def rescan(raw, abnormal, prob, ts, now, window, lo, hi, bins):
+    """The same window figures computed from the raw readings."""
+    mask = ts >= now - WINDOWS[window][0]
+    x = raw[mask]
+    out = {
+        "count": int(mask.sum()),
+        "abnormal_rate": float(abnormal[mask].mean()),
+        "prob_hist": np.histogram(prob[mask], bins=20, range=(0.0, 1.0))[0],
+        "mean": x.mean(axis=0),
+        "std": x.std(axis=0),
+    }
+    out["hist"] = [np.histogram(x[:, i], bins=bins, range=(lo[i], hi[i]))[0] for i in range(len(lo))]
+    return out
+
+
+def time_calls(fn, repeat):
+    latencies = []
+    t_start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--volumes", default="10000,100000,1000000")
+    parser.add_argument("--observe", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="snapshot files for the merged query")
+    args = parser.parse_args()
+
+    bundle = backend_app.registry.current
+    kernel = bundle.kernel
+    rnd = random.Random(0)
+    readings = random_readings(bundle.stats, FEATURES, 5000, spread=2)
+    raws = [[r[f] for f in FEATURES] for r in readings]
+
+    # request path: one observe() per reading, as /predict does
+    rollups = FleetRollups(FEATURES)
+    rows = [(None, "predict", rnd.random() < 0.1, rnd.random(), raws[i % len(raws)])
+            for i in range(args.observe)]
+    t0 = time.perf_counter()
+    for row in rows:
+        rollups.observe(kernel, [row])
+    per_row = (time.perf_counter() - t0) / len(rows)
+    print(f"observe(), one row per call          {per_row * 1e6:8.2f}us/row")
+    rollups = FleetRollups(FEATURES)
+    t0 = time.perf_counter()
+    feed(rollups, kernel, rows, [time.time()] * len(rows), chunk=500)
+    print(f"observe(), 500 rows per call         {(time.perf_counter() - t0) / len(rows) * 1e6:8.2f}us/row")
+
+    now = time.time()
+    for volume in [int(v) for v in args.volumes.split(",")]:
+        ts = np.sort(now - np.random.default_rng(0).random(volume) * WEEK)
+        prob = np.random.default_rng(1).random(volume)
+        abnormal = prob > 0.9
+        raw = np.array([raws[i % len(raws)] for i in range(volume)])
+        rows = [(None, "predict", a, p, r) for a, p, r in zip(abnormal.tolist(), prob.tolist(), raw.tolist())]
+
+        rollups = FleetRollups(FEATURES)
+        feed(rollups, kernel, rows, ts.tolist())
+        for window in WINDOWS:
+            s = time_calls(lambda: rollups.query(window, now=now), args.repeat)
+            print(format_summary(f"{volume:>8} rows, rollup {window}", s))
+        s = time_calls(lambda: rescan(raw, abnormal, prob, ts, now, "week",
+                                      kernel.lo, kernel.hi, rollups.feature_bins),
+                       max(1, args.repeat // 20))
+        print(format_summary(f"{volume:>8} rows, rescan week", s))
+
+    # several gunicorn workers: every query merges the other workers' snapshots
+    with tempfile.TemporaryDirectory(prefix="bench_fleet_") as directory:
+        rollups = FleetRollups(FEATURES, directory=directory)
+        feed(rollups, kernel, rows, ts.tolist())
+        rollups.flush()
+        own = os.path.join(directory, f"{os.getpid()}.npz")
+        for i in range(args.workers - 1):
+            os.link(own, os.path.join(directory, f"copy{i}.npz"))
+        for window in WINDOWS:
+            s = time_calls(lambda: rollups.query(window, now=now), args.repeat)
+            print(format_summary(f"{args.workers} workers merged, {window}", s))
+
+
+if __name__ == "__main__":
+    main()
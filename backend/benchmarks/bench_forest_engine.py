@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_forest_engine.py
+# Parity check and latency comparison: sklearn predict_proba vs FlatForest.
+#
+#   python backend/benchmarks/bench_forest_engine.py --rows 10000
+# Exits non-zero if the flat engine disagrees with sklearn.
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from bench_utils import BACKEND_DIR, summarize, format_summary, random_readings
+
+import os
+import json
+import joblib
+import pandas as pd
+
+from services.forest_engine import FlatForest
+
+MODEL_PATH = os.path.join(BACKEND_DIR, "models", "rf_zfail.joblib")
+STATS_JSON = os.path.join(BACKEND_DIR, "stats_table.json")
+FEATURES = ["TP2", "TP3", "H1", "Oil_temperature", "DV_pressure"]
+
+
+def time_calls(fn, X, repeat):
+    latencies = []
+    t_start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(X)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlatForest parity and latency benchmark")
+    parser.add_argument("--rows", type=int, default=10000, help="rows for the parity check")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    t0 = time.perf_counter()
+    flat = FlatForest.from_sklearn(model)
+    print(f"export: {(time.perf_counter() - t0) * 1000:.1f}ms, "
+          f"{flat.n_trees} trees, {flat.nbytes / 1024:.1f} KB")
+
+    with open(STATS_JSON) as f:
+        stats = json.load(f)
+    readings = random_readings(stats, FEATURES, args.rows, spread=3.0)
+    X = np.array([[r[f] for f in FEATURES] for r in readings])
+
+    # checked as is and with a tenth of the cells NaN (missing_go_to_left routing)
+    X_nan = X.copy()
+    X_nan[np.random.default_rng(0).random(X.shape) < 0.1] = np.nan
+    for label, data in (("", X), (", 10% NaN", X_nan)):
+        expected = model.predict_proba(pd.DataFrame(data, columns=FEATURES))
+        got = flat.predict_proba(data)
+        max_diff = float(np.abs(expected - got).max())
+        print(f"parity{label}: {args.rows} rows, max |diff| = {max_diff:.3g}")
+        if not np.allclose(expected, got, rtol=0, atol=1e-12):
+            print("FAIL: flat engine does not match sklearn")
+            sys.exit(1)
+
+    for n in (1, 100, 1000):
+        Xn = X[:n]
+        df = pd.DataFrame(Xn, columns=FEATURES)
+        repeat = args.repeat if n < 1000 else max(5, args.repeat // 5)
+        print(format_summary(f"sklearn  batch={n}", time_calls(lambda _: model.predict_proba(df), Xn, repeat)))
+        print(format_summary(f"flat     batch={n}", time_calls(flat.predict_proba, Xn, repeat)))
+
+
+if __name__ == "__main__":
+    main()
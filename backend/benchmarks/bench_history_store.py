@@ -0,0 +1,166 @@
+# backend/benchmarks/bench_history_store.py
+# Prediction history: request-path cost of recording, batched writer vs a
+# commit per reading, and range-query latency on a large table.
+#
+#   python backend/benchmarks/bench_history_store.py --rows 2000000 --machines 1000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import summarize, format_summary, random_readings, auth_headers
+
+_tmp_dir = tempfile.mkdtemp(prefix="bench_history_")
+os.environ["HISTORY_DB_FILE"] = os.path.join(_tmp_dir, "app.db")
+
+import app as backend_app
+from services.history_store import HistoryStore, TABLE
+
+FEATURES = backend_app.FEATURES
+
+
+def predict_latency(client, readings, n, history):
+    backend_app.history = history
+    headers = auth_headers()
+    latencies = []
+    t_start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        client.post("/predict", json=readings[i % len(readings)], headers=headers)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t_start
+    if history is not None:
+        history.flush()
+    return summarize(latencies, elapsed)
+
+
+def bench_writes(bundle, readings, n):
+    rows = [
+        (f"m{i % 100}", "predict", False, 0.2, [r[f] for f in FEATURES])
+        for i, r in enumerate(readings[:n])
+    ]
+
+    # one INSERT + COMMIT per reading, as a naive per-request write would do
+    store = HistoryStore(os.path.join(_tmp_dir, "per_row.db"), FEATURES)
+    conn = store._connect()
+    t0 = time.perf_counter()
+    for row in rows:
+        with conn:
+            conn.executemany(store._insert_sql,
+                             store._rows_for([(time.time(), bundle.version, bundle.kernel, [row])]))
+    per_row = time.perf_counter() - t0
+
+    store = HistoryStore(os.path.join(_tmp_dir, "batched.db"), FEATURES)
+    t0 = time.perf_counter()
+    for row in rows:
+        store.record(bundle.version, bundle.kernel, [row])
+    enqueue = time.perf_counter() - t0
+    store.flush()
+    batched = time.perf_counter() - t0
+    print(f"commit per reading       {n / per_row:10.0f} rows/s")
+    print(f"background writer        {n / batched:10.0f} rows/s "
+          f"(record() {enqueue / n * 1e6:.1f}us/row, {store.stats['batches']} commits)")
+
+
+def populate(path, n_rows, n_machines, days, bundle):
+    """Synthetic history spread evenly over ``days``, inserted directly."""
+    store = HistoryStore(path, FEATURES)
+    conn = store._connect()
+    rnd = random.Random(0)
+    t_end = time.time()
+    t_begin = t_end - days * 86400
+    step = (t_end - t_begin) / n_rows
+    mean = [bundle.stats[f]["mean"] for f in FEATURES]
+    std = [bundle.stats[f]["std"] for f in FEATURES]
+    chunk = 50000
+    t0 = time.perf_counter()
+    for base in range(0, n_rows, chunk):
+        idx = range(base, min(n_rows, base + chunk))
+        raw = [[rnd.gauss(m, s) for m, s in zip(mean, std)] for _ in idx]
+        z = bundle.kernel.zscores(raw).tolist()
+        rows = [
+            (t_begin + i * step, f"m{rnd.randrange(n_machines)}", "predict",
+             int(rnd.random() < 0.05), rnd.random(), bundle.version, *r, *zr)
+            for i, r, zr in zip(idx, raw, z)
+        ]
+        with conn:
+            conn.executemany(store._insert_sql, rows)
+    conn.close()
+    print(f"populated {n_rows} rows in {time.perf_counter() - t0:.1f}s "
+          f"({os.path.getsize(path) / 1e6:.0f} MB)")
+    return store, t_begin, t_end
+
+
+def time_query(label, fn, repeat):
+    latencies = []
+    t_start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    print(format_summary(label, summarize(latencies, time.perf_counter() - t_start)))
+
+
+def bench_queries(store, n_machines, t_begin, t_end, repeat):
+    rnd = random.Random(1)
+    mid = (t_begin + t_end) / 2
+
+    time_query("machine, 1 day, 500 rows",
+               lambda: store.query(machine_id=f"m{rnd.randrange(n_machines)}",
+                                   start=mid, end=mid + 86400, limit=500), repeat)
+    time_query("machine, latest 100 (desc)",
+               lambda: store.query(machine_id=f"m{rnd.randrange(n_machines)}",
+                                   limit=100, descending=True), repeat)
+    time_query("fleet, 1 hour, 500 rows",
+               lambda: store.query(start=mid, end=mid + 3600, limit=500), repeat)
+    time_query("fleet alerts, 1 day, 500 rows",
+               lambda: store.query(start=mid, end=mid + 86400, status="Abnormal", limit=500), repeat)
+
+    # a page deep into one machine's history and the fleet's: keyset cursor vs OFFSET
+    conn = store._reader()
+    cols = store._select_cols
+    for label, where, params, offset in (
+        ("machine", "WHERE machine_id = ?", ("m0",), 1500),
+        ("fleet", "", (), 1000000),
+    ):
+        after = conn.execute(f"SELECT ts, id FROM {TABLE} {where} ORDER BY ts, id "
+                             f"LIMIT 1 OFFSET {offset - 1}", params).fetchone()
+        keyset = (f"SELECT {cols} FROM {TABLE} {where} {'AND' if where else 'WHERE'} "
+                  f"(ts, id) > (?, ?) ORDER BY ts, id LIMIT 500")
+        time_query(f"{label} row {offset} by cursor",
+                   lambda: conn.execute(keyset, params + tuple(after)).fetchall(), repeat)
+        sql = f"SELECT {cols} FROM {TABLE} {where} ORDER BY ts, id LIMIT 500 OFFSET {offset}"
+        time_query(f"{label} row {offset} by OFFSET",
+                   lambda: conn.execute(sql, params).fetchall(), max(1, repeat // 10))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--machines", type=int, default=1000)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bundle = backend_app.registry.current
+    readings = random_readings(bundle.stats, FEATURES, max(args.requests, args.writes), spread=2)
+    client = backend_app.app.test_client()
+    history = backend_app.history
+
+    predict_latency(client, readings, 50, None)  # warm-up
+    print(format_summary("/predict, no history", predict_latency(client, readings, args.requests, None)))
+    print(format_summary("/predict, history on", predict_latency(client, readings, args.requests, history)))
+
+    bench_writes(bundle, readings, args.writes)
+
+    path = os.path.join(_tmp_dir, "large.db")
+    store, t_begin, t_end = populate(path, args.rows, args.machines, args.days, bundle)
+    bench_queries(store, args.machines, t_begin, t_end, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
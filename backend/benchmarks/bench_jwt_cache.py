@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_jwt_cache.py
+# Bearer token verification with and without the verified-token cache:
+# the bare verify_token call, and an authenticated /stats request (cheap
+# enough that the auth check shows up in the request latency).
+#
+#   python backend/benchmarks/bench_jwt_cache.py --calls 20000
+
+import argparse
+import time
+
+from bench_utils import summarize, format_summary, auth_headers
+
+import app as backend_app
+from utils import jwt_utils
+from utils.jwt_utils import VerifiedTokenCache, verify_token
+
+
+def run(fn, n):
+    latencies = []
+    t_start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached vs uncached JWT verification")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--gateways", type=int, default=50, help="distinct tokens in rotation")
+    args = parser.parse_args()
+
+    tokens = [auth_headers(f"gw{i}@example.com")["Authorization"][7:] for i in range(args.gateways)]
+    cache = VerifiedTokenCache(max_size=10000)
+
+    print(format_summary("verify_token uncached",
+                         run(lambda i: verify_token(tokens[i % len(tokens)], cache=None), args.calls)))
+    print(format_summary("verify_token cached",
+                         run(lambda i: verify_token(tokens[i % len(tokens)], cache=cache), args.calls)))
+    print(f"{'':<32} hits={cache.hits} misses={cache.misses}")
+
+    client = backend_app.app.test_client()
+    headers = [{"Authorization": "Bearer " + t} for t in tokens]
+
+    def stats(i):
+        resp = client.get("/stats", headers=headers[i % len(headers)])
+        assert resp.status_code == 200, resp.get_json()
+
+    shared = jwt_utils.token_cache
+    jwt_utils.token_cache = None
+    print(format_summary("/stats uncached", run(stats, args.requests)))
+    jwt_utils.token_cache = shared
+    print(format_summary("/stats cached", run(stats, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/benchmarks/bench_login_storm.py
+# /predict latency while a login storm runs, with bcrypt bounded by the
+# PasswordHasher executor vs effectively unbounded (one slot per thread).
+#
+#   python backend/benchmarks/bench_login_storm.py --login-threads 32 --seconds 5
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from bench_utils import summarize, format_summary, random_readings, auth_headers
+
+_tmp_db = tempfile.NamedTemporaryFile(prefix="bench_storm_", suffix=".db", delete=False)
+_tmp_db.close()
+os.environ["AUTH_DB_FILE"] = _tmp_db.name
+
+import app as backend_app
+import init_auth_db
+from services import user_service
+from services.password_hasher import PasswordHasher
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+def predict_latency(client, readings, stop):
+    headers = auth_headers()
+    latencies = []
+    t_start = time.perf_counter()
+    i = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        client.post("/predict", json=readings[i % len(readings)], headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def run_phase(client, readings, login_threads, seconds):
+    stop = threading.Event()
+    codes = {}
+    lock = threading.Lock()
+
+    def login_loop():
+        while not stop.is_set():
+            resp = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            with lock:
+                codes[resp.status_code] = codes.get(resp.status_code, 0) + 1
+            if resp.status_code == 503:
+                time.sleep(0.05)  # a real client backs off on Retry-After
+
+    storm = [threading.Thread(target=login_loop) for _ in range(login_threads)]
+    for t in storm:
+        t.start()
+    timer = threading.Timer(seconds, stop.set)
+    timer.start()
+    summary = predict_latency(client, readings, stop)
+    for t in storm:
+        t.join()
+    return summary, codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/predict latency during a login storm")
+    parser.add_argument("--login-threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=2, help="bounded hasher workers")
+    parser.add_argument("--queue", type=int, default=8, help="bounded hasher queue limit")
+    args = parser.parse_args()
+
+    try:
+        init_auth_db.main()
+        user_service.password_hasher = PasswordHasher(rounds=args.rounds)
+        user_service.create_user("storm", EMAIL, PASSWORD)
+
+        client = backend_app.app.test_client()
+        readings = random_readings(backend_app.registry.current.stats, backend_app.FEATURES, 500)
+
+        stop = threading.Event()
+        threading.Timer(args.seconds, stop.set).start()
+        print(format_summary("predict, idle", predict_latency(client, readings, stop)))
+
+        phases = [
+            (f"predict, storm, bounded {args.workers}+{args.queue}",
+             PasswordHasher(args.workers, args.queue, args.rounds)),
+            ("predict, storm, unbounded",
+             PasswordHasher(args.login_threads, args.login_threads, args.rounds)),
+        ]
+        for label, hasher in phases:
+            user_service.password_hasher = hasher
+            summary, codes = run_phase(client, readings, args.login_threads, args.seconds)
+            print(format_summary(label, summary))
+            m = hasher.metrics()
+            print(f"{'':<32} login status={codes} hash p50={m['latency_ms']['p50']:.1f}ms "
+                  f"p95={m['latency_ms']['p95']:.1f}ms rejected={m['rejected']}")
+    finally:
+        os.unlink(_tmp_db.name)
+
+
+if __name__ == "__main__":
+    main()
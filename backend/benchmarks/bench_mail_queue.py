@@ -0,0 +1,117 @@
+# backend/benchmarks/bench_mail_queue.py
+# /auth/forgot-password latency and delivered mails/sec, sending inline vs
+# through the background MailQueue, against a local aiosmtpd stand-in.
+#
+#   pip install aiosmtpd
+#   python backend/benchmarks/bench_mail_queue.py --requests 100 --handshake-ms 300
+#
+# --handshake-ms delays each SMTP EHLO to stand in for the TLS handshake and
+# round trips to a remote provider.
+
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+
+from bench_utils import summarize, format_summary
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+PORT = free_port()
+_tmp_db = tempfile.NamedTemporaryFile(prefix="bench_mail_", suffix=".db", delete=False)
+_tmp_db.close()
+os.environ.update({
+    "AUTH_DB_FILE": _tmp_db.name,
+    "MAIL_SERVER": "127.0.0.1",
+    "MAIL_PORT": str(PORT),
+    "MAIL_USE_SSL": "False",
+    "MAIL_USE_TLS": "False",
+    "MAIL_USERNAME": "",
+    "MAIL_DEFAULT_SENDER": "noreply@example.com",
+    "BCRYPT_ROUNDS": "4",
+})
+
+from aiosmtpd.controller import Controller
+
+import app as backend_app
+import init_auth_db
+from services.mail_queue import MailQueue
+from services.user_service import create_user
+
+
+class CountingHandler:
+    def __init__(self, handshake_s):
+        self.handshake_s = handshake_s
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_s)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def run(client, emails, handler, mail_queue=None):
+    backend_app.app.mail_queue = mail_queue
+    before = handler.received
+    latencies = []
+    t_start = time.perf_counter()
+    for email in emails:
+        t0 = time.perf_counter()
+        resp = client.post("/auth/forgot-password", json={"email": email})
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status_code == 200, resp.get_json()
+    request_elapsed = time.perf_counter() - t_start
+    if mail_queue is not None:
+        mail_queue.join()
+    delivered_elapsed = time.perf_counter() - t_start
+    delivered = handler.received - before
+    return summarize(latencies, request_elapsed), delivered / delivered_elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs queued OTP mail delivery")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=200.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=20)
+    args = parser.parse_args()
+
+    handler = CountingHandler(args.handshake_ms / 1000.0)
+    controller = Controller(handler, hostname="127.0.0.1", port=PORT)
+    controller.start()
+    try:
+        init_auth_db.main()
+        emails = [f"user{i}@example.com" for i in range(10)]
+        for email in emails:
+            create_user("bench", email, "bench-password")
+        targets = [emails[i % len(emails)] for i in range(args.requests)]
+        client = backend_app.app.test_client()
+
+        summary, rate = run(client, targets, handler)
+        print(format_summary("inline mail.send", summary))
+        print(f"{'':<32} delivered {rate:,.1f} mails/s")
+
+        queue = MailQueue(backend_app.app, backend_app.mail,
+                          workers=args.workers, batch_size=args.batch)
+        summary, rate = run(client, targets, handler, queue)
+        print(format_summary("queued (persistent SMTP)", summary))
+        print(f"{'':<32} delivered {rate:,.1f} mails/s, "
+              f"{queue.stats['connections']} SMTP connections for {queue.stats['sent']} mails")
+    finally:
+        controller.stop()
+        os.unlink(_tmp_db.name)
+
+
+if __name__ == "__main__":
+    main()
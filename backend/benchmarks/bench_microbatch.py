@@ -0,0 +1,70 @@
+# backend/benchmarks/bench_microbatch.py
+# Compare single-row /predict throughput with and without the micro-batcher.
+#
+#   python backend/benchmarks/bench_microbatch.py --threads 32 --requests 200
+
+import argparse
+import threading
+import time
+
+from bench_utils import summarize, format_summary, random_readings, auth_headers
+
+import app as backend_app
+from services.micro_batcher import MicroBatcher
+
+
+def run_load(client, readings, threads, per_thread):
+    headers = auth_headers()
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        local = []
+        barrier.wait()
+        for i in range(per_thread):
+            row = readings[(offset + i) % len(readings)]
+            t0 = time.perf_counter()
+            resp = client.post("/predict", json=row, headers=headers)
+            local.append(time.perf_counter() - t0)
+            assert resp.status_code == 200, resp.get_json()
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(i * per_thread,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return summarize(latencies, time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching benchmark for /predict")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="requests per thread")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    client = backend_app.app.test_client()
+    readings = random_readings(backend_app.registry.current.stats, backend_app.FEATURES, 1000)
+
+    backend_app.predict_batcher = None
+    direct = run_load(client, readings, args.threads, args.requests)
+
+    backend_app.predict_batcher = MicroBatcher(
+        backend_app.rf_positive_proba_rows,
+        max_batch_size=args.max_batch,
+        window_ms=args.window_ms,
+    )
+    batched = run_load(client, readings, args.threads, args.requests)
+
+    print(f"threads={args.threads} requests/thread={args.requests}")
+    print(format_summary("direct (one call per request)", direct))
+    print(format_summary(f"micro-batched ({args.window_ms}ms/{args.max_batch})", batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_otp.py
+# OTP lookups and expiry sweeping on a large otp_requests table.
+#
+#   python backend/benchmarks/bench_otp.py --rows 1000000
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from bench_utils import summarize, format_summary
+
+_tmp_db = tempfile.NamedTemporaryFile(prefix="bench_otp_", suffix=".db", delete=False)
+_tmp_db.close()
+os.environ["AUTH_DB_FILE"] = _tmp_db.name
+
+import init_auth_db
+from services.otp_service import hash_otp, verify_otp, sweep_expired_otps
+
+
+def fill(rows, expired_ratio):
+    """rows OTPs over rows // 3 emails; expired_ratio of them already expired."""
+    now = int(time.time())
+    rnd = random.Random(0)
+    n_emails = max(1, rows // 3)
+    conn = sqlite3.connect(_tmp_db.name)
+    batch = []
+    for i in range(rows):
+        expires = now - rnd.randint(1, 86400) if rnd.random() < expired_ratio else now + 300
+        batch.append((f"user{i % n_emails}@example.com", hash_otp(str(100000 + i % 900000)), expires))
+        if len(batch) == 50000:
+            conn.executemany("INSERT INTO otp_requests (email, otp, expires_at) VALUES (?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO otp_requests (email, otp, expires_at) VALUES (?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+    return n_emails
+
+
+def time_verifies(n_emails, lookups):
+    rnd = random.Random(1)
+    latencies = []
+    t_start = time.perf_counter()
+    for _ in range(lookups):
+        i = rnd.randrange(n_emails)
+        t0 = time.perf_counter()
+        verify_otp(f"user{i}@example.com", str(100000 + i % 900000))
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def set_indexes(enabled):
+    conn = sqlite3.connect(_tmp_db.name)
+    if enabled:
+        for sql in init_auth_db.CREATE_OTP_INDEXES_SQL:
+            conn.execute(sql)
+    else:
+        conn.execute("DROP INDEX IF EXISTS idx_otp_email_otp_expires")
+        conn.execute("DROP INDEX IF EXISTS idx_otp_expires")
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OTP table benchmark")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--expired", type=float, default=0.5, help="fraction already expired")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1000, help="sweeper batch size")
+    args = parser.parse_args()
+
+    try:
+        init_auth_db.main()
+        t0 = time.perf_counter()
+        n_emails = fill(args.rows, args.expired)
+        print(f"filled {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+        set_indexes(False)
+        print(format_summary("verify_otp, no index", time_verifies(n_emails, max(5, args.lookups // 20))))
+        set_indexes(True)
+        print(format_summary("verify_otp, indexed", time_verifies(n_emails, args.lookups)))
+
+        t0 = time.perf_counter()
+        removed = sweep_expired_otps(batch_size=args.batch)
+        elapsed = time.perf_counter() - t0
+        print(f"sweep: removed {removed} expired rows in {elapsed:.2f}s "
+              f"({removed / elapsed:,.0f} rows/s, batches of {args.batch})")
+        print(format_summary("verify_otp, after sweep", time_verifies(n_emails, args.lookups)))
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(_tmp_db.name + suffix):
+                os.unlink(_tmp_db.name + suffix)
+
+
+if __name__ == "__main__":
+    main()
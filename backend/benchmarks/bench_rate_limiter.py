@@ -0,0 +1,117 @@
+# backend/benchmarks/bench_rate_limiter.py
+# Admission control: cost of a bucket take() per backend, overhead of the
+# hook on /predict, and a well-behaved client's latency while another
+# client floods /predict, with limits off and on.
+#
+#   python backend/benchmarks/bench_rate_limiter.py --flooders 4 --seconds 5
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from bench_utils import summarize, format_summary, random_readings, auth_headers
+
+import app as backend_app
+from services.rate_limiter import AdmissionController, LocalBuckets, RouteLimit, SqliteBuckets
+
+FEATURES = backend_app.FEATURES
+
+
+def bench_take(n):
+    with tempfile.TemporaryDirectory(prefix="bench_rl_") as directory:
+        for name, backend in (("local", LocalBuckets()),
+                              ("sqlite", SqliteBuckets(os.path.join(directory, "rl.db")))):
+            t0 = time.perf_counter()
+            for i in range(n):
+                backend.take(f"predict|user:{i % 1000}", 100.0, 200.0)
+            print(f"take(), {name:<6} backend          {(time.perf_counter() - t0) / n * 1e6:8.2f}us")
+
+
+def limited(rate, burst):
+    return AdmissionController(LocalBuckets(), [
+        RouteLimit("predict", rate, burst, 64),
+        RouteLimit("auth", 0, 1, 0),
+        RouteLimit("api", 0, 1, 0),
+    ])
+
+
+def run_client(client, reading, headers, stop, latencies, codes):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        code = client.post("/predict", json=reading, headers=headers).status_code
+        latencies.append(time.perf_counter() - t0)
+        codes[code] = codes.get(code, 0) + 1
+
+
+def flood(admission, readings, flooders, seconds):
+    """One polite client (10 req/s) next to ``flooders`` threads of another client."""
+    backend_app.admission = admission
+    client = backend_app.app.test_client()
+    stop = threading.Event()
+    flood_codes, flood_lat = {}, []
+    threads = [
+        threading.Thread(target=run_client, args=(client, readings[0], auth_headers("flood@example.com"),
+                                                  stop, flood_lat, flood_codes), daemon=True)
+        for _ in range(flooders)
+    ]
+    for t in threads:
+        t.start()
+    polite_headers = auth_headers("polite@example.com")
+    latencies = []
+    t_start = time.perf_counter()
+    while time.perf_counter() - t_start < seconds:
+        t0 = time.perf_counter()
+        client.post("/predict", json=readings[1], headers=polite_headers)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, 0.1 - (time.perf_counter() - t0)))
+    stop.set()
+    for t in threads:
+        t.join()
+    return summarize(latencies, time.perf_counter() - t_start), flood_codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--takes", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--flooders", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=20.0, help="per-client limit in the flood run")
+    args = parser.parse_args()
+
+    bench_take(args.takes)
+
+    # the whole hook: identity from the (cached) JWT, take(), concurrency slot
+    backend_app.admission = limited(1e9, 1e9)
+    headers = auth_headers()
+    authorization = headers["Authorization"]
+    t0 = time.perf_counter()
+    for _ in range(args.takes):
+        cls, _, _ = backend_app.admit_request("/predict", authorization, "10.0.0.1")
+        backend_app.admission.release(cls)
+    print(f"admit_request() + release()        {(time.perf_counter() - t0) / args.takes * 1e6:8.2f}us")
+
+    bundle = backend_app.registry.current
+    readings = random_readings(bundle.stats, FEATURES, 2)
+    client = backend_app.app.test_client()
+    for label, admission in (("/predict, no limits", None),
+                             ("/predict, limits (not hit)", limited(1e9, 1e9))):
+        backend_app.admission = admission
+        latencies = []
+        t_start = time.perf_counter()
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            client.post("/predict", json=readings[0], headers=headers)
+            latencies.append(time.perf_counter() - t0)
+        print(format_summary(label, summarize(latencies, time.perf_counter() - t_start)))
+
+    for label, admission in (("polite client, no limits", None),
+                             (f"polite client, {args.rate:g} req/s", limited(args.rate, args.rate))):
+        s, codes = flood(admission, readings, args.flooders, args.seconds)
+        print(format_summary(label, s) + f"  flooder: {dict(sorted(codes.items()))}")
+
+
+if __name__ == "__main__":
+    main()
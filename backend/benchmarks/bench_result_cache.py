@@ -0,0 +1,101 @@
+# backend/benchmarks/bench_result_cache.py
+# /predict latency and cache hit rate on a replayed trace, with and without
+# the prediction result cache, plus how far cached probabilities drift from
+# freshly scored ones.
+#
+#   python backend/benchmarks/bench_result_cache.py --machines 20 --requests 3000
+#   python backend/benchmarks/bench_result_cache.py --trace readings.ndjson
+#
+# Without --trace, a trace is synthesised: each machine holds a set-point near
+# the training mean, and its sensors report it with small jitter at a 3-decimal
+# resolution. Every ``--shift-every`` readings the set-point moves, to mimic
+# load changes.
+
+import argparse
+import json
+import random
+import time
+
+from bench_utils import summarize, format_summary, auth_headers
+
+import app as backend_app
+from services.result_cache import PredictionCache
+
+
+def synth_trace(stats, features, machines, n, jitter, shift_every, seed=0):
+    rnd = random.Random(seed)
+
+    def setpoint():
+        return {f: rnd.gauss(stats[f]["mean"], stats[f]["std"] * 0.5) for f in features}
+
+    points = [setpoint() for _ in range(machines)]
+    trace = []
+    for i in range(n):
+        m = i % machines
+        if shift_every and i and i % shift_every == 0:
+            points[rnd.randrange(machines)] = setpoint()
+        trace.append({
+            f: round(points[m][f] + rnd.gauss(0, stats[f]["std"] * jitter), 3)
+            for f in features
+        })
+    return trace
+
+
+def load_trace(path, features):
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [{k: float(r[k]) for k in features} for r in rows]
+
+
+def replay(client, trace, headers):
+    latencies, probs = [], []
+    t_start = time.perf_counter()
+    for row in trace:
+        t0 = time.perf_counter()
+        resp = client.post("/predict", json=row, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status_code == 200, resp.get_json()
+        probs.append(resp.get_json()["prob_within_2months"])
+    return summarize(latencies, time.perf_counter() - t_start), probs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction result cache on a replayed trace")
+    parser.add_argument("--trace", help="NDJSON readings to replay instead of a synthetic trace")
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--jitter", type=float, default=0.002, help="sensor noise, in training stds")
+    parser.add_argument("--shift-every", type=int, default=500)
+    parser.add_argument("--precision", type=int, default=2)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--ttl", type=float, default=300.0)
+    args = parser.parse_args()
+
+    stats = backend_app.registry.current.stats
+    features = backend_app.FEATURES
+    if args.trace:
+        trace = load_trace(args.trace, features)
+    else:
+        trace = synth_trace(stats, features, args.machines, args.requests,
+                            args.jitter, args.shift_every)
+
+    client = backend_app.app.test_client()
+    headers = auth_headers()
+
+    backend_app.prediction_cache = None
+    base, base_probs = replay(client, trace, headers)
+    print(format_summary("no cache", base))
+
+    cache = PredictionCache(max_size=args.size, ttl=args.ttl, precision=args.precision)
+    backend_app.prediction_cache = cache
+    cached, cached_probs = replay(client, trace, headers)
+    print(format_summary(f"cache (precision={args.precision})", cached))
+
+    m = cache.metrics()
+    drift = max(abs(a - b) for a, b in zip(base_probs, cached_probs))
+    print(f"{'':<32} hit rate {m['hit_rate']:.1%} ({m['hits']} hits, {m['misses']} misses, "
+          f"{m['size']} entries), max |prob diff| {drift:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# backend/benchmarks/bench_scoring_kernel.py
+# Parity check and timing of ScoringKernel against the per-row dict-based
+# scoring and the vectorized batch path app.py used before it (kept here as
+# reference implementations). The RF is left out: both sides get the same
+# rf_prob.
+#
+#   python backend/benchmarks/bench_scoring_kernel.py --rows 5000
+#
+# Exits non-zero if status, warnings or probability (beyond --tol) differ.
+
+import argparse
+import copy
+import sys
+import time
+
+import numpy as np
+
+from bench_utils import random_readings
+
+import app as backend_app
+from services.scoring_kernel import ScoringKernel
+
+FEATURES = backend_app.FEATURES
+
+
+def logistic(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def z_score_for_row(row, stats):
+    z_scores = {}
+    for f in FEATURES:
+        mu = stats[f]["mean"]
+        sd = stats[f]["std"] if stats[f]["std"] != 0 else 1.0
+        z_scores[f] = (row[f] - mu) / sd
+    return z_scores
+
+
+def compute_prob_within_2months(max_abs_z, rf_prob):
+    base_risk = logistic(backend_app.ALPHA * (max_abs_z - backend_app.Z0))
+    w_rf = 0.45 if rf_prob is not None else 0.0
+    w_z = 1.0 - w_rf
+    combined = w_z * base_risk + (w_rf * rf_prob if rf_prob else 0.0)
+    return float(np.clip(combined, 0.0, 1.0))
+
+
+def compute_prob_within_2months_batch(max_abs_z, rf_prob):
+    base_risk = logistic(backend_app.ALPHA * (max_abs_z - backend_app.Z0))
+    w_rf = 0.45 if rf_prob is not None else 0.0
+    w_z = 1.0 - w_rf
+    combined = w_z * base_risk + (w_rf * rf_prob if rf_prob is not None else 0.0)
+    return np.clip(combined, 0.0, 1.0)
+
+
+def clip_to_training_range(raw, stats):
+    lo = np.array([stats[f]["min"] for f in FEATURES])
+    hi = np.array([stats[f]["max"] for f in FEATURES])
+    out_of_range = (raw < lo) | (raw > hi)
+    processed = np.where(hi < raw, hi, raw)
+    processed = np.where(processed > lo, processed, lo)
+    return processed, out_of_range
+
+
+def reference_row(raw_inputs, stats, rf_prob):
+    """The dict-based per-row scoring /predict used before the kernel."""
+    warnings_list = []
+    processed = raw_inputs.copy()
+    for f in FEATURES:
+        if raw_inputs[f] < stats[f]["min"] or raw_inputs[f] > stats[f]["max"]:
+            warnings_list.append(f)
+        processed[f] = max(stats[f]["min"], min(raw_inputs[f], stats[f]["max"]))
+    z_scores = z_score_for_row(processed, stats)
+    max_abs_z = max(abs(v) for v in z_scores.values())
+    status = "Abnormal" if max_abs_z > backend_app.Z_THRESHOLD else "Normal"
+    prob = compute_prob_within_2months(max_abs_z, rf_prob)
+    return status, warnings_list, prob
+
+
+def reference_matrix(raw, stats, rf_prob):
+    """The previous vectorized score_matrix, minus the model call."""
+    mu = np.array([stats[f]["mean"] for f in FEATURES])
+    sd = np.array([stats[f]["std"] if stats[f]["std"] != 0 else 1.0 for f in FEATURES])
+    processed, out_of_range = clip_to_training_range(raw, stats)
+    max_abs_z = np.abs((processed - mu) / sd).max(axis=1)
+    prob = compute_prob_within_2months_batch(max_abs_z, rf_prob)
+    return out_of_range, max_abs_z > backend_app.Z_THRESHOLD, prob
+
+
+def kernel_row(kernel, raw_inputs, rf_prob):
+    processed, out_of_range, max_abs_z = kernel.prepare_row([raw_inputs[f] for f in FEATURES])
+    warnings_list = [f for f, flag in zip(FEATURES, out_of_range) if flag]
+    abnormal, prob = kernel.blend_row(max_abs_z, rf_prob)
+    return ("Abnormal" if abnormal else "Normal"), warnings_list, prob
+
+
+def kernel_array_row(kernel, raw_inputs, rf_prob):
+    processed, out_of_range, max_abs_z = kernel.prepare([raw_inputs[f] for f in FEATURES])
+    warnings_list = [f for f, flag in zip(FEATURES, out_of_range[0].tolist()) if flag]
+    abnormal, prob = kernel.blend(max_abs_z, rf_prob)
+    return ("Abnormal" if abnormal[0] else "Normal"), warnings_list, float(prob[0])
+
+
+def edge_rows(stats):
+    rows = []
+    for f in FEATURES:
+        for v in (stats[f]["min"], stats[f]["max"], stats[f]["min"] - 1, stats[f]["max"] + 1,
+                  float("nan"), float("inf"), -float("inf")):
+            row = {g: stats[g]["mean"] for g in FEATURES}
+            row[f] = v
+            rows.append(row)
+    return rows
+
+
+def check_parity(stats, readings, rf_probs, tol):
+    kernel = ScoringKernel(stats, FEATURES, backend_app.Z_THRESHOLD, backend_app.ALPHA, backend_app.Z0)
+    failures = 0
+    max_diff = 0.0
+    for row, rf in zip(readings, rf_probs):
+        for rf_arg in (rf, None):
+            ref = reference_row(row, stats, rf_arg)
+            for got in (kernel_row(kernel, row, rf_arg), kernel_array_row(kernel, row, rf_arg)):
+                diff = abs(ref[2] - got[2])
+                max_diff = max(max_diff, diff)
+                if ref[0] != got[0] or ref[1] != got[1] or diff > tol:
+                    failures += 1
+                    if failures <= 5:
+                        print(f"  mismatch rf={rf_arg} row={row}: ref={ref} kernel={got}")
+
+    raw = np.array([[r[f] for f in FEATURES] for r in readings])
+    ref_oor, ref_abn, ref_prob = reference_matrix(raw, stats, rf_probs)
+    processed, oor, max_abs_z = kernel.prepare(raw)
+    abn, prob = kernel.blend(max_abs_z, rf_probs)
+    batch_ok = (oor == ref_oor).all() and (abn == ref_abn).all() and np.abs(prob - ref_prob).max() <= tol
+    if not batch_ok:
+        failures += 1
+        print("  batch mismatch")
+    return failures, max(max_diff, float(np.abs(prob - ref_prob).max()))
+
+
+def per_call_us(fn, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ScoringKernel parity and speed")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--tol", type=float, default=1e-12)
+    args = parser.parse_args()
+
+    stats = backend_app.registry.current.stats
+    readings = random_readings(stats, FEATURES, args.rows, spread=3.0) + edge_rows(stats)
+    rng = np.random.default_rng(0)
+    rf_probs = rng.random(len(readings))
+
+    # a zero std must behave like z_score_for_row (divide by 1)
+    zero_std = copy.deepcopy(stats)
+    zero_std[FEATURES[0]]["std"] = 0.0
+
+    failures = 0
+    for label, table in (("stats_table.json", stats), ("zero std", zero_std)):
+        n_fail, max_diff = check_parity(table, readings, rf_probs, args.tol)
+        print(f"parity [{label}]: {len(readings)} rows, {n_fail} mismatches, max |prob diff| {max_diff:.2e}")
+        failures += n_fail
+
+    kernel = backend_app.registry.current.kernel
+    rows = readings[:1000]
+    raw = np.array([[r[f] for f in FEATURES] for r in rows])
+    rf = rf_probs[:1000]
+
+    print(f"\n{'path':<36}{'us/call':>10}")
+    print(f"{'per-row dict scoring':<36}{per_call_us(lambda i: reference_row(rows[i % 1000], stats, rf[i % 1000]), 20000):10.2f}")
+    print(f"{'per-row kernel (scalar path)':<36}{per_call_us(lambda i: kernel_row(kernel, rows[i % 1000], rf[i % 1000]), 20000):10.2f}")
+    print(f"{'per-row kernel (1-row arrays)':<36}{per_call_us(lambda i: kernel_array_row(kernel, rows[i % 1000], rf[i % 1000]), 20000):10.2f}")
+    print(f"{'batch of 1000, previous vectorized':<36}{per_call_us(lambda i: reference_matrix(raw, stats, rf), 500):10.2f}")
+
+    def kernel_batch(i):
+        _, _, max_abs_z = kernel.prepare(raw)
+        kernel.blend(max_abs_z, rf)
+
+    print(f"{'batch of 1000, kernel':<36}{per_call_us(kernel_batch, 500):10.2f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
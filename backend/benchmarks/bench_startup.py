@@ -0,0 +1,71 @@
+# backend/benchmarks/bench_startup.py
+# Cold-start cost of `import app`: a `python -X importtime` breakdown of the
+# slowest top-level imports, and time until the model is warm for each
+# MODEL_WARMUP mode. Every measurement runs in a fresh interpreter.
+#
+#   python backend/benchmarks/bench_startup.py --runs 3
+
+import argparse
+import os
+import subprocess
+import sys
+
+from bench_utils import BACKEND_DIR
+
+READY_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import app
+t_import = time.perf_counter() - t0
+app.registry.current  # waits for the warm-up thread, or loads lazily
+print(t_import, time.perf_counter() - t0)
+"""
+
+
+def importtime(env):
+    """{module: cumulative microseconds} for imports nested at most one level deep."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) <= 3:
+            out[name.strip()] = int(cumulative)
+    return out
+
+
+def time_to_ready(env):
+    proc = subprocess.run(
+        [sys.executable, "-c", READY_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    t_import, t_ready = proc.stdout.split()[-2:]
+    return float(t_import), float(t_ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and warm-up time of app.py")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for mode in ("eager", "background", "lazy"):
+        env = dict(os.environ, MODEL_WARMUP=mode, PYTHONWARNINGS="ignore")
+        timings = sorted(time_to_ready(env) for _ in range(args.runs))
+        t_import, t_ready = timings[len(timings) // 2]
+        print(f"MODEL_WARMUP={mode:<11} import {t_import * 1000:8.1f}ms   "
+              f"model warm {t_ready * 1000:8.1f}ms")
+
+    env = dict(os.environ, MODEL_WARMUP="background", PYTHONWARNINGS="ignore")
+    modules = importtime(env)
+    print("\n-X importtime, slowest top-level imports (MODEL_WARMUP=background):")
+    for name, us in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# backend/benchmarks/bench_utils.py
+# Shared helpers for the benchmark scripts in this folder.
+
+import os
+import sys
+import time
+import atexit
+import random
+import shutil
+import tempfile
+
+# the benchmarks drive one client far past any sane per-client rate; the
+# admission layer is measured on its own by bench_rate_limiter.py
+os.environ["RATE_LIMIT_ENABLED"] = "False"
+
+# scored readings go to a throwaway history DB, never the deployment's
+_history_dir = tempfile.mkdtemp(prefix="bench_history_")
+atexit.register(shutil.rmtree, _history_dir, True)
+os.environ.setdefault("HISTORY_DB_FILE", os.path.join(_history_dir, "history.db"))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def summarize(latencies_s, elapsed_s):
+    """Latency percentiles (ms) and throughput for a list of per-call timings."""
+    lat = sorted(latencies_s)
+    return {
+        "n": len(lat),
+        "p50_ms": percentile(lat, 50) * 1000,
+        "p95_ms": percentile(lat, 95) * 1000,
+        "p99_ms": percentile(lat, 99) * 1000,
+        "rps": len(lat) / elapsed_s if elapsed_s > 0 else 0.0,
+    }
+
+
+def format_summary(name, s):
+    return (
+        f"{name:<32} n={s['n']:<7} p50={s['p50_ms']:8.3f}ms "
+        f"p95={s['p95_ms']:8.3f}ms p99={s['p99_ms']:8.3f}ms rps={s['rps']:10.1f}"
+    )
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def random_readings(stats, features, n, spread=1.5, seed=0):
+    """Readings drawn around the training mean/std, some outside min/max."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        rows.append({
+            f: rnd.gauss(stats[f]["mean"], stats[f]["std"] * spread)
+            for f in features
+        })
+    return rows
+
+
+def auth_headers(email="bench@example.com"):
+    """Authorization header with a freshly issued JWT for the protected endpoints."""
+    from utils.jwt_utils import generate_token
+    return {"Authorization": "Bearer " + generate_token({"id": 0, "name": "bench", "email": email})}
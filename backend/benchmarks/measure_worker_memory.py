@@ -0,0 +1,113 @@
+# backend/benchmarks/measure_worker_memory.py
+# Per-worker RSS/PSS of a local gunicorn for different model loading modes.
+#
+#   python backend/export_flat_model.py          # needed for the mmap mode
+#   python backend/benchmarks/measure_worker_memory.py --workers 4
+#
+# Linux only: reads /proc/<pid>/smaps_rollup. PSS splits shared pages
+# between the processes mapping them, so it shows how much each worker
+# really costs; RSS counts shared pages in full for every worker.
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from bench_utils import BACKEND_DIR, auth_headers
+
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+
+MODES = [
+    ("sklearn, no preload", {"INFERENCE_ENGINE": "sklearn", "GUNICORN_PRELOAD": "False"}),
+    ("sklearn, preload", {"INFERENCE_ENGINE": "sklearn", "GUNICORN_PRELOAD": "True"}),
+    ("mmap, preload", {"INFERENCE_ENGINE": "mmap", "GUNICORN_PRELOAD": "True"}),
+]
+
+ROW = {"TP2": 1.0, "TP3": 9.0, "H1": 8.0, "Oil_temperature": 66.0, "DV_pressure": 0.0}
+
+
+def smaps_rollup(pid):
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0] in ("Rss:", "Pss:"):
+                out[parts[0][:-1].lower()] = int(parts[1])  # kB
+    return out
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            req = urllib.request.Request(url + "/stats", headers=auth_headers())
+            urllib.request.urlopen(req, timeout=1).read()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def warm(url, n):
+    body = json.dumps(ROW).encode()
+    for _ in range(n):
+        req = urllib.request.Request(
+            url + "/predict", data=body, headers={"Content-Type": "application/json", **auth_headers()}
+        )
+        urllib.request.urlopen(req, timeout=30).read()
+
+
+def measure(label, env_overrides, workers, port, warm_requests):
+    env = dict(os.environ, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "backend.app:app",
+         "-w", str(workers), "-b", f"127.0.0.1:{port}"],
+        cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_ready(url, 120):
+            print(f"{label}: gunicorn did not come up")
+            return None
+        warm(url, warm_requests)
+        time.sleep(0.5)
+        pids = child_pids(proc.pid)
+        mem = [smaps_rollup(p) for p in pids]
+        master = smaps_rollup(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+    rss = sum(m["rss"] for m in mem) / len(mem) / 1024
+    pss = sum(m["pss"] for m in mem) / len(mem) / 1024
+    total_pss = (sum(m["pss"] for m in mem) + master["pss"]) / 1024
+    print(f"{label:<22} workers={len(mem)} avg RSS={rss:7.1f} MB  "
+          f"avg PSS={pss:7.1f} MB  total PSS (incl. master)={total_pss:7.1f} MB")
+    return {"rss_mb": rss, "pss_mb": pss, "total_pss_mb": total_pss}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory by model loading mode")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--warm-requests", type=int, default=40)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(BACKEND_DIR, "models", "rf_zfail.flat", "meta.json")):
+        print("note: run backend/export_flat_model.py first, or mmap mode falls back to in-memory")
+
+    for label, env in MODES:
+        measure(label, env, args.workers, args.port, args.warm_requests)
+
+
+if __name__ == "__main__":
+    main()
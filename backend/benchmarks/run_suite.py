@@ -0,0 +1,237 @@
+# backend/benchmarks/run_suite.py
+# Benchmark suite for the prediction and auth endpoints plus hot-path
+# microbenchmarks, run in-process through Flask's test client.
+#
+#   python backend/benchmarks/run_suite.py --output bench.json
+#   python backend/benchmarks/run_suite.py --baseline bench.json --output new.json
+#
+# Results are written as JSON ({"meta": ..., "results": {name: summary}}).
+# With --baseline, every benchmark is compared on p50 latency and rps, and
+# the script exits non-zero if anything regressed by more than --tolerance.
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+from bench_utils import summarize, format_summary, random_readings, auth_headers
+
+# isolated auth DB for signup/login runs; must be set before app is imported
+_tmp_db = tempfile.NamedTemporaryFile(prefix="bench_auth_", suffix=".db", delete=False)
+_tmp_db.close()
+os.environ.setdefault("AUTH_DB_FILE", _tmp_db.name)
+atexit.register(lambda: os.path.exists(_tmp_db.name) and os.unlink(_tmp_db.name))
+
+import numpy as np
+
+import app as backend_app
+import init_auth_db
+
+
+def run_sequential(fn, n):
+    latencies = []
+    t_start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def run_concurrent(fn, threads, per_thread):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        local = []
+        barrier.wait()
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            fn(offset + i)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    t_start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def expect(resp, status):
+    if resp.status_code != status:
+        raise RuntimeError(f"unexpected {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+    return resp
+
+
+# (method, path) of every route that must answer 401 without a valid token
+PROTECTED_ROUTES = (
+    ("POST", "/predict"),
+    ("POST", "/predict/batch"),
+    ("POST", "/predict/rolling"),
+    ("POST", "/predict/stream"),
+    ("GET", "/stats"),
+    ("GET", "/history"),
+    ("GET", "/drift"),
+)
+
+
+def check_auth_guard():
+    """Fail the run if either serving mode answers a protected route without a token."""
+    from starlette.testclient import TestClient
+    import asgi
+
+    clients = (("flask", backend_app.app.test_client()), ("asgi", TestClient(asgi.app)))
+    failures = []
+    for mode, client in clients:
+        for method, path in PROTECTED_ROUTES:
+            for headers in ({}, {"Authorization": "Bearer garbage"}):
+                resp = client.open(path, method=method, headers=headers) if mode == "flask" \
+                    else client.request(method, path, headers=headers)
+                if resp.status_code != 401:
+                    failures.append(f"{mode} {method} {path} {headers or 'no token'} -> {resp.status_code}")
+    if failures:
+        raise RuntimeError("protected routes served without auth:\n  " + "\n  ".join(failures))
+    print(f"auth guard: {len(PROTECTED_ROUTES)} protected routes answer 401 in flask and asgi mode")
+
+
+def build_benchmarks(args):
+    client = backend_app.app.test_client()
+    bundle = backend_app.registry.current
+    features = backend_app.FEATURES
+    readings = random_readings(bundle.stats, features, 1000)
+    rows = np.array([[r[f] for f in features] for r in readings])
+    n = args.requests
+
+    init_auth_db.main()
+    password = "bench-password"
+    expect(client.post("/auth/signup", json={
+        "name": "bench", "email": "bench@example.com", "password": password
+    }), 201)
+    run_id = int(time.time() * 1000)
+    headers = auth_headers()
+
+    def predict(i):
+        expect(client.post("/predict", json=readings[i % len(readings)], headers=headers), 200)
+
+    def stats(i):
+        expect(client.get("/stats", headers=headers), 200)
+
+    def login(i):
+        expect(client.post("/auth/login", json={
+            "email": "bench@example.com", "password": password
+        }), 200)
+
+    def signup(i):
+        expect(client.post("/auth/signup", json={
+            "name": "bench", "email": f"bench-{run_id}-{i}@example.com", "password": password
+        }), 201)
+
+    def model_call(i):
+        backend_app.rf_positive_proba(rows[i % len(rows)][np.newaxis, :], bundle.model)
+
+    def prepare_row(i):
+        bundle.kernel.prepare_row(rows[i % len(rows)].tolist())
+
+    def score_matrix_row(i):
+        backend_app.score_matrix(rows[i % len(rows)][np.newaxis, :], bundle)
+
+    result = backend_app.score_batch([readings[0]], bundle)[0]
+    encoded = json.dumps(result)
+
+    def json_roundtrip(i):
+        json.loads(json.dumps(result))
+
+    def json_decode(i):
+        json.loads(encoded)
+
+    auth_n = max(1, n // 10)  # bcrypt makes these ~100x slower than /predict
+    return [
+        ("predict.single", lambda: run_sequential(predict, n)),
+        ("predict.concurrent", lambda: run_concurrent(predict, args.threads, max(1, n // args.threads))),
+        ("stats", lambda: run_sequential(stats, n)),
+        ("auth.login", lambda: run_sequential(login, auth_n)),
+        ("auth.signup", lambda: run_sequential(signup, auth_n)),
+        ("micro.model_call", lambda: run_sequential(model_call, n)),
+        ("micro.kernel_prepare_row", lambda: run_sequential(prepare_row, n * 10)),
+        ("micro.score_matrix_row", lambda: run_sequential(score_matrix_row, n * 10)),
+        ("micro.json_roundtrip", lambda: run_sequential(json_roundtrip, n * 10)),
+        ("micro.json_decode", lambda: run_sequential(json_decode, n * 10)),
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas against a baseline run; returns the names that regressed."""
+    regressed = []
+    print(f"\n{'benchmark':<28}{'p50 base':>12}{'p50 now':>12}{'rps base':>12}{'rps now':>12}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slower = now["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+        fewer = now["rps"] < base["rps"] * (1 - tolerance)
+        flag = "  REGRESSED" if slower or fewer else ""
+        if flag:
+            regressed.append(name)
+        print(f"{name:<28}{base['p50_ms']:12.3f}{now['p50_ms']:12.3f}"
+              f"{base['rps']:12.1f}{now['rps']:12.1f}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction/auth benchmark suite")
+    parser.add_argument("--requests", type=int, default=200, help="iterations per endpoint benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--only", default="", help="comma-separated name prefixes to run")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression ratio")
+    args = parser.parse_args()
+
+    if backend_app.Config.API_AUTH_REQUIRED:
+        check_auth_guard()
+
+    prefixes = [p for p in args.only.split(",") if p]
+    results = {}
+    for name, bench in build_benchmarks(args):
+        if prefixes and not any(name.startswith(p) for p in prefixes):
+            continue
+        results[name] = bench()
+        print(format_summary(name, results[name]))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model_version": backend_app.registry.current.version,
+            "requests": args.requests,
+            "threads": args.threads,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nSaved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"\nRegressed: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
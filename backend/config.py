@@ -6,6 +6,10 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret")
     JWT_EXPIRES_IN = int(os.getenv("JWT_EXPIRES_IN", "3600"))
+    # Bearer token check on the prediction/stats endpoints, and how many
+    # verified tokens to remember (utils/jwt_utils.py)
+    API_AUTH_REQUIRED = os.getenv("API_AUTH_REQUIRED", "True") == "True"
+    JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
     MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "True") == "True"
@@ -13,3 +17,147 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", MAIL_USERNAME)
     OTP_EXPIRATION_MINUTES = int(os.getenv("OTP_EXPIRATION_MINUTES", "5"))
+
+    # /predict micro-batching: coalesce concurrent single-row model calls
+    PREDICT_MICROBATCH = os.getenv("PREDICT_MICROBATCH", "False") == "True"
+    PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2"))
+    PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+
+    # Model load at startup: "eager" (at import), "background" (warm-up thread)
+    # or "lazy" (first request that needs it)
+    MODEL_WARMUP = os.getenv("MODEL_WARMUP", "background").lower()
+
+    # RF inference engine: "sklearn" (predict_proba), "flat" (services/forest_engine.py)
+    # or "mmap" (flat arrays memory-mapped from models/rf_zfail.flat, shared by workers)
+    INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+
+    # /predict result cache keyed on readings rounded to PREDICT_CACHE_PRECISION
+    # decimals plus the model version (services/result_cache.py)
+    PREDICT_CACHE = os.getenv("PREDICT_CACHE", "False") == "True"
+    PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "50000"))
+    PREDICT_CACHE_TTL_S = float(os.getenv("PREDICT_CACHE_TTL_S", "300"))
+    PREDICT_CACHE_PRECISION = int(os.getenv("PREDICT_CACHE_PRECISION", "2"))
+
+    # /metrics: per-worker snapshots go to METRICS_DIR so any worker can serve
+    # the aggregate (empty = this process only). PROFILE_SAMPLE_PERCENT of
+    # requests are run under cProfile and dumped to PROFILE_DIR.
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL_S = float(os.getenv("METRICS_FLUSH_INTERVAL_S", "5"))
+    PROFILE_SAMPLE_PERCENT = float(os.getenv("PROFILE_SAMPLE_PERCENT", "0"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+    # asgi.py: scoring threads, extra calls allowed to wait for one (503
+    # beyond that), and threads running the mounted Flask routes. Scoring
+    # mostly holds the GIL, so scale it with workers rather than threads.
+    ASGI_SCORE_WORKERS = int(os.getenv("ASGI_SCORE_WORKERS", "1"))
+    ASGI_SCORE_QUEUE = int(os.getenv("ASGI_SCORE_QUEUE", "64"))
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "16"))
+
+    # /predict/stream: readings scored per chunk
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "500"))
+
+    # Per-machine rolling windows (/predict/rolling)
+    ROLLING_WINDOW = int(os.getenv("ROLLING_WINDOW", "32"))
+    ROLLING_MAX_MACHINES = int(os.getenv("ROLLING_MAX_MACHINES", "100000"))
+    ROLLING_IDLE_TTL_S = float(os.getenv("ROLLING_IDLE_TTL_S", "3600"))
+
+    # Prediction history (services/history_store.py): every scored reading is
+    # queued and written in batches of up to HISTORY_BATCH_SIZE rows by a
+    # background thread; GET /history pages at most HISTORY_MAX_PAGE rows.
+    # Rows older than HISTORY_RETENTION_DAYS are deleted every
+    # HISTORY_PRUNE_INTERVAL_S (0 days = keep everything)
+    HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "True") == "True"
+    HISTORY_DB_FILE = os.getenv(
+        "HISTORY_DB_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.db")
+    )
+    HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "1000"))
+    HISTORY_FLUSH_INTERVAL_S = float(os.getenv("HISTORY_FLUSH_INTERVAL_S", "0.5"))
+    HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+    HISTORY_MAX_PAGE = int(os.getenv("HISTORY_MAX_PAGE", "5000"))
+    HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+    HISTORY_PRUNE_INTERVAL_S = float(os.getenv("HISTORY_PRUNE_INTERVAL_S", "300"))
+
+    # Live fleet rollups (services/fleet_rollup.py) behind /stats?window=.
+    # With several workers, set FLEET_ROLLUP_DIR so each one's buckets are
+    # merged into every answer (like METRICS_DIR).
+    FLEET_ROLLUPS = os.getenv("FLEET_ROLLUPS", "True") == "True"
+    FLEET_PROB_BINS = int(os.getenv("FLEET_PROB_BINS", "20"))
+    FLEET_FEATURE_BINS = int(os.getenv("FLEET_FEATURE_BINS", "20"))
+    FLEET_ROLLUP_DIR = os.getenv("FLEET_ROLLUP_DIR", "")
+    FLEET_ROLLUP_FLUSH_INTERVAL_S = float(os.getenv("FLEET_ROLLUP_FLUSH_INTERVAL_S", "5"))
+
+    # Input drift (services/drift_monitor.py): PSI / KS of the rollup feature
+    # histograms for DRIFT_WINDOW against stats_table.json, recomputed every
+    # DRIFT_INTERVAL_S and served on /drift. Needs FLEET_ROLLUPS and a stats
+    # table built with save_stats.py --hist-bins (features without a training
+    # histogram report "no_reference").
+    DRIFT_MONITOR = os.getenv("DRIFT_MONITOR", "False") == "True"
+    DRIFT_WINDOW = os.getenv("DRIFT_WINDOW", "hour")
+    DRIFT_INTERVAL_S = float(os.getenv("DRIFT_INTERVAL_S", "60"))
+    DRIFT_MIN_COUNT = int(os.getenv("DRIFT_MIN_COUNT", "200"))
+    DRIFT_PSI_WARN = float(os.getenv("DRIFT_PSI_WARN", "0.1"))
+    DRIFT_PSI_ALERT = float(os.getenv("DRIFT_PSI_ALERT", "0.25"))
+    DRIFT_KS_ALERT = float(os.getenv("DRIFT_KS_ALERT", "0.1"))
+
+    # Admission control (services/rate_limiter.py), off unless enabled:
+    # per-client token buckets per route class -> 429, and at most
+    # CONCURRENCY_* requests of a class in flight per worker -> 503 (0 = off).
+    # Clients are the JWT user when a valid token is sent (IP on /auth/*), else
+    # the remote address. Behind a reverse proxy (Render, nginx) every request
+    # has the proxy's address, so set RATE_LIMIT_TRUST_PROXY=True to key on
+    # the first X-Forwarded-For hop instead -- only when the proxy sets it.
+    # RATE_LIMIT_BACKEND "local" keeps buckets per process, "sqlite" shares
+    # them between the workers on a host through RATE_LIMIT_DB_FILE.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "False") == "True"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+    RATE_LIMIT_DB_FILE = os.getenv(
+        "RATE_LIMIT_DB_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_limits.db")
+    )
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "False") == "True"
+    # /predict* (requests per second and burst per client)
+    RATE_LIMIT_PREDICT_RPS = float(os.getenv("RATE_LIMIT_PREDICT_RPS", "100"))
+    RATE_LIMIT_PREDICT_BURST = float(os.getenv("RATE_LIMIT_PREDICT_BURST", "200"))
+    CONCURRENCY_PREDICT = int(os.getenv("CONCURRENCY_PREDICT", "64"))
+    # /auth/* (bcrypt, SQLite and SMTP behind every call)
+    RATE_LIMIT_AUTH_RPS = float(os.getenv("RATE_LIMIT_AUTH_RPS", "0.2"))
+    RATE_LIMIT_AUTH_BURST = float(os.getenv("RATE_LIMIT_AUTH_BURST", "10"))
+    CONCURRENCY_AUTH = int(os.getenv("CONCURRENCY_AUTH", "16"))
+    # everything else except /ready, /metrics and the / and /dashboard pages
+    RATE_LIMIT_API_RPS = float(os.getenv("RATE_LIMIT_API_RPS", "20"))
+    RATE_LIMIT_API_BURST = float(os.getenv("RATE_LIMIT_API_BURST", "50"))
+    CONCURRENCY_API = int(os.getenv("CONCURRENCY_API", "32"))
+
+    # Hot reload of model + stats: admin endpoint token, file watcher poll (0 = off)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", "0"))
+
+    # Auth DB backend: "sqlite" (auth_database.py) or "mysql" (mysql_database.py)
+    DB_BACKEND = os.getenv("DB_BACKEND", "sqlite").lower()
+    MYSQL_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")
+    MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3306"))
+    MYSQL_USER = os.getenv("MYSQL_USER", "root")
+    MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
+    MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "predictive_maintenance")
+    MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "10"))
+    MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "5"))
+    MYSQL_PING_INTERVAL = float(os.getenv("MYSQL_PING_INTERVAL", "30"))
+
+    # Password hashing: bcrypt cost and bounded executor (503 beyond workers + queue)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+    HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "16"))
+    HASH_TIMEOUT_S = float(os.getenv("HASH_TIMEOUT_S", "30"))
+
+    # Expired OTP cleanup (0 disables the background sweeper)
+    OTP_SWEEP_INTERVAL_S = float(os.getenv("OTP_SWEEP_INTERVAL_S", "300"))
+    OTP_SWEEP_BATCH_SIZE = int(os.getenv("OTP_SWEEP_BATCH_SIZE", "1000"))
+
+    # Background mail delivery (services/mail_queue.py)
+    MAIL_ASYNC = os.getenv("MAIL_ASYNC", "True") == "True"
+    MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "1"))
+    MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+    MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+    MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", "3"))
+    MAIL_RETRY_BACKOFF_S = float(os.getenv("MAIL_RETRY_BACKOFF_S", "1"))
+    MAIL_IDLE_CLOSE_S = float(os.getenv("MAIL_IDLE_CLOSE_S", "30"))
@@ -8,10 +8,12 @@ CREATE TABLE IF NOT EXISTS otp_requests (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     email TEXT NOT NULL,
     otp TEXT NOT NULL,
-    expires_at TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,
     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 """)
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_otp_email_otp_expires ON otp_requests (email, otp, expires_at)")
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_otp_expires ON otp_requests (expires_at)")
 
 conn.commit()
 conn.close()
@@ -1,8 +1,32 @@
 # backend/database.py
-# Compatibility shim: use the SQLite wrapper we created (auth_database.py)
-# so existing auth services that expect get_db_connection() continue to work.
+# Backend selector for the auth services: they import get_db_connection()
+# (and IntegrityError) from here and stay unaware of which database is used.
+#   DB_BACKEND=sqlite -> auth_database.py (SQLite wrapper, %s -> ?)
+#   DB_BACKEND=mysql  -> mysql_database.py (pooled PyMySQL)
 
-from auth_database import get_db_connection
+import sqlite3
+from contextlib import contextmanager
+
+import pymysql
+
+from config import Config
+from services.metrics import stage
+
+if Config.DB_BACKEND == "mysql":
+    from mysql_database import get_db_connection as _backend_connection
+elif Config.DB_BACKEND == "sqlite":
+    from auth_database import get_db_connection as _backend_connection
+else:
+    raise RuntimeError(f"Unknown DB_BACKEND: {Config.DB_BACKEND}")
+
+@contextmanager
+def get_db_connection():
+    """Backend connection; the time it is held is recorded as the auth 'db' stage."""
+    with stage("auth", "db"), _backend_connection() as conn:
+        yield conn
+
+# Unique-constraint violations from either backend
+IntegrityError = (sqlite3.IntegrityError, pymysql.err.IntegrityError)
 
 # Provide the same name used in the auth services to import the db connection
-__all__ = ["get_db_connection"]
+__all__ = ["get_db_connection", "IntegrityError"]
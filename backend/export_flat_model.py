@@ -0,0 +1,25 @@
+# backend/export_flat_model.py
+# Export models/rf_zfail.joblib into the memory-mappable FlatForest layout
+# used by INFERENCE_ENGINE=mmap. Re-run whenever the joblib model changes:
+# each run writes a new models/rf_zfail.flat.v<ns> directory and swaps the
+# models/rf_zfail.flat symlink to it, so running workers can keep their
+# mapping of the old files and pick up the new ones on hot reload.
+
+import os
+import joblib
+
+from services.forest_engine import FlatForest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "rf_zfail.joblib")
+FLAT_MODEL_DIR = os.path.join(BASE_DIR, "models", "rf_zfail.flat")
+
+
+def main():
+    forest = FlatForest.from_sklearn(joblib.load(MODEL_PATH))
+    version = forest.save(FLAT_MODEL_DIR)
+    print(f"Exported {forest.n_trees} trees ({forest.nbytes / 1024:.1f} KB) to {version}")
+
+
+if __name__ == "__main__":
+    main()
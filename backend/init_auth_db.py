@@ -1,5 +1,6 @@
 # backend/init_auth_db.py
-from auth_database import get_db_connection
+from config import Config
+from database import get_db_connection
 
 CREATE_USERS_SQL = """
 CREATE TABLE IF NOT EXISTS users (
@@ -16,16 +17,67 @@ CREATE TABLE IF NOT EXISTS otp_requests (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   email TEXT NOT NULL,
   otp TEXT NOT NULL,
-  expires_at DATETIME NOT NULL,
+  expires_at INTEGER NOT NULL,
   created_at DATETIME DEFAULT (datetime('now'))
 );
 """
 
+# verify_otp looks up (email, otp) and checks expiry from the index alone;
+# the sweeper deletes by expires_at
+CREATE_OTP_INDEXES_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_otp_email_otp_expires ON otp_requests (email, otp, expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_otp_expires ON otp_requests (expires_at)",
+]
+
+# older databases stored expires_at as 'YYYY-MM-DD HH:MM:SS' text (UTC);
+# julianday() is used because the wrapper rewrites every %s to ?
+MIGRATE_OTP_EXPIRES_SQL = """
+UPDATE otp_requests
+SET expires_at = CAST((julianday(expires_at) - 2440587.5) * 86400 AS INTEGER)
+WHERE typeof(expires_at) = 'text'
+"""
+
+CREATE_USERS_SQL_MYSQL = """
+CREATE TABLE IF NOT EXISTS users (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(255),
+  email VARCHAR(255) NOT NULL UNIQUE,
+  password_hash VARCHAR(255) NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+CREATE_OTPS_SQL_MYSQL = """
+CREATE TABLE IF NOT EXISTS otp_requests (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  email VARCHAR(255) NOT NULL,
+  otp CHAR(64) NOT NULL,
+  expires_at BIGINT NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
 def main():
+    if Config.DB_BACKEND == "mysql":
+        statements = [CREATE_USERS_SQL_MYSQL, CREATE_OTPS_SQL_MYSQL]
+    else:
+        statements = [CREATE_USERS_SQL, CREATE_OTPS_SQL, MIGRATE_OTP_EXPIRES_SQL]
+
     with get_db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute(CREATE_USERS_SQL)
-        cur.execute(CREATE_OTPS_SQL)
+        with conn.cursor() as cur:
+            for sql in statements:
+                cur.execute(sql)
+            for sql in CREATE_OTP_INDEXES_SQL:
+                if Config.DB_BACKEND == "mysql":
+                    # MySQL has no CREATE INDEX IF NOT EXISTS
+                    sql = sql.replace(" IF NOT EXISTS", "")
+                    try:
+                        cur.execute(sql)
+                    except Exception as e:
+                        if "Duplicate key name" not in str(e):
+                            raise
+                else:
+                    cur.execute(sql)
         print("Auth DB initialized successfully.")
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+# backend/mysql_database.py
+# Pooled PyMySQL backend for the auth services (DB_BACKEND=mysql).
+# Connections are DictCursor connections, so the %s-placeholder services
+# run on them unchanged.
+
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+import pymysql
+import pymysql.cursors
+
+from config import Config
+
+
+class MySQLPool:
+    """
+    Bounded pool of PyMySQL connections. Up to ``size`` connections are
+    opened on demand and reused LIFO, so the warmest connection is handed
+    out first. A connection idle for longer than ``ping_interval`` seconds
+    is pinged (reconnecting if the server dropped it) before reuse.
+    """
+
+    def __init__(self, size, timeout, ping_interval, **connect_kwargs):
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.ping_interval = float(ping_interval)
+        self._connect_kwargs = connect_kwargs
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self):
+        # sockets must not be shared with the parent process
+        with self._lock:
+            if self._pid != os.getpid():
+                self._idle = queue.LifoQueue()
+                self._created = 0
+                self._pid = os.getpid()
+
+    def _connect(self):
+        return pymysql.connect(
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=False,
+            **self._connect_kwargs
+        )
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            try:
+                conn, last_used = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError("No MySQL connection available from pool")
+
+        if time.monotonic() - last_used > self.ping_interval:
+            conn.ping(reconnect=True)
+        return conn
+
+    def release(self, conn, broken=False):
+        if broken:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.release(conn, broken=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MySQLPool(
+                    size=Config.MYSQL_POOL_SIZE,
+                    timeout=Config.MYSQL_POOL_TIMEOUT,
+                    ping_interval=Config.MYSQL_PING_INTERVAL,
+                    host=Config.MYSQL_HOST,
+                    port=Config.MYSQL_PORT,
+                    user=Config.MYSQL_USER,
+                    password=Config.MYSQL_PASSWORD,
+                    database=Config.MYSQL_DATABASE,
+                    charset="utf8mb4",
+                )
+    return _pool
+
+
+@contextmanager
+def get_db_connection():
+    """Context manager that yields a pooled PyMySQL connection (commit on success)."""
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except pymysql.err.OperationalError:
+        broken = True
+        raise
+    except BaseException:
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        raise
+    finally:
+        pool.release(conn, broken=broken)
@@ -16,14 +16,17 @@ from services.user_service import (
     create_user,
     authenticate_user,
     update_user_password,
-    get_user_by_email
+    get_user_by_email,
+    password_hasher
 )
 from services.otp_service import (
     create_otp_request,
     verify_otp,
-    clear_otps
+    clear_otps,
+    start_otp_sweeper
 )
 from services.email_service import send_otp_email
+from services.password_hasher import HasherSaturated
 from utils.jwt_utils import generate_token
 from config import Config
 
@@ -31,6 +34,19 @@ def get_mail():
     """Get mail instance from current app"""
     return current_app.mail
 
+@auth_bp.before_app_request
+def _start_otp_sweeper():
+    # started lazily so each gunicorn worker runs its own sweeper thread
+    start_otp_sweeper()
+
+@auth_bp.errorhandler(HasherSaturated)
+def hasher_saturated(e):
+    return jsonify({'error': 'Server busy, please retry shortly'}), 503, {'Retry-After': '1'}
+
+@auth_bp.route('/hash-metrics', methods=['GET'])
+def hash_metrics():
+    return jsonify(password_hasher.metrics()), 200
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
@@ -43,7 +59,10 @@ def signup():
     if len(password) < 8:
         return jsonify({'error': 'Password must be at least 8 characters'}), 400
 
-    user = create_user(name, email, password)
+    try:
+        user = create_user(name, email, password)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
     token = generate_token(user)
 
     return jsonify({'message': 'User created successfully','user': user,'token': token}), 201
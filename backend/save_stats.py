@@ -1,21 +1,220 @@
-import pandas as pd, json, os
+# backend/save_stats.py
+# Build stats_table.json (mean/std/min/max per feature) from training data.
+#
+#   python save_stats.py                              # data/dataset_train.csv
+#   python save_stats.py part1.csv part2.csv --workers 2
+#   python save_stats.py new_data.csv --update        # merge into existing stats
+#
+# Files are streamed in chunks and reduced in one pass: each chunk gives
+# count/mean/M2/min/max per feature, and partial results are combined with
+# the parallel variance merge (Chan et al.), so memory does not depend on
+# file size. The merge state is kept next to the table in stats_state.json
+# so later runs can --update the stats without re-reading old data.
+#
+# --hist-bins N adds a fixed-bin histogram over [min, max] per feature, the
+# reference distribution for /drift. The bins depend on the final min/max,
+# so this takes a second pass over the inputs; it is off by default. Once a
+# table has histograms, --update keeps them: the old counts are re-binned
+# onto the new [min, max] (spread evenly within each old bin) and the new
+# rows are counted on the new bins.
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
 
 DATASET = os.path.join("data", "dataset_train.csv")
+STATS_JSON = "stats_table.json"
+STATE_JSON = "stats_state.json"
 
 FEATURES = ["TP2", "TP3", "H1", "Oil_temperature", "DV_pressure"]
 
-df = pd.read_csv(DATASET)
 
-stats = {}
-for f in FEATURES:
-    stats[f] = {
-        "mean": float(df[f].mean()),
-        "std": float(df[f].std() if df[f].std() != 0 else 1.0),
-        "min": float(df[f].min()),
-        "max": float(df[f].max())
+def empty_state():
+    n = len(FEATURES)
+    return {
+        "count": np.zeros(n),
+        "mean": np.zeros(n),
+        "m2": np.zeros(n),
+        "min": np.full(n, np.inf),
+        "max": np.full(n, -np.inf),
+    }
+
+
+def chunk_state(df):
+    """Partial stats for one chunk; NaNs are skipped like pandas does."""
+    X = df[FEATURES].to_numpy(dtype=float)
+    nan = np.isnan(X)
+    count = np.sum(~nan, axis=0).astype(float)
+    has = count > 0
+    safe = np.where(has, count, 1.0)
+    mean = np.where(has, np.nansum(X, axis=0) / safe, 0.0)
+    m2 = np.where(has, np.nansum((X - mean) ** 2, axis=0), 0.0)
+    lo = np.min(np.where(nan, np.inf, X), axis=0, initial=np.inf)
+    hi = np.max(np.where(nan, -np.inf, X), axis=0, initial=-np.inf)
+    return {"count": count, "mean": mean, "m2": m2, "min": lo, "max": hi}
+
+
+def merge_states(a, b):
+    """Combine two partial results (Chan et al. parallel variance)."""
+    n = a["count"] + b["count"]
+    safe = np.where(n > 0, n, 1.0)
+    delta = b["mean"] - a["mean"]
+    mean = a["mean"] + delta * b["count"] / safe
+    m2 = a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / safe
+    return {
+        "count": n,
+        "mean": np.where(n > 0, mean, 0.0),
+        "m2": np.where(n > 0, m2, 0.0),
+        "min": np.minimum(a["min"], b["min"]),
+        "max": np.maximum(a["max"], b["max"]),
+    }
+
+
+def file_state(path, chunksize=100000):
+    state = empty_state()
+    for chunk in pd.read_csv(path, usecols=FEATURES, chunksize=chunksize):
+        state = merge_states(state, chunk_state(chunk))
+    return state
+
+
+def file_histograms(path, lo, hi, bins, chunksize=100000):
+    """Counts per feature in ``bins`` equal bins over [lo, hi]; NaNs skipped."""
+    counts = np.zeros((len(FEATURES), bins))
+    for chunk in pd.read_csv(path, usecols=FEATURES, chunksize=chunksize):
+        X = chunk[FEATURES].to_numpy(dtype=float)
+        for i in range(len(FEATURES)):
+            x = X[:, i]
+            x = x[~np.isnan(x)]
+            counts[i] += np.histogram(x, bins=bins, range=(lo[i], max(hi[i], lo[i] + 1e-12)))[0]
+    return counts
+
+
+def build_histograms(paths, state, bins, workers=1, chunksize=100000):
+    lo, hi = state["min"], state["max"]
+    counts = np.zeros((len(FEATURES), bins))
+    n = len(paths)
+    if workers > 1 and n > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(file_histograms, paths, [lo] * n, [hi] * n, [bins] * n, [chunksize] * n):
+                counts += part
+    else:
+        for path in paths:
+            counts += file_histograms(path, lo, hi, bins, chunksize)
+    return counts
+
+
+def rebin(counts, lo, hi, new_lo, new_hi):
+    """Histogram ``counts`` over [lo, hi] re-binned onto as many bins over [new_lo, new_hi]."""
+    counts = np.asarray(counts, dtype=float)
+    bins = len(counts)
+    edges = np.linspace(lo, max(hi, lo + 1e-12), bins + 1)
+    cum = np.concatenate(([0.0], np.cumsum(counts)))
+    new_edges = np.linspace(new_lo, max(new_hi, new_lo + 1e-12), bins + 1)
+    return np.diff(np.interp(new_edges, edges, cum))
+
+
+def _count(c):
+    c = float(c)
+    return int(c) if c.is_integer() else round(c, 3)
+
+
+def to_stats_table(state, histograms=None):
+    """Same schema load_stats() in app.py expects (sample std, ddof=1)."""
+    stats = {}
+    for i, f in enumerate(FEATURES):
+        n = state["count"][i]
+        std = float(np.sqrt(state["m2"][i] / (n - 1))) if n > 1 else float("nan")
+        stats[f] = {
+            "mean": float(state["mean"][i]),
+            "std": float(std if std != 0 else 1.0),
+            "min": float(state["min"][i]),
+            "max": float(state["max"][i])
+        }
+        if histograms is not None:
+            stats[f]["histogram"] = [_count(c) for c in histograms[i]]
+    return stats
+
+
+def save_state(state, path):
+    with open(path, "w") as fh:
+        json.dump({
+            f: {k: float(state[k][i]) for k in state}
+            for i, f in enumerate(FEATURES)
+        }, fh, indent=4)
+
+
+def load_state(path):
+    with open(path, "r") as fh:
+        raw = json.load(fh)
+    return {
+        k: np.array([raw[f][k] for f in FEATURES], dtype=float)
+        for k in ("count", "mean", "m2", "min", "max")
     }
 
-with open("stats_table.json", "w") as fh:
-    json.dump(stats, fh, indent=4)
 
-print("Saved stats_table.json")
\ No newline at end of file
+def build_state(paths, workers=1, chunksize=100000):
+    state = empty_state()
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(file_state, paths, [chunksize] * len(paths)):
+                state = merge_states(state, part)
+    else:
+        for path in paths:
+            state = merge_states(state, file_state(path, chunksize))
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build stats_table.json from training CSVs")
+    parser.add_argument("inputs", nargs="*", default=[DATASET])
+    parser.add_argument("--output", default=STATS_JSON)
+    parser.add_argument("--state", default=None,
+                        help=f"merge state file (default: {STATE_JSON} next to --output)")
+    parser.add_argument("--update", action="store_true",
+                        help="merge the inputs into the existing stats instead of rebuilding")
+    parser.add_argument("--workers", type=int, default=1, help="process files in parallel")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--hist-bins", type=int, default=0,
+                        help="add a per-feature reference histogram with this many bins "
+                             "(second pass over the inputs; kept up to date by --update)")
+    args = parser.parse_args()
+
+    state_path = args.state or os.path.join(os.path.dirname(args.output), STATE_JSON)
+
+    state = build_state(args.inputs, args.workers, args.chunksize)
+    histograms = None
+    if args.update:
+        if not os.path.exists(state_path):
+            raise SystemExit(f"--update needs {state_path} from a previous run")
+        state = merge_states(load_state(state_path), state)
+        previous = {}
+        if os.path.exists(args.output):
+            with open(args.output) as fh:
+                previous = json.load(fh)
+        if all("histogram" in previous.get(f, {}) for f in FEATURES):
+            bins = len(previous[FEATURES[0]]["histogram"])
+            histograms = np.array([
+                rebin(previous[f]["histogram"], previous[f]["min"], previous[f]["max"],
+                      state["min"][i], state["max"][i])
+                for i, f in enumerate(FEATURES)
+            ])
+            histograms += build_histograms(args.inputs, state, bins, args.workers, args.chunksize)
+        elif args.hist_bins > 0:
+            print("--hist-bins ignored with --update: the old rows are not re-read; "
+                  "rebuild without --update to add histograms")
+    elif args.hist_bins > 0:
+        histograms = build_histograms(args.inputs, state, args.hist_bins, args.workers, args.chunksize)
+
+    with open(args.output, "w") as fh:
+        json.dump(to_stats_table(state, histograms), fh, indent=4)
+    save_state(state, state_path)
+
+    print(f"Saved {args.output} ({int(state['count'].max())} rows)")
+
+
+if __name__ == "__main__":
+    main()
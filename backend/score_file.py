@@ -0,0 +1,206 @@
+# backend/score_file.py
+# Offline bulk scorer for historical readings (CSV or Parquet).
+#
+#   python backend/score_file.py data/dataset_train.csv scored.parquet --workers 4
+#
+# The input is read in chunks and each chunk is scored on a process pool with
+# the same logic as /predict (app.score_matrix). Every worker imports app.py,
+# and so loads the model, exactly once. At most `workers * 2` chunks are in
+# flight, so peak memory does not depend on the input size.
+#
+# A cell that is not a number does not stop the run: it is written empty and
+# its row gets status "Error" and "Invalid value for <feature>" in warnings,
+# as /predict/stream reports bad lines. The rows are counted at the end.
+
+import os
+import sys
+import time
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+FEATURES = ["TP2", "TP3", "H1", "Oil_temperature", "DV_pressure"]
+
+_app = None
+
+
+def _init_worker():
+    global _app
+    logging.getLogger().setLevel(logging.WARNING)
+    import app as backend_app
+    _app = backend_app
+
+
+def _score_chunk(raw, invalid):
+    """
+    Score an (n, len(FEATURES)) array. Rows flagged in the ``invalid`` mask
+    are not scored; other rows containing NaN count as missing.
+    """
+    n = raw.shape[0]
+    status = np.full(n, "Abnormal", dtype=object)
+    warnings = np.full(n, "", dtype=object)
+    prob = np.ones(n)
+
+    bad = invalid.any(axis=1)
+    for i in np.flatnonzero(bad):
+        status[i] = "Error"
+        warnings[i] = f"Invalid value for {FEATURES[int(np.argmax(invalid[i]))]}"
+        prob[i] = np.nan
+
+    missing = np.isnan(raw)
+    complete = ~missing.any(axis=1)
+    for i in np.flatnonzero(~complete & ~bad):
+        first = FEATURES[int(np.argmax(missing[i]))]
+        warnings[i] = f"Missing:{first}"
+
+    if complete.any():
+        out_of_range, abnormal, p = _app.score_matrix(raw[complete], _app.registry.current)
+        status[complete] = np.where(abnormal, "Abnormal", "Normal")
+        warnings[complete] = [
+            ";".join(f for f, flag in zip(FEATURES, row) if flag)
+            for row in out_of_range
+        ]
+        prob[complete] = p
+    return status, warnings, prob
+
+
+def read_chunks(path, chunksize):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def to_features(chunk):
+    """
+    (raw, invalid) for a chunk: the FEATURES columns as floats, and a mask
+    of the cells that were present but could not be parsed as numbers
+    (they are NaN in ``raw``).
+    """
+    values = chunk[FEATURES]
+    raw = values.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    invalid = np.isnan(raw) & values.notna().to_numpy()
+    return raw, invalid
+
+
+def output_schema(table):
+    """
+    The Parquet schema every chunk is cast to, from the first chunk.
+    CSV dtypes are inferred per chunk, so integer columns are widened to
+    float64 (a later chunk may have a blank or a fraction in them) and
+    other columns that are empty in the first chunk are written as strings.
+    The features and the probability are always float64.
+    """
+    import pyarrow as pa
+    fields = []
+    for field in table.schema.remove_metadata():
+        if field.name in FEATURES or field.name == "prob_within_2months":
+            field = field.with_type(pa.float64())
+        elif field.name in ("status", "warnings"):
+            field = field.with_type(pa.string())
+        elif table.column(field.name).null_count == table.num_rows:
+            field = field.with_type(pa.string())
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = output_schema(table)
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            try:
+                table = table.cast(self._schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+                raise SystemExit(f"Chunk does not match the output schema: {e}")
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a",
+                      header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score historical sensor readings")
+    parser.add_argument("input", help="CSV or .parquet file with FEATURES columns")
+    parser.add_argument("output", help="CSV or .parquet output file")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    writer = ChunkWriter(args.output)
+    pending = deque()
+    max_in_flight = max(1, args.workers) * 2
+    rows_done = 0
+    rows_invalid = 0
+    t0 = time.perf_counter()
+
+    def drain_one():
+        nonlocal rows_done, rows_invalid
+        chunk, fut = pending.popleft()
+        status, warnings, prob = fut.result()
+        rows_invalid += int((status == "Error").sum())
+        chunk["status"] = status
+        chunk["warnings"] = warnings
+        chunk["prob_within_2months"] = prob
+        writer.write(chunk)
+        rows_done += len(chunk)
+        elapsed = time.perf_counter() - t0
+        print(f"\r{rows_done} rows scored, {rows_done / elapsed:,.0f} rows/sec",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            for chunk in read_chunks(args.input, args.chunksize):
+                missing_cols = [f for f in FEATURES if f not in chunk.columns]
+                if missing_cols:
+                    raise SystemExit(f"Input is missing columns: {missing_cols}")
+                raw, invalid = to_features(chunk)
+                # written as parsed, so the feature columns are float64 in every chunk
+                chunk[FEATURES] = raw
+                pending.append((chunk, pool.submit(_score_chunk, raw, invalid)))
+                if len(pending) >= max_in_flight:
+                    drain_one()
+            while pending:
+                drain_one()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"\nDone: {rows_done} rows in {elapsed:.1f}s -> {args.output}", file=sys.stderr)
+    if rows_invalid:
+        print(f"{rows_invalid} rows had non-numeric values (status Error)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# backend/services/async_pool.py
+# Bounded thread pool for CPU-bound work called from asyncio handlers, so
+# model scoring never runs on the event loop and cannot queue without bound.
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool is at capacity; callers should answer 503."""
+
+
+class AsyncBoundedPool:
+    """
+    Runs calls on ``workers`` threads with at most ``workers + queue_limit``
+    in flight. ``run`` rejects with PoolSaturated when full; ``run_wait``
+    waits for a slot instead (for streams that are already under way).
+    """
+
+    def __init__(self, workers=4, queue_limit=256, name="score"):
+        self.workers = max(1, int(workers))
+        self.queue_limit = max(0, int(queue_limit))
+        self.name = name
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self.rejected = 0
+
+    def _get(self):
+        # one executor + semaphore per process (and per event loop start)
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=self.name
+                    )
+                    self._slots = asyncio.Semaphore(self.workers + self.queue_limit)
+                    self._pid = os.getpid()
+        return self._executor, self._slots
+
+    async def _run(self, executor, slots, fn, args):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            slots.release()
+
+    async def run(self, fn, *args):
+        executor, slots = self._get()
+        if slots.locked():
+            self.rejected += 1
+            raise PoolSaturated(f"{self.name} pool is saturated")
+        await slots.acquire()
+        return await self._run(executor, slots, fn, args)
+
+    async def run_wait(self, fn, *args):
+        executor, slots = self._get()
+        await slots.acquire()
+        return await self._run(executor, slots, fn, args)
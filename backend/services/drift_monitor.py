@@ -0,0 +1,170 @@
+# backend/services/drift_monitor.py
+# PSI and KS drift scores of the live feature distributions against the
+# training distribution in stats_table.json. The live side is the fixed-bin
+# feature histograms the fleet rollups already keep, so the monitor adds no
+# per-reading work and its memory does not grow with traffic.
+
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+# floor for empty bins, so PSI stays finite
+_EPS = 1e-4
+
+STATUS_ORDER = ("no_reference", "insufficient_data", "ok", "watch", "drift")
+
+
+def reference_proportions(edges, ref):
+    """
+    Expected share of training readings below ``edges[0]``, in each bin and
+    above ``edges[-1]``, from the "histogram" save_stats.py --hist-bins
+    records over [min, max], re-binned onto ``edges`` by interpolating its
+    CDF. None when the stats table has no histogram for the feature: mean,
+    std, min and max alone say too little about a skewed feature to score it.
+    """
+    counts = ref.get("histogram")
+    if not counts:
+        return None
+    lo, hi = float(ref["min"]), float(ref["max"])
+    counts = np.asarray(counts, dtype=np.float64)
+    train_edges = np.linspace(lo, max(hi, lo + 1e-12), len(counts) + 1)
+    train_cdf = np.concatenate(([0.0], np.cumsum(counts) / max(counts.sum(), 1.0)))
+    cdf = np.interp(edges, train_edges, train_cdf)
+    return np.concatenate(([cdf[0]], np.diff(cdf), [1.0 - cdf[-1]]))
+
+
+def psi(actual, expected):
+    """Population stability index of two proportion vectors."""
+    a = np.maximum(actual, _EPS)
+    e = np.maximum(expected, _EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_binned(actual, expected):
+    """KS statistic evaluated at the bin edges (a lower bound on the exact one)."""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+class DriftMonitor:
+    """
+    Every ``interval`` seconds (in a background thread, once per process)
+    scores the ``window`` of the fleet rollups against the training stats
+    returned by ``stats_fn``. A feature is "drift" at PSI >= ``psi_alert``
+    or KS >= ``ks_alert``, "watch" at PSI >= ``psi_warn``, and
+    "insufficient_data" with fewer than ``min_count`` readings, and
+    "no_reference" (no PSI/KS) when stats_table.json has no histogram for it.
+    """
+
+    def __init__(self, rollups, stats_fn, window="hour", interval=60.0, min_count=200,
+                 psi_warn=0.1, psi_alert=0.25, ks_alert=0.1):
+        self.rollups = rollups
+        self.stats_fn = stats_fn
+        self.window = window
+        self.interval = float(interval)
+        self.min_count = int(min_count)
+        self.psi_warn = float(psi_warn)
+        self.psi_alert = float(psi_alert)
+        self.ks_alert = float(ks_alert)
+        self._lock = threading.Lock()
+        self._reports = {}  # window -> latest report
+        self._warned_missing = False
+        self._thread = None
+        self._pid = None
+
+    def _status(self, count, psi_value, ks_value):
+        if count < self.min_count:
+            return "insufficient_data"
+        if psi_value >= self.psi_alert or ks_value >= self.ks_alert:
+            return "drift"
+        if psi_value >= self.psi_warn:
+            return "watch"
+        return "ok"
+
+    def compute(self, window=None, now=None):
+        """Score one window now and keep it as that window's latest report."""
+        window = window or self.window
+        live = self.rollups.query(window, now=now)
+        stats = self.stats_fn()
+        count = live["count"]
+        report = {
+            "window": window,
+            "computed_at": live["end"],
+            "count": count,
+            "thresholds": {
+                "psi_warn": self.psi_warn, "psi_alert": self.psi_alert,
+                "ks_alert": self.ks_alert, "min_count": self.min_count,
+            },
+            "features": {},
+        }
+        for f, summary in live.get("features", {}).items():
+            hist = summary["histogram"]
+            actual = np.array([hist["below"]] + hist["counts"] + [hist["above"]], dtype=np.float64)
+            actual /= max(count, 1)
+            expected = reference_proportions(hist["edges"], stats[f])
+            if expected is None:
+                psi_value = ks_value = None
+                status = "no_reference"
+            else:
+                psi_value = psi(actual, expected)
+                ks_value = ks_binned(actual, expected)
+                status = self._status(count, psi_value, ks_value)
+            report["features"][f] = {
+                "psi": psi_value,
+                "ks": ks_value,
+                "mean_shift_z": summary["mean_shift_z"],
+                "std_ratio": summary["std_ratio"],
+                "out_of_range": (hist["below"] + hist["above"]) / max(count, 1),
+                "status": status,
+            }
+        statuses = [s["status"] for s in report["features"].values()] or ["insufficient_data"]
+        report["status"] = max(statuses, key=STATUS_ORDER.index)
+
+        with self._lock:
+            previous = self._reports.get(window)
+            self._reports[window] = report
+        missing = [f for f, s in report["features"].items() if s["status"] == "no_reference"]
+        if missing and not self._warned_missing:
+            self._warned_missing = True
+            logging.warning("No training histogram for %s in the stats table, so no drift scores "
+                            "for them; rebuild it with save_stats.py --hist-bins", ", ".join(missing))
+        if previous is not None:
+            for f, s in report["features"].items():
+                before = previous["features"].get(f, {}).get("status")
+                if s["status"] == "drift" and before != "drift":
+                    logging.warning("Input drift on %s over the last %s: PSI %.3f, KS %.3f",
+                                    f, window, s["psi"], s["ks"])
+        return report
+
+    def latest(self, window=None):
+        """The last report for ``window``, recomputed if older than ``interval``."""
+        window = window or self.window
+        with self._lock:
+            report = self._reports.get(window)
+        if report is None or time.time() - report["computed_at"] >= self.interval:
+            report = self.compute(window)
+        return report
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.compute()
+            except Exception:
+                logging.exception("Drift computation failed")
+
+    def start(self):
+        """Start the periodic computation once per process (0 interval = on demand only)."""
+        if self.interval <= 0:
+            return
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._reports = {}
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+            self._thread.start()
@@ -1,6 +1,7 @@
 from flask_mail import Message
 from flask import current_app
 from config import Config
+from services.metrics import stage
 
 def send_otp_email(mail, email, otp, expires_at):
     """Send OTP email to user"""
@@ -33,7 +34,13 @@ def send_otp_email(mail, email, otp, expires_at):
             sender=Config.MAIL_DEFAULT_SENDER
         )
         
-        mail.send(msg)
+        mail_queue = getattr(current_app, "mail_queue", None)
+        if mail_queue is not None:
+            # delivered by the background workers; the request returns now
+            mail_queue.enqueue(msg)
+        else:
+            with stage("mail", "smtp_send"):
+                mail.send(msg)
         return True
     except Exception as e:
         print(f"Error sending email: {e}")
@@ -0,0 +1,439 @@
+# backend/services/fleet_rollup.py
+# Live fleet statistics kept in memory as time buckets: one bucket per
+# minute for the last hour, compacted into one bucket per hour kept for a
+# week. Each bucket holds counters, a fixed-bin probability histogram and,
+# per feature, running moments, min/max and a fixed-bin histogram, so a
+# window is answered by adding up at most 169 buckets however much traffic
+# went into them.
+
+import os
+import glob
+import time
+import logging
+import threading
+from collections import deque
+from itertools import chain
+
+import numpy as np
+
+MINUTE = 60
+HOUR = 3600
+WEEK_HOURS = 24 * 7
+
+# window -> (seconds, answered from the minute ring?)
+WINDOWS = {
+    "hour": (HOUR, True),
+    "day": (24 * HOUR, False),
+    "week": (WEEK_HOURS * HOUR, False),
+}
+
+_SUMMED = ("count", "abnormal", "prob_sum", "prob_hist", "f_sum", "f_sumsq", "f_hist")
+
+
+class _Buckets:
+    """Ring of ``slots`` buckets, slot = bucket number % slots."""
+
+    def __init__(self, slots, n_features, prob_bins, feature_bins):
+        self.slots = slots
+        self.ids = np.full(slots, -1, dtype=np.int64)
+        self.count = np.zeros(slots)
+        self.abnormal = np.zeros(slots)
+        self.prob_sum = np.zeros(slots)
+        self.prob_hist = np.zeros((slots, prob_bins))
+        self.f_sum = np.zeros((slots, n_features))
+        self.f_sumsq = np.zeros((slots, n_features))
+        self.f_min = np.full((slots, n_features), np.inf)
+        self.f_max = np.full((slots, n_features), -np.inf)
+        # below range, feature_bins bins over [min, max], above range
+        self.f_hist = np.zeros((slots, n_features, feature_bins + 2))
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in ("ids", "f_min", "f_max") + _SUMMED}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        self = cls.__new__(cls)
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self.slots = len(self.ids)
+        return self
+
+    def slot(self, bucket_id):
+        """Slot for ``bucket_id``, cleared first if it held an older bucket."""
+        s = bucket_id % self.slots
+        if self.ids[s] != bucket_id:
+            for name in _SUMMED:
+                getattr(self, name)[s] = 0
+            self.f_min[s] = np.inf
+            self.f_max[s] = -np.inf
+            self.ids[s] = bucket_id
+        return s
+
+    def find(self, bucket_id):
+        s = bucket_id % self.slots
+        return s if self.ids[s] == bucket_id else None
+
+    def merge(self, dst, other, src):
+        for name in _SUMMED:
+            getattr(self, name)[dst] += getattr(other, name)[src]
+        np.minimum(self.f_min[dst], other.f_min[src], out=self.f_min[dst])
+        np.maximum(self.f_max[dst], other.f_max[src], out=self.f_max[dst])
+
+    def totals(self, slots):
+        """Summed / min / max state over a list of slots."""
+        out = {name: getattr(self, name)[slots].sum(axis=0) for name in _SUMMED}
+        out["f_min"] = self.f_min[slots].min(axis=0, initial=np.inf)
+        out["f_max"] = self.f_max[slots].max(axis=0, initial=-np.inf)
+        return out
+
+
+def _combine(a, b):
+    if a is None:
+        return b
+    out = {name: a[name] + b[name] for name in _SUMMED}
+    out["f_min"] = np.minimum(a["f_min"], b["f_min"])
+    out["f_max"] = np.maximum(a["f_max"], b["f_max"])
+    return out
+
+
+def _window_state(minutes, hours, open_minute, window, now):
+    """Totals and a {bucket start: [count, abnormal]} series for one process's rings."""
+    seconds, by_minute = WINDOWS[window]
+    series = {}
+    slots = []
+    if by_minute:
+        last = int(now // MINUTE)
+        for m in range(last - seconds // MINUTE + 1, last + 1):
+            s = minutes.find(m)
+            if s is not None:
+                slots.append(s)
+                series[m * MINUTE] = [minutes.count[s], minutes.abnormal[s]]
+        return (minutes.totals(slots) if slots else None), series
+
+    last = int(now // HOUR)
+    first = last - seconds // HOUR + 1
+    for h in range(first, last + 1):
+        s = hours.find(h)
+        if s is not None:
+            slots.append(s)
+            series[h * HOUR] = [hours.count[s], hours.abnormal[s]]
+    state = hours.totals(slots) if slots else None
+    # the minute being filled has not been compacted into its hour yet
+    if open_minute is not None and first <= open_minute * MINUTE // HOUR <= last:
+        s = minutes.find(open_minute)
+        if s is not None:
+            state = _combine(state, minutes.totals([s]))
+            point = series.setdefault(open_minute * MINUTE // HOUR * HOUR, [0.0, 0.0])
+            point[0] += minutes.count[s]
+            point[1] += minutes.abnormal[s]
+    return state, series
+
+
+class FleetRollups:
+    """
+    ``observe`` takes the (machine_id, source, abnormal, prob, raw) rows
+    recorded to the history store, with the ScoringKernel that scored them.
+    The first kernel seen fixes the reference (training mean, std, min and
+    max) used for the feature histogram bins and drift figures. If a reload
+    brings different training stats, the rollups start over.
+
+    Rows are buffered and folded into the open minute's bucket ``batch_size``
+    at a time (and before every query). When a minute closes it is merged
+    into its hour's bucket. Both rings are fixed size, so memory is bounded
+    by the bucket count, not by traffic.
+
+    With ``directory`` set, each process writes its rings there every
+    ``flush_interval`` seconds and queries merge every process's file, so
+    any gunicorn worker answers for the whole server.
+    """
+
+    def __init__(self, features, prob_bins=20, feature_bins=20, batch_size=1024,
+                 directory="", flush_interval=5.0):
+        self.features = list(features)
+        self.prob_bins = int(prob_bins)
+        self.feature_bins = int(feature_bins)
+        self.batch_size = max(1, int(batch_size))
+        self.directory = directory
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flusher = None
+        self._kernel = None
+        self._snapshots = {}  # path -> (mtime, arrays) of other workers' files
+        self.reference = None
+        # appended to without the lock (deque.extend is atomic), drained by _fold
+        self._pending = deque()
+        self._pending_minute = None
+        self._reset()
+
+    def _reset(self):
+        F = len(self.features)
+        self.minutes = _Buckets(MINUTE + 1, F, self.prob_bins, self.feature_bins)
+        self.hours = _Buckets(WEEK_HOURS + 1, F, self.prob_bins, self.feature_bins)
+        self._open_minute = None
+
+    def _set_reference(self, kernel):
+        # caller holds the lock
+        if kernel is self._kernel:
+            return
+        reference = {
+            "mean": kernel.mean.copy(),
+            "std": 1.0 / kernel.inv_std,
+            "lo": kernel.lo.copy(),
+            "hi": kernel.hi.copy(),
+        }
+        if self.reference is None or not all(
+            np.array_equal(reference[k], self.reference[k]) for k in reference
+        ):
+            if self.reference is not None:
+                logging.info("Training stats changed; fleet rollups restarted")
+                self._pending.clear()
+                self._reset()
+            self.reference = reference
+            self._width = (reference["hi"] - reference["lo"]) / self.feature_bins
+            self._width[self._width <= 0] = 1.0
+        self._kernel = kernel
+
+    def _check_pid(self):
+        # caller holds the lock; the master's buckets are not the worker's
+        # (rows pending at the fork are the worker's own: the master scores none)
+        if self._pid != os.getpid():
+            self._reset()
+            self._flusher = None
+            self._pid = os.getpid()
+
+    # ---------------- recording ----------------
+    def observe(self, kernel, rows, now=None):
+        """
+        Add (machine_id, source, abnormal, prob, raw) rows scored with
+        ``kernel``. This sits on the /predict path: it only appends to the
+        pending buffer, and takes the lock once per ``batch_size`` rows, per
+        minute or per kernel change to fold them in.
+        """
+        minute = (time.time() if now is None else now) // MINUTE
+        pending = self._pending
+        if kernel is not self._kernel or (pending and minute != self._pending_minute):
+            with self._lock:
+                self._check_pid()
+                self._fold()
+                self._set_reference(kernel)
+        if not pending:
+            self._pending_minute = minute
+        pending.extend(rows)
+        if len(pending) >= self.batch_size:
+            with self._lock:
+                self._check_pid()
+                self._fold()
+
+    def _advance(self, minute):
+        """Compact the open minute into its hour once ``minute`` has started."""
+        if self._open_minute is None or minute <= self._open_minute:
+            return
+        src = self.minutes.find(self._open_minute)
+        if src is not None:
+            dst = self.hours.slot(self._open_minute * MINUTE // HOUR)
+            self.hours.merge(dst, self.minutes, src)
+        self._open_minute = None
+
+    def _fold(self):
+        """Add the pending rows to their minute's bucket (caller holds the lock)."""
+        n = len(self._pending)
+        if not n:
+            return
+        popleft = self._pending.popleft
+        rows = [popleft() for _ in range(n)]
+        minute = int(self._pending_minute)
+        self._advance(minute)
+        if self._open_minute is None:
+            self._open_minute = minute
+        # late rows from an already compacted minute go into the open one
+        s = self.minutes.slot(self._open_minute)
+        b = self.minutes
+        ref = self.reference
+
+        _, _, abnormal, prob, raw = zip(*rows)
+        abnormal = np.fromiter(abnormal, dtype=bool, count=n)
+        prob = np.fromiter(prob, dtype=np.float64, count=n)
+        F = len(self.features)
+        raw = np.fromiter(chain.from_iterable(raw), dtype=np.float64, count=n * F).reshape(n, F)
+        # NaN / inf readings count at the edge of the training range
+        raw = np.where(np.isfinite(raw), raw, np.where(raw > 0, ref["hi"], ref["lo"]))
+
+        b.count[s] += n
+        b.abnormal[s] += abnormal.sum()
+        b.prob_sum[s] += prob.sum()
+        pbin = np.clip((prob * self.prob_bins).astype(np.int64), 0, self.prob_bins - 1)
+        b.prob_hist[s] += np.bincount(pbin, minlength=self.prob_bins)
+
+        # moments around the training mean keep the power sums small
+        d = raw - ref["mean"]
+        b.f_sum[s] += d.sum(axis=0)
+        b.f_sumsq[s] += (d * d).sum(axis=0)
+        np.minimum(b.f_min[s], raw.min(axis=0), out=b.f_min[s])
+        np.maximum(b.f_max[s], raw.max(axis=0), out=b.f_max[s])
+
+        B = self.feature_bins
+        fbin = np.floor((raw - ref["lo"]) / self._width).astype(np.int64) + 1
+        fbin = np.where(raw > ref["hi"], B + 1, np.clip(fbin, 0, B))
+        fbin = np.where(raw < ref["lo"], 0, fbin)
+        flat = fbin + np.arange(F) * (B + 2)
+        b.f_hist[s] += np.bincount(flat.ravel(), minlength=F * (B + 2)).reshape(F, B + 2)
+
+    # ---------------- snapshots ----------------
+    def _snapshot(self):
+        # caller holds the lock
+        out = {"m_" + k: v.copy() for k, v in self.minutes.arrays().items()}
+        out.update({"h_" + k: v.copy() for k, v in self.hours.arrays().items()})
+        out["open_minute"] = np.array(-1 if self._open_minute is None else self._open_minute)
+        for k, v in (self.reference or {}).items():
+            out["ref_" + k] = v
+        return out
+
+    def flush(self):
+        """Write this process's rings to ``directory`` (no-op without one)."""
+        if not self.directory:
+            return
+        with self._lock:
+            self._check_pid()
+            self._fold()
+            snap = self._snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.npz")
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **snap)
+        os.replace(tmp, path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Fleet rollup flush failed")
+
+    def start_flusher(self):
+        """Start the periodic snapshot writer once per process."""
+        if not self.directory or self.flush_interval <= 0:
+            return
+        with self._lock:
+            self._check_pid()
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="fleet-flush", daemon=True)
+            self._flusher.start()
+
+    def _other_processes(self):
+        # files of exited workers still count until their buckets age out;
+        # each file is parsed again only after its worker rewrites it
+        own = os.path.join(self.directory, f"{os.getpid()}.npz")
+        oldest = time.time() - WEEK_HOURS * HOUR
+        cache = {}
+        for path in glob.glob(os.path.join(self.directory, "*.npz")):
+            if path == own or path.endswith(".tmp.npz"):
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if mtime < oldest * 1e9:
+                    continue
+                cached = self._snapshots.get(path)
+                if cached is None or cached[0] != mtime:
+                    with np.load(path) as data:
+                        cached = (mtime, {k: data[k] for k in data.files})
+                cache[path] = cached
+            except (OSError, ValueError):
+                continue  # being replaced
+            yield cached[1]
+        self._snapshots = cache
+
+    # ---------------- queries ----------------
+    def query(self, window, now=None):
+        """Aggregate for "hour", "day" or "week" ending at ``now``."""
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window: {window}")
+        now = time.time() if now is None else now
+        with self._lock:
+            self._check_pid()
+            self._fold()
+            self._advance(int(now // MINUTE))
+            state, series = _window_state(self.minutes, self.hours, self._open_minute, window, now)
+            reference = self.reference
+
+        if self.directory:
+            for snap in self._other_processes():
+                if reference is not None and "ref_mean" in snap and not (
+                    np.array_equal(snap["ref_mean"], reference["mean"])
+                    and np.array_equal(snap["ref_lo"], reference["lo"])
+                    and np.array_equal(snap["ref_hi"], reference["hi"])
+                ):
+                    continue  # scored against other training stats
+                if reference is None and "ref_mean" in snap:
+                    reference = {k[4:]: snap[k] for k in snap if k.startswith("ref_")}
+                minutes = _Buckets.from_arrays({k[2:]: v for k, v in snap.items() if k.startswith("m_")})
+                hours = _Buckets.from_arrays({k[2:]: v for k, v in snap.items() if k.startswith("h_")})
+                open_minute = int(snap["open_minute"])
+                other, other_series = _window_state(
+                    minutes, hours, None if open_minute < 0 else open_minute, window, now
+                )
+                if other is not None:
+                    state = _combine(state, other)
+                for start, (count, abnormal) in other_series.items():
+                    point = series.setdefault(start, [0.0, 0.0])
+                    point[0] += count
+                    point[1] += abnormal
+
+        return self._render(window, now, state, series, reference)
+
+    def _render(self, window, now, state, series, reference):
+        seconds, by_minute = WINDOWS[window]
+        out = {
+            "window": window,
+            "start": now - seconds,
+            "end": now,
+            "bucket_seconds": MINUTE if by_minute else HOUR,
+            "count": 0,
+            "abnormal": 0,
+            "abnormal_rate": None,
+            "buckets": [
+                {"start": start, "count": int(c), "abnormal": int(a)}
+                for start, (c, a) in sorted(series.items())
+            ],
+        }
+        if state is None or state["count"] == 0 or reference is None:
+            return out
+
+        n = float(state["count"])
+        out["count"] = int(n)
+        out["abnormal"] = int(state["abnormal"])
+        out["abnormal_rate"] = state["abnormal"] / n
+        out["prob_within_2months"] = {
+            "mean": state["prob_sum"] / n,
+            "histogram": {
+                "edges": np.linspace(0.0, 1.0, self.prob_bins + 1).tolist(),
+                "counts": state["prob_hist"].astype(int).tolist(),
+            },
+        }
+
+        shift = state["f_sum"] / n
+        mean = reference["mean"] + shift
+        std = np.sqrt(np.maximum(state["f_sumsq"] / n - shift * shift, 0.0))
+        features = {}
+        for i, f in enumerate(self.features):
+            hist = state["f_hist"][i]
+            features[f] = {
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                "min": float(state["f_min"][i]),
+                "max": float(state["f_max"][i]),
+                # drift against the training table, in training std units
+                "mean_shift_z": float(shift[i] / reference["std"][i]),
+                "std_ratio": float(std[i] / reference["std"][i]),
+                "histogram": {
+                    "edges": np.linspace(reference["lo"][i], reference["hi"][i],
+                                         self.feature_bins + 1).tolist(),
+                    "below": int(hist[0]),
+                    "counts": hist[1:-1].astype(int).tolist(),
+                    "above": int(hist[-1]),
+                },
+            }
+        out["features"] = features
+        return out
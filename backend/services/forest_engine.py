@@ -0,0 +1,239 @@
+# backend/services/forest_engine.py
+# Flattened random-forest inference: every tree of a fitted sklearn forest is
+# packed into shared contiguous arrays and all trees are walked at once.
+
+import os
+import json
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+ARRAYS = ("feature", "threshold", "children", "value", "roots", "missing_left")
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FlatForest:
+    """
+    Array form of a fitted sklearn RandomForestClassifier.
+
+    All trees share one node table: ``feature``, ``threshold``, ``children``
+    (n_nodes x 2, left/right) and ``value`` (normalized class probabilities).
+    ``roots`` holds each tree's first node. Leaves point to themselves.
+    ``missing_left`` is sklearn's ``missing_go_to_left``: where a NaN input
+    goes at each split, so NaN rows get the same leaves as in sklearn.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, missing_left,
+                 classes, n_features, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.missing_left = missing_left
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self._children_flat = children.reshape(-1)
+        self._is_leaf = children[:, 0] == np.arange(len(children))
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if not hasattr(model, "estimators_"):
+            raise TypeError("Expected a fitted sklearn forest")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        features, thresholds, children, values, roots, missing_left = [], [], [], [], [], []
+        offset = 0
+        n_classes = len(model.classes_)
+
+        for est in model.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            idx = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, idx, tree.children_left) + offset
+            right = np.where(is_leaf, idx, tree.children_right) + offset
+
+            # same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # sklearn < 1.3 has no missing-value routing: NaN <= t is false, so right
+            missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(n, dtype=np.uint8)))
+            children.append(np.stack([left, right], axis=1))
+            values.append(proba)
+            roots.append(offset)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            missing_left=np.ascontiguousarray(np.concatenate(missing_left), dtype=bool),
+            classes=np.asarray(model.classes_),
+            n_features=model.n_features_in_,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    def save(self, path, keep=2):
+        """
+        Write the node arrays as plain .npy files so they can be memory-mapped
+        by ``load``, and point the symlink ``path`` at them.
+
+        Running workers may have the current files mapped, and truncating a
+        mapped file kills them with SIGBUS, so nothing is ever rewritten in
+        place: each export goes to a fresh ``<path>.v<ns>`` directory
+        (written and fsynced under a temporary name first) and the symlink
+        is swapped with os.replace. Only the newest ``keep`` versions are
+        kept; unlinking an older one is safe, its pages stay valid for any
+        process that still maps them.
+        """
+        path = os.path.abspath(path)
+        parent, base = os.path.split(path)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{base}.", dir=parent)
+        try:
+            self._write(tmp_dir)
+            version = os.path.join(parent, f"{base}.v{time.time_ns()}")
+            os.rename(tmp_dir, version)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        _fsync_dir(parent)
+
+        if os.path.isdir(path) and not os.path.islink(path):
+            # export from before versioned directories: move it aside (a
+            # rename keeps mapped files intact) so the symlink can take its name
+            os.rename(path, os.path.join(parent, f"{base}.v0"))
+        link_tmp = os.path.join(parent, f".{base}.link.{os.getpid()}")
+        os.symlink(os.path.basename(version), link_tmp)
+        os.replace(link_tmp, path)
+        _fsync_dir(parent)
+
+        prefix = f"{base}.v"
+        versions = sorted(
+            (d for d in os.listdir(parent) if d.startswith(prefix) and d[len(prefix):].isdigit()),
+            key=lambda d: int(d[len(prefix):]),
+        )
+        for old in versions[:-keep] if keep > 0 else []:
+            shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
+        return version
+
+    def _write(self, path):
+        """Arrays and meta.json into the (new, empty) directory ``path``, fsynced."""
+        for name in ARRAYS:
+            with open(os.path.join(path, f"{name}.npy"), "wb") as f:
+                np.save(f, getattr(self, name))
+                f.flush()
+                os.fsync(f.fileno())
+        meta = {
+            "classes": self.classes_.tolist(),
+            "n_features": self.n_features_in_,
+            "feature_names": (
+                [str(n) for n in self.feature_names_in_]
+                if hasattr(self, "feature_names_in_") else None
+            ),
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load arrays written by ``save``. With mmap=True they are read-only
+        file mappings, so every process using the same files shares one copy
+        of the model pages through the page cache.
+        """
+        # resolve the symlink once, so a concurrent export cannot hand us
+        # meta.json from one version and arrays from another
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        if not os.path.exists(os.path.join(path, "missing_left.npy")):
+            raise FileNotFoundError(
+                f"{path} has no missing_left.npy (exported before NaN routing); "
+                "re-run export_flat_model.py"
+            )
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAYS
+        }
+        return cls(
+            classes=np.asarray(meta["classes"]),
+            n_features=meta["n_features"],
+            feature_names=meta["feature_names"],
+            **arrays,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.feature, self.threshold, self.children, self.value, self.roots,
+            self.missing_left,
+        ))
+
+    def apply(self, X):
+        """Leaf node index for every (tree, row): shape (n_trees, n_rows)."""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        n_rows, n_features = X.shape
+        X = X.reshape(-1)
+        has_nan = bool(np.isnan(X).any())
+
+        # one entry per (tree, row) still walking; finished entries drop out
+        nodes = np.repeat(self.roots.astype(np.intp), n_rows)
+        row_base = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        pos = np.arange(nodes.size)
+        leaves = nodes.copy()
+
+        while nodes.size:
+            x = X[self.feature[nodes] + row_base]
+            go_right = x > self.threshold[nodes]
+            if has_nan:
+                # NaN compares false: send it where sklearn learned to
+                nan = np.isnan(x)
+                go_right[nan] = ~self.missing_left[nodes[nan]]
+            nodes = self._children_flat[2 * nodes + go_right]
+            done = self._is_leaf[nodes]
+            if done.any():
+                leaves[pos[done]] = nodes[done]
+                active = ~done
+                nodes, row_base, pos = nodes[active], row_base[active], pos[active]
+
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # summing over the tree axis accumulates tree by tree, like sklearn
+        proba = self.value[leaves].sum(axis=0)
+        proba /= self.n_trees
+        return proba
@@ -0,0 +1,280 @@
+# backend/services/history_store.py
+# Server-side history of scored readings. Requests hand rows to a queue and
+# return; one writer thread per process commits them to a WAL-mode SQLite
+# table in batches. Range queries page by (ts, id) keyset over indexes, so a
+# page costs the same at row 100 as at row 100 million. Rows older than the
+# retention are deleted by the same thread in short chunks along the ts
+# index; SQLite reuses the freed pages, so the file stops growing once the
+# retention window is full.
+
+import os
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+
+TABLE = "prediction_history"
+
+
+def parse_time(value):
+    """Epoch seconds or an ISO 8601 timestamp -> epoch seconds (None passes through)."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return dt.timestamp()
+
+
+class HistoryStore:
+    """
+    ``record`` queues rows of (machine_id, source, abnormal, prob, raw),
+    where ``raw`` is the reading in ``features`` order, along with the model
+    version and ScoringKernel they were scored with. The writer computes the
+    z-scores with that kernel and stores inputs, z-scores, probability,
+    status and model version, committing up to ``batch_size`` rows per
+    transaction after waiting at most ``flush_interval`` seconds for more
+    to arrive.
+
+    When ``max_queue`` record() calls are pending, new rows are dropped and
+    counted rather than slowing down the request that produced them.
+
+    With ``retention`` (seconds) set, the writer deletes older rows every
+    ``prune_interval`` seconds, ``prune_batch`` rows per transaction so
+    readers and the next insert batch are not held up.
+    """
+
+    def __init__(self, path, features, batch_size=1000, flush_interval=0.5,
+                 max_queue=10000, busy_timeout_ms=5000, retention=0.0,
+                 prune_interval=60.0, prune_batch=10000):
+        self.path = path
+        self.features = list(features)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.retention = max(0.0, float(retention))
+        self.prune_interval = max(0.0, float(prune_interval))
+        self.prune_batch = max(1, int(prune_batch))
+        self._next_prune = 0.0
+        self._max_queue = int(max_queue)
+        self._queue = queue.Queue(maxsize=self._max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._local = threading.local()
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "failed": 0, "pruned": 0}
+
+        cols = ", ".join(f'"{f}"' for f in self.features)
+        zcols = ", ".join(f'"z_{f}"' for f in self.features)
+        self._columns = ["ts", "machine_id", "source", "abnormal", "prob", "model_version"] \
+            + self.features + [f"z_{f}" for f in self.features]
+        self._insert_sql = (
+            f"INSERT INTO {TABLE} (ts, machine_id, source, abnormal, prob, model_version, "
+            f"{cols}, {zcols}) VALUES ({', '.join('?' * len(self._columns))})"
+        )
+        self._select_cols = "id, " + ", ".join(f'"{c}"' for c in self._columns)
+
+    # ---------------- connections ----------------
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms};")
+        feature_cols = "".join(f', "{f}" REAL, "z_{f}" REAL' for f in self.features)
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                "id INTEGER PRIMARY KEY, ts REAL NOT NULL, machine_id TEXT, source TEXT, "
+                f"abnormal INTEGER NOT NULL, prob REAL, model_version TEXT{feature_cols})"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_machine_ts ON {TABLE} (machine_id, ts)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_ts ON {TABLE} (ts)")
+            # alert audits scan only the abnormal rows
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_alerts ON {TABLE} (ts) WHERE abnormal = 1"
+            )
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON;")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ---------------- recording ----------------
+    def _ensure_writer(self):
+        # the writer thread does not survive gunicorn's fork
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self._max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, version, kernel, rows):
+        """Queue scored rows for writing; never blocks the caller."""
+        if not rows:
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((time.time(), version, kernel, rows))
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += len(rows)
+            return
+        with self._lock:
+            self.stats["recorded"] += len(rows)
+
+    def flush(self):
+        """Block until every queued row has been written (used by benchmarks)."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _rows_for(self, items):
+        """Queued (ts, version, kernel, rows) items -> insert tuples."""
+        out = []
+        for ts, version, kernel, rows in items:
+            z = kernel.zscores([r[4] for r in rows]).tolist()
+            for (machine_id, source, abnormal, prob, raw), zrow in zip(rows, z):
+                out.append(
+                    (ts, None if machine_id is None else str(machine_id), source,
+                     1 if abnormal else 0, float(prob), version, *raw, *zrow)
+                )
+        return out
+
+    def _write(self, conn, items):
+        rows = self._rows_for(items)
+        with conn:
+            conn.executemany(self._insert_sql, rows)
+        with self._lock:
+            self.stats["written"] += len(rows)
+            self.stats["batches"] += 1
+
+    def prune(self, conn, now=None):
+        """Delete rows older than the retention, oldest first, in short transactions."""
+        if self.retention <= 0:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.retention
+        sql = (f"DELETE FROM {TABLE} WHERE id IN "
+               f"(SELECT id FROM {TABLE} WHERE ts < ? ORDER BY ts LIMIT ?)")
+        deleted = 0
+        while True:
+            with conn:
+                n = conn.execute(sql, (cutoff, self.prune_batch)).rowcount
+            deleted += n
+            if n < self.prune_batch:
+                break
+        with self._lock:
+            self.stats["pruned"] += deleted
+        return deleted
+
+    def _maybe_prune(self, conn):
+        if self.retention <= 0 or time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + self.prune_interval
+        try:
+            deleted = self.prune(conn)
+            if deleted:
+                logging.info("History: pruned %d rows older than %.1f days", deleted, self.retention / 86400)
+        except Exception:
+            logging.exception("History prune failed")
+
+    def _run(self):
+        conn = None
+        while True:
+            items = [self._queue.get()]
+            n = len(items[0][3])
+            deadline = time.monotonic() + self.flush_interval
+            while n < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+                n += len(item[3])
+            try:
+                if conn is None:
+                    conn = self._connect()
+                self._write(conn, items)
+                self._maybe_prune(conn)
+            except Exception:
+                logging.exception("History write failed (%d rows)", n)
+                with self._lock:
+                    self.stats["failed"] += n
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    # ---------------- queries ----------------
+    def query(self, machine_id=None, start=None, end=None, status=None,
+              after=None, limit=1000, descending=False):
+        """
+        Rows with start <= ts < end (either bound optional), for one machine
+        or the whole fleet, optionally only "Abnormal" or "Normal" ones.
+        ``after`` is the (ts, id) cursor returned as ``next`` by the previous
+        page. Returns (rows, next_cursor or None).
+        """
+        where, params = [], []
+        if machine_id is not None:
+            where.append("machine_id = ?")
+            params.append(str(machine_id))
+        if status is not None:
+            where.append("abnormal = ?")
+            params.append(1 if status == "Abnormal" else 0)
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(float(start))
+        if end is not None:
+            where.append("ts < ?")
+            params.append(float(end))
+        if after is not None:
+            where.append("(ts, id) < (?, ?)" if descending else "(ts, id) > (?, ?)")
+            params.extend([float(after[0]), int(after[1])])
+        order = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {self._select_cols} FROM {TABLE}"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + f" ORDER BY ts {order}, id {order} LIMIT ?"
+        )
+        params.append(int(limit))
+        records = self._reader().execute(sql, params).fetchall()
+
+        F = len(self.features)
+        rows = []
+        for r in records:
+            rows.append({
+                "id": r[0],
+                "ts": r[1],
+                "machine_id": r[2],
+                "source": r[3],
+                "status": "Abnormal" if r[4] else "Normal",
+                "prob_within_2months": r[5],
+                "model_version": r[6],
+                "inputs": dict(zip(self.features, r[7:7 + F])),
+                "z_scores": dict(zip(self.features, r[7 + F:7 + 2 * F])),
+            })
+        next_cursor = None
+        if len(records) == int(limit) and records:
+            next_cursor = (records[-1][1], records[-1][0])
+        return rows, next_cursor
@@ -0,0 +1,178 @@
+# backend/services/machine_state.py
+# Per-machine sliding windows of recent readings with O(1) rolling features.
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class RollingWindowStore:
+    """
+    In-memory ring buffers of the last ``window`` readings per machine.
+
+    Readings live in one preallocated float32 array (slots x window x features)
+    that grows by doubling up to ``max_machines`` slots. Running sums of y,
+    y^2 and i*y (i = position in window) give rolling mean, std and
+    least-squares slope in O(1) per update. The sums are rebuilt from the
+    buffer each time a ring wraps, so float drift cannot build up.
+
+    Machines idle for longer than ``idle_ttl`` seconds are dropped. When the
+    store is full, the least recently updated machine is evicted.
+    """
+
+    def __init__(self, n_features, window=32, max_machines=100000,
+                 idle_ttl=3600.0, initial_slots=1024):
+        self.n_features = int(n_features)
+        self.window = max(2, int(window))
+        self.max_machines = max(1, int(max_machines))
+        self.idle_ttl = float(idle_ttl)
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()      # machine_id -> slot, least recent first
+        self._last_seen = {}             # machine_id -> monotonic time
+        self._free = []
+        self._capacity = 0
+        self._grow(min(self.max_machines, max(1, int(initial_slots))))
+
+    # ---------------- storage ----------------
+    def _grow(self, capacity):
+        old = self._capacity
+        W, F = self.window, self.n_features
+
+        def grown(arr, shape, dtype):
+            out = np.zeros(shape, dtype=dtype)
+            if old:
+                out[:old] = arr
+            return out
+
+        self._buf = grown(getattr(self, "_buf", None), (capacity, W, F), np.float32)
+        self._head = grown(getattr(self, "_head", None), capacity, np.int32)
+        self._count = grown(getattr(self, "_count", None), capacity, np.int32)
+        self._s = grown(getattr(self, "_s", None), (capacity, F), np.float64)
+        self._ss = grown(getattr(self, "_ss", None), (capacity, F), np.float64)
+        self._sxy = grown(getattr(self, "_sxy", None), (capacity, F), np.float64)
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self._capacity = capacity
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self._buf, self._head, self._count, self._s, self._ss, self._sxy
+        ))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _evict_idle(self, now):
+        while self._slots:
+            machine_id = next(iter(self._slots))
+            if now - self._last_seen[machine_id] <= self.idle_ttl:
+                break
+            self._release(machine_id)
+
+    def _release(self, machine_id):
+        slot = self._slots.pop(machine_id)
+        del self._last_seen[machine_id]
+        self._free.append(slot)
+
+    def _slot_for(self, machine_id, now):
+        slot = self._slots.get(machine_id)
+        if slot is not None:
+            self._slots.move_to_end(machine_id)
+            return slot
+
+        self._evict_idle(now)
+        if not self._free:
+            if self._capacity < self.max_machines:
+                self._grow(min(self.max_machines, self._capacity * 2))
+            else:
+                self._release(next(iter(self._slots)))
+
+        slot = self._free.pop()
+        self._head[slot] = 0
+        self._count[slot] = 0
+        self._s[slot] = 0.0
+        self._ss[slot] = 0.0
+        self._sxy[slot] = 0.0
+        self._slots[machine_id] = slot
+        return slot
+
+    # ---------------- updates ----------------
+    def update(self, machine_id, values):
+        """Append one reading (sequence of n_features floats) and return rolling features."""
+        y = np.asarray(values, dtype=np.float32).astype(np.float64)
+        now = time.monotonic()
+        with self._lock:
+            slot = self._slot_for(machine_id, now)
+            self._last_seen[machine_id] = now
+            W = self.window
+            c = int(self._count[slot])
+            head = int(self._head[slot])
+
+            if c < W:
+                self._sxy[slot] += c * y
+                self._s[slot] += y
+                self._ss[slot] += y * y
+                self._count[slot] = c + 1
+            else:
+                y_old = self._buf[slot, head].astype(np.float64)
+                s = self._s[slot]
+                self._sxy[slot] += (W - 1) * y - (s - y_old)
+                self._s[slot] += y - y_old
+                self._ss[slot] += y * y - y_old * y_old
+
+            self._buf[slot, head] = y
+            head = (head + 1) % W
+            self._head[slot] = head
+            if head == 0:
+                self._resync(slot)
+            return self._features(slot)
+
+    def _resync(self, slot):
+        # ring just wrapped: the buffer is in oldest..newest order
+        c = int(self._count[slot])
+        ys = self._buf[slot, :c].astype(np.float64)
+        idx = np.arange(c, dtype=np.float64)[:, np.newaxis]
+        self._s[slot] = ys.sum(axis=0)
+        self._ss[slot] = (ys * ys).sum(axis=0)
+        self._sxy[slot] = (idx * ys).sum(axis=0)
+
+    def _features(self, slot):
+        c = float(self._count[slot])
+        s, ss, sxy = self._s[slot], self._ss[slot], self._sxy[slot]
+        mean = s / c
+        if c > 1:
+            var = np.maximum(ss / c - mean * mean, 0.0) * c / (c - 1)
+            sx = c * (c - 1) / 2.0
+            sxx = (c - 1) * c * (2 * c - 1) / 6.0
+            slope = (c * sxy - sx * s) / (c * sxx - sx * sx)
+        else:
+            var = np.zeros_like(mean)
+            slope = np.zeros_like(mean)
+        return {
+            "count": int(c),
+            "mean": mean,
+            "std": np.sqrt(var),
+            "slope": slope,
+        }
+
+    # ---------------- reads ----------------
+    def get(self, machine_id):
+        with self._lock:
+            slot = self._slots.get(machine_id)
+            if slot is None:
+                return None
+            return self._features(slot)
+
+    def window_values(self, machine_id):
+        """Readings in the window, oldest first (n x n_features)."""
+        with self._lock:
+            slot = self._slots.get(machine_id)
+            if slot is None:
+                return None
+            c = int(self._count[slot])
+            head = int(self._head[slot])
+            if c < self.window:
+                return self._buf[slot, :c].copy()
+            return np.roll(self._buf[slot], -head, axis=0)
@@ -0,0 +1,147 @@
+# backend/services/mail_queue.py
+# Background delivery for outgoing mail. Requests enqueue a Message and
+# return; worker threads send queued messages in batches over a persistent
+# SMTP session, reconnecting and retrying with backoff on failure.
+
+import os
+import time
+import queue
+import logging
+import threading
+
+from services.metrics import stage
+
+
+class MailQueueFull(Exception):
+    """Raised when the delivery queue is at capacity."""
+
+
+class MailQueue:
+    """
+    ``workers`` threads each keep one Flask-Mail connection open, send up to
+    ``batch_size`` queued messages per wake-up over it, and close it after
+    ``idle_close`` seconds without mail. A failed send is retried up to
+    ``max_retries`` times with exponential backoff on a fresh connection.
+    """
+
+    def __init__(self, app, mail, workers=1, max_queue=1000, batch_size=20,
+                 max_retries=3, backoff=1.0, idle_close=30.0):
+        self.app = app
+        self.mail = mail
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = float(backoff)
+        self.idle_close = float(idle_close)
+        self._max_queue = int(max_queue)
+        self._queue = queue.Queue(maxsize=self._max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self.stats = {"enqueued": 0, "sent": 0, "failed": 0, "retries": 0, "connections": 0}
+
+    def _ensure_workers(self):
+        # worker threads do not survive gunicorn's fork
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self._max_queue)
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"mail-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for t in self._threads:
+                t.start()
+
+    def enqueue(self, msg):
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(msg)
+        except queue.Full:
+            raise MailQueueFull("Mail queue is full")
+        with self._lock:
+            self.stats["enqueued"] += 1
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until every queued message has been handled (used by benchmarks)."""
+        self._queue.join()
+
+    # ---------------- worker ----------------
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _open(self):
+        conn = self.mail.connect()
+        conn.__enter__()
+        self._count("connections")
+        return conn
+
+    def _close(self, conn):
+        if conn is None:
+            return
+        try:
+            conn.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def _alive(self, conn):
+        try:
+            return conn.host is None or conn.host.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _send(self, conn, msg):
+        """Send one message, reconnecting with backoff on failure. Returns the live connection."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                if conn is None:
+                    with stage("mail", "smtp_connect"):
+                        conn = self._open()
+                with stage("mail", "smtp_send"):
+                    conn.send(msg)
+                self._count("sent")
+                return conn
+            except Exception:
+                logging.exception("Mail send failed (attempt %d)", attempt + 1)
+                self._close(conn)
+                conn = None
+                if attempt < self.max_retries:
+                    self._count("retries")
+                    time.sleep(self.backoff * (2 ** attempt))
+        self._count("failed")
+        return conn
+
+    def _run(self):
+        conn = None
+        with self.app.app_context():
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.idle_close)
+                except queue.Empty:
+                    self._close(conn)
+                    conn = None
+                    continue
+
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if conn is not None and not self._alive(conn):
+                    self._close(conn)
+                    conn = None
+                for msg in batch:
+                    try:
+                        conn = self._send(conn, msg)
+                    finally:
+                        self._queue.task_done()
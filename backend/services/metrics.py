@@ -0,0 +1,314 @@
+# backend/services/metrics.py
+# In-process counters and latency histograms, rendered in Prometheus text
+# format. Each gunicorn worker keeps its own values and, when METRICS_DIR is
+# set, writes a snapshot to METRICS_DIR/<pid>.json; /metrics merges every
+# snapshot in the directory so a scrape sees the whole server, whichever
+# worker answers it.
+#
+# When a worker exits (gunicorn's child_exit hook, or collect() finding its
+# pid dead) its counters and histograms are added into METRICS_DIR/
+# aggregate.json and its snapshot is deleted, as prometheus_client's
+# multiprocess mode does: the merged totals never go down when gunicorn
+# recycles a worker, so rate() does not see a counter reset.
+
+import os
+import json
+import glob
+import time
+import fcntl
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from config import Config
+
+AGGREGATE = "aggregate.json"
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "t0")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, self.labels, time.perf_counter() - self.t0)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Histograms (fixed ``buckets``, in seconds) and counters keyed by metric
+    name and a tuple of (label, value) pairs. ``describe`` registers the
+    HELP text and type used when rendering.
+
+    Values recorded before a fork are dropped in the child, so a preloaded
+    master does not get counted once per worker.
+    """
+
+    def __init__(self, directory="", flush_interval=5.0, buckets=LATENCY_BUCKETS):
+        self.directory = directory
+        self.flush_interval = float(flush_interval)
+        self.buckets = tuple(buckets)
+        self._help = {}  # name -> (type, help)
+        self._hist = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._counters = {}  # (name, labels) -> value
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flusher = None
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def _check_pid(self):
+        # caller holds the lock
+        if self._pid != os.getpid():
+            self._hist.clear()
+            self._counters.clear()
+            self._flusher = None
+            self._pid = os.getpid()
+
+    # ---------------- recording ----------------
+    def observe(self, name, labels, seconds):
+        idx = bisect_left(self.buckets, seconds)
+        key = (name, labels)
+        with self._lock:
+            self._check_pid()
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                h[idx] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self._lock:
+            self._check_pid()
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timer(self, name, labels):
+        """Context manager observing the elapsed time of its block."""
+        return _Timer(self, name, labels)
+
+    # ---------------- snapshots ----------------
+    def snapshot(self):
+        with self._lock:
+            self._check_pid()
+            return {
+                "buckets": list(self.buckets),
+                "histograms": [[n, [list(p) for p in l], list(v)] for (n, l), v in self._hist.items()],
+                "counters": [[n, [list(p) for p in l], v] for (n, l), v in self._counters.items()],
+            }
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (no-op without one)."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Metrics flush failed")
+
+    def start_flusher(self):
+        """Start the periodic snapshot writer once per process."""
+        if not self.directory or self.flush_interval <= 0:
+            return
+        with self._lock:
+            self._check_pid()
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="metrics-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def collect(self):
+        """Snapshots to render: every worker's file, or just this process."""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        paths = glob.glob(os.path.join(self.directory, "*.json"))
+        for path in paths:
+            pid = os.path.basename(path)[:-len(".json")]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                fold_snapshot(self.directory, int(pid))
+        out = []
+        # shared: a fold moving a snapshot into the aggregate is not seen halfway
+        with _directory_lock(self.directory, fcntl.LOCK_SH):
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                try:
+                    with open(path) as f:
+                        out.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # a worker is replacing its file
+        return out
+
+    # ---------------- rendering ----------------
+    def render(self):
+        hist, counters = {}, {}
+        for snap in self.collect():
+            _merge(hist, counters, snap, self.buckets)
+
+        lines = []
+        for name in sorted({n for n, _ in hist} | {n for n, _ in counters}):
+            kind, text = self._help.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (n, labels), values in sorted(hist.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, le=repr(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {values[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {values[-2]}")
+                lines.append(f"{name}_count{_labels(labels)} {values[-1]}")
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs, **extra):
+    items = list(pairs) + list(extra.items())
+    if not items:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in items
+    )
+    return "{" + body + "}"
+
+
+def _merge(hist, counters, snap, buckets):
+    """Add a snapshot's histograms and counters into the two dicts."""
+    if tuple(snap["buckets"]) == tuple(buckets):
+        for name, labels, values in snap["histograms"]:
+            key = (name, tuple(tuple(p) for p in labels))
+            acc = hist.setdefault(key, [0] * len(values))
+            for i, v in enumerate(values):
+                acc[i] += v
+    for name, labels, value in snap["counters"]:
+        key = (name, tuple(tuple(p) for p in labels))
+        counters[key] = counters.get(key, 0) + value
+
+
+@contextmanager
+def _directory_lock(directory, mode):
+    fd = os.open(os.path.join(directory, "aggregate.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, mode)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, owned by another user
+    return True
+
+
+def fold_snapshot(directory, pid):
+    """
+    Add the counters and histograms of exited worker ``pid`` into the
+    aggregate file and delete its snapshot. Anything else a snapshot
+    might hold (gauges) describes a live process and is dropped.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    aggregate = os.path.join(directory, AGGREGATE)
+    with _directory_lock(directory, fcntl.LOCK_EX):
+        try:
+            with open(path) as f:
+                snap = json.load(f)
+        except FileNotFoundError:
+            snap = None  # already folded, or the worker never flushed
+        except (OSError, ValueError):
+            logging.exception("Unreadable metrics snapshot %s; dropping it", path)
+            snap = None
+        if snap is not None:
+            try:
+                with open(aggregate) as f:
+                    total = json.load(f)
+            except FileNotFoundError:
+                total = {"buckets": snap["buckets"], "histograms": [], "counters": []}
+            hist, counters = {}, {}
+            _merge(hist, counters, total, total["buckets"])
+            _merge(hist, counters, snap, total["buckets"])
+            total = {
+                "buckets": total["buckets"],
+                "histograms": [[n, [list(p) for p in l], v] for (n, l), v in hist.items()],
+                "counters": [[n, [list(p) for p in l], v] for (n, l), v in counters.items()],
+            }
+            tmp = aggregate + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(total, f)
+            os.replace(tmp, aggregate)
+        for stale in (path, path + ".tmp"):
+            try:
+                os.unlink(stale)
+            except OSError:
+                pass
+
+
+def clear_directory(directory):
+    """Remove snapshots and the aggregate of a previous run (gunicorn master, on start)."""
+    for path in glob.glob(os.path.join(directory, "*.json*")):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# ---------------- process-wide registry ----------------
+metrics = MetricsRegistry(Config.METRICS_DIR, Config.METRICS_FLUSH_INTERVAL_S)
+metrics.describe("pm_http_request_duration_seconds", "histogram",
+                 "Request latency by endpoint, method and status")
+metrics.describe("pm_stage_duration_seconds", "histogram",
+                 "Latency of individual pipeline stages")
+metrics.describe("pm_profiles_captured_total", "counter",
+                 "Requests captured by the sampling profiler")
+metrics.describe("pm_requests_rejected_total", "counter",
+                 "Requests turned away by admission control, by route class and status")
+
+
+def stage(pipeline, name):
+    """Timer for one stage of a pipeline, e.g. stage("predict", "zscore")."""
+    return metrics.timer("pm_stage_duration_seconds", (("pipeline", pipeline), ("stage", name)))
+
+
+def observe_stage(pipeline, name, seconds):
+    metrics.observe("pm_stage_duration_seconds", (("pipeline", pipeline), ("stage", name)), seconds)
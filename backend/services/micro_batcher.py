@@ -0,0 +1,77 @@
+# backend/services/micro_batcher.py
+# Coalesces concurrent single-row model calls into one batched call.
+
+import os
+import threading
+import time
+import queue
+import logging
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Queue single rows from concurrent request threads and hand them to
+    ``batch_fn`` in groups of up to ``max_batch_size``, waiting at most
+    ``window_ms`` after the first queued row for more to arrive.
+
+    ``batch_fn`` takes a list of rows and returns a list of results in the
+    same order. ``submit`` blocks until the row's result is ready.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=64, window_ms=2.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # threads do not survive gunicorn's fork, so start one per process
+        if self._worker is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(
+                target=self._run, name="micro-batcher", daemon=True
+            )
+            self._pid = os.getpid()
+            self._worker.start()
+
+    def submit(self, row):
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((row, fut))
+        return fut.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for row, _ in batch]
+            try:
+                results = self.batch_fn(rows)
+            except Exception as e:
+                logging.exception("Micro-batch of %d rows failed", len(rows))
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
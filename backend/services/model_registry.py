@@ -0,0 +1,170 @@
+# backend/services/model_registry.py
+# Holds the model + stats currently used for scoring and swaps in new
+# versions without blocking requests.
+
+import os
+import time
+import hashlib
+import logging
+import threading
+
+
+class ModelBundle:
+    """
+    A model and the stats it was trained with, plus a version tag and
+    anything precomputed from them (``kernel``), so they swap together.
+    """
+
+    __slots__ = ("model", "stats", "version", "kernel", "loaded_at")
+
+    def __init__(self, model, stats, version, kernel=None):
+        self.model = model
+        self.stats = stats
+        self.version = version
+        self.kernel = kernel
+        self.loaded_at = time.time()
+
+
+def file_version(*paths):
+    """Short content hash over the given files (missing files are skipped)."""
+    h = hashlib.sha256()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """
+    ``current`` is a plain attribute read, so request threads never wait on
+    a reload: they take one bundle at the start of a request and use it to
+    the end. ``reload`` builds and validates the new bundle off to the side,
+    then publishes it with a single reference assignment.
+
+    With ``lazy=True`` nothing is loaded up front: the first read of
+    ``current`` loads the bundle (other readers wait for it), or
+    ``warm_up_async`` loads it in a background thread.
+    """
+
+    def __init__(self, loader, validator, watch_paths=(), lazy=False):
+        self._loader = loader
+        self._validator = validator
+        self._watch_paths = tuple(watch_paths)
+        self._reload_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._watcher = None
+        self._watcher_pid = None
+        self._warmup = None
+        self._fingerprint = self._stat_fingerprint()
+        self.last_error = None
+        self._current = None if lazy else loader()
+
+    @property
+    def current(self):
+        bundle = self._current
+        if bundle is None:
+            bundle = self._load_initial()
+        return bundle
+
+    @property
+    def ready(self):
+        return self._current is not None
+
+    def _load_initial(self):
+        if self._pid != os.getpid():
+            # a fork mid-load leaves the parent's lock held with no owner
+            self._init_lock = threading.Lock()
+            self._warmup = None
+            self._pid = os.getpid()
+        with self._init_lock:
+            if self._current is None:
+                t0 = time.perf_counter()
+                try:
+                    self._current = self._loader()
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.last_error = None
+                logging.info("Model warm in %.2fs", time.perf_counter() - t0)
+            return self._current
+
+    def _warm(self):
+        try:
+            self._load_initial()
+        except Exception:
+            logging.exception("❌ Model warm-up failed")
+
+    def warm_up_async(self):
+        """Load the first bundle in a background thread (once per process)."""
+        if self._current is not None:
+            return
+        if self._warmup is not None and self._pid == os.getpid() and self._warmup.is_alive():
+            return
+        self._warmup = threading.Thread(target=self._warm, name="model-warmup", daemon=True)
+        self._warmup.start()
+
+    def _stat_fingerprint(self):
+        out = []
+        for path in self._watch_paths:
+            try:
+                st = os.stat(path)
+                out.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                out.append(None)
+        return tuple(out)
+
+    def reload(self, force=False):
+        """
+        Load, validate and publish a new bundle.
+        Returns (bundle, changed). On failure the current bundle stays.
+        """
+        with self._reload_lock:
+            fingerprint = self._stat_fingerprint()
+            try:
+                bundle = self._loader()
+                self._validator(bundle)
+            except Exception as e:
+                self.last_error = str(e)
+                logging.exception("❌ Model reload failed, keeping %s",
+                                  self._current.version if self._current else None)
+                raise
+
+            self._fingerprint = fingerprint
+            self.last_error = None
+            if not force and self._current is not None and bundle.version == self._current.version:
+                return self._current, False
+            previous = self._current.version if self._current else None
+            self._current = bundle
+            logging.info("✅ Model swapped: %s -> %s", previous, bundle.version)
+            return bundle, True
+
+    # ---------------- file watcher ----------------
+    def start_watcher(self, interval):
+        """Poll the watched files every ``interval`` seconds (one thread per process)."""
+        if interval <= 0 or not self._watch_paths:
+            return
+        if self._watcher is not None and self._watcher_pid == os.getpid():
+            return
+        with self._reload_lock:
+            if self._watcher is not None and self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="model-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            if self._stat_fingerprint() == self._fingerprint:
+                continue
+            try:
+                self.reload()
+            except Exception:
+                # keep serving the old bundle; retry once the files change again
+                self._fingerprint = self._stat_fingerprint()
@@ -1,7 +1,11 @@
 # backend/services/otp_service.py
+import os
+import time
 import random
 import hashlib
-from datetime import datetime, timedelta
+import logging
+import threading
+from datetime import datetime
 from database import get_db_connection
 from config import Config
 
@@ -17,7 +21,8 @@ def create_otp_request(email):
     """Create and store an OTP entry for the user"""
     otp = generate_otp()
     hashed = hash_otp(otp)
-    expires_at = datetime.utcnow() + timedelta(minutes=Config.OTP_EXPIRATION_MINUTES)
+    # expiry is stored as integer epoch seconds so it can be compared in SQL
+    expires_epoch = int(time.time()) + Config.OTP_EXPIRATION_MINUTES * 60
 
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
@@ -25,10 +30,10 @@ def create_otp_request(email):
             INSERT INTO otp_requests (email, otp, expires_at)
             VALUES (%s, %s, %s)
             """
-            cursor.execute(sql, (email, hashed, expires_at))
+            cursor.execute(sql, (email, hashed, expires_epoch))
             conn.commit()
 
-    return otp, expires_at
+    return otp, datetime.utcfromtimestamp(expires_epoch)
 
 def verify_otp(email, otp):
     """Verify whether the provided OTP is valid and not expired"""
@@ -36,31 +41,18 @@ def verify_otp(email, otp):
 
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
+            # served from idx_otp_email_otp_expires; the expiry check runs in SQL
             sql = """
-            SELECT id, expires_at FROM otp_requests
+            SELECT id, expires_at > %s AS live FROM otp_requests
             WHERE email = %s AND otp = %s
-            ORDER BY id DESC LIMIT 1
+            ORDER BY expires_at DESC LIMIT 1
             """
-            cursor.execute(sql, (email, hashed))
+            cursor.execute(sql, (int(time.time()), email, hashed))
             record = cursor.fetchone()
 
             if not record:
                 return False, "Invalid OTP"
-
-            expires_at = record["expires_at"]
-
-            # if expires_at is stored as text, convert to datetime if needed
-            if isinstance(expires_at, str):
-                try:
-                    # try parsing common SQLite datetime format
-                    expires_at_dt = datetime.fromisoformat(expires_at)
-                except Exception:
-                    # fallback: treat as not expired
-                    expires_at_dt = expires_at
-            else:
-                expires_at_dt = expires_at
-
-            if isinstance(expires_at_dt, datetime) and datetime.utcnow() > expires_at_dt:
+            if not record["live"]:
                 return False, "OTP has expired"
 
     return True, "OTP verified"
@@ -72,3 +64,61 @@ def clear_otps(email):
             sql = "DELETE FROM otp_requests WHERE email = %s"
             cursor.execute(sql, (email,))
             conn.commit()
+
+def sweep_expired_otps(batch_size=None, now=None):
+    """
+    Delete expired OTPs in batches of batch_size rows, each in its own short
+    transaction so logins are not blocked behind one large delete.
+    Returns the number of rows removed.
+    """
+    batch_size = batch_size or Config.OTP_SWEEP_BATCH_SIZE
+    now = int(time.time()) if now is None else now
+    removed = 0
+    # the extra derived table lets MySQL use LIMIT inside the IN subquery
+    sql = """
+    DELETE FROM otp_requests WHERE id IN (
+        SELECT id FROM (
+            SELECT id FROM otp_requests WHERE expires_at <= %s LIMIT %s
+        ) AS expired
+    )
+    """
+    while True:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, (now, batch_size))
+                deleted = cursor.rowcount
+            conn.commit()
+        removed += max(deleted, 0)
+        if deleted < batch_size:
+            return removed
+
+_sweeper = None
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+def _sweep_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            removed = sweep_expired_otps()
+            if removed:
+                logging.info("OTP sweeper removed %d expired rows", removed)
+        except Exception:
+            logging.exception("OTP sweep failed")
+
+def start_otp_sweeper(interval=None):
+    """Start the background sweeper thread once per process (interval <= 0 disables it)."""
+    global _sweeper, _sweeper_pid
+    interval = Config.OTP_SWEEP_INTERVAL_S if interval is None else interval
+    if interval <= 0:
+        return
+    if _sweeper is not None and _sweeper_pid == os.getpid():
+        return
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper_pid == os.getpid():
+            return
+        _sweeper_pid = os.getpid()
+        _sweeper = threading.Thread(
+            target=_sweep_loop, args=(interval,), name="otp-sweeper", daemon=True
+        )
+        _sweeper.start()
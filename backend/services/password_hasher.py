@@ -0,0 +1,127 @@
+# backend/services/password_hasher.py
+# Bounded executor for bcrypt so a burst of logins cannot take over every
+# CPU the prediction endpoints also need.
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+from services.metrics import observe_stage
+
+
+class HasherSaturated(Exception):
+    """Raised when the hashing queue is full or a call timed out; callers should answer 503."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on at most ``workers`` threads with at most ``queue_limit``
+    more calls waiting. Anything beyond that is rejected immediately with
+    HasherSaturated instead of queueing without bound.
+
+    A slot is held until the bcrypt job itself is done, not until the caller
+    stops waiting: a caller that gives up after ``timeout`` seconds cancels
+    the job if it has not started and gets HasherSaturated, but a job that
+    is already running keeps its slot until it finishes.
+    """
+
+    def __init__(self, workers=2, queue_limit=16, rounds=12, timeout=30.0):
+        self.workers = max(1, int(workers))
+        self.queue_limit = max(0, int(queue_limit))
+        self.rounds = int(rounds)
+        self.timeout = float(timeout)
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._latencies = deque(maxlen=1024)  # seconds, most recent calls
+
+    def _get_executor(self):
+        # one pool per process: executor threads do not survive fork
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _timed(self, name, fn, *args):
+        with self._lock:
+            self._running += 1
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - t0
+            observe_stage("auth", name, elapsed)
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._latencies.append(elapsed)
+
+    def _run(self, name, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherSaturated("Password hashing is saturated")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(self._timed, name, fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        # runs when the job completes or is cancelled, whoever is still waiting
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise HasherSaturated("Password hashing timed out")
+
+    def _done(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run("bcrypt_hash", bcrypt.hashpw, password.encode(), salt).decode()
+
+    def check(self, password, hashed_password):
+        return self._run("bcrypt_check", bcrypt.checkpw, password.encode(), hashed_password.encode())
+
+    def metrics(self):
+        with self._lock:
+            lat = sorted(self._latencies)
+            in_flight, running = self._in_flight, self._running
+            completed, rejected, timed_out = self._completed, self._rejected, self._timed_out
+
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p / 100.0 * len(lat)))] * 1000 if lat else 0.0
+
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "rounds": self.rounds,
+            "in_flight": in_flight,
+            "running": running,
+            "queue_depth": max(0, in_flight - running),
+            "completed": completed,
+            "rejected": rejected,
+            "timed_out": timed_out,
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99)},
+        }
@@ -0,0 +1,206 @@
+# backend/services/rate_limiter.py
+# Admission control: per-client token buckets per route class (429 when a
+# client is over its rate) and a per-process concurrency cap per class (503
+# when the class is full), checked before a request does any real work.
+#
+# Bucket state lives in a backend with a single take() call, so it can be
+# kept in this process (LocalBuckets) or shared by every gunicorn worker on
+# the host (SqliteBuckets, a stand-in for a Redis-style store).
+
+import os
+import time
+import logging
+import sqlite3
+import threading
+
+TABLE = "rate_buckets"
+
+
+class LocalBuckets:
+    """
+    Token buckets in a dict, most recently used last. A bucket that has
+    refilled to its burst carries no information and is dropped; past
+    ``max_keys`` the least recently used ones go too, so memory stays
+    bounded whatever number of clients shows up.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max(1, int(max_keys))
+        self._buckets = {}  # key -> (tokens, updated_at, full_at)
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def take(self, key, rate, burst, cost=1.0, now=None):
+        """(allowed, seconds until ``cost`` tokens are available)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            b = self._buckets.pop(key, None)
+            if b is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._evict(now)
+                tokens = burst
+            else:
+                tokens = min(burst, b[0] + (now - b[1]) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def _evict(self, now):
+        # caller holds the lock
+        full = [k for k, b in self._buckets.items() if b[2] <= now]
+        for k in full:
+            del self._buckets[k]
+        excess = len(self._buckets) - self.max_keys + max(1, self.max_keys // 10)
+        if excess > 0:
+            for k in list(self._buckets)[:excess]:
+                del self._buckets[k]
+        self.evicted += len(full) + max(0, excess)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SqliteBuckets:
+    """
+    The same buckets in a SQLite table shared by every process that opens
+    ``path``: one UPSERT per take(), so the workers on a host enforce one
+    limit between them. Rows of idle clients are deleted every
+    ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, path, idle_ttl=3600.0, sweep_interval=60.0, busy_timeout_ms=1000):
+        self.path = path
+        self.idle_ttl = float(idle_ttl)
+        self.sweep_interval = float(sweep_interval)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        # refill, then spend ``cost`` only if enough is there; ok says which
+        self._take_sql = (
+            f"INSERT INTO {TABLE} (key, tokens, ts, ok) VALUES (:key, :burst - :cost, :now, 1) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "ok = min(:burst, tokens + (:now - ts) * :rate) >= :cost, "
+            "tokens = min(:burst, tokens + (:now - ts) * :rate) "
+            "- (CASE WHEN min(:burst, tokens + (:now - ts) * :rate) >= :cost THEN :cost ELSE 0 END), "
+            "ts = :now "
+            "RETURNING ok, tokens"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            # bucket levels are cheap to lose on a crash
+            conn.execute("PRAGMA synchronous = OFF;")
+            conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms};")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL, ok INTEGER)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst, cost=1.0, now=None):
+        now = time.time() if now is None else now
+        conn = self._conn()
+        ok, tokens = conn.execute(
+            self._take_sql,
+            {"key": key, "rate": rate, "burst": burst, "cost": cost, "now": now},
+        ).fetchone()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            conn.execute(f"DELETE FROM {TABLE} WHERE ts < ?", (now - self.idle_ttl,))
+        return bool(ok), 0.0 if ok else (cost - tokens) / rate
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+
+def make_backend(name, max_keys=100000, db_file=""):
+    """RATE_LIMIT_BACKEND: "local" (per process) or "sqlite" (per host)."""
+    if name == "sqlite":
+        return SqliteBuckets(db_file)
+    if name != "local":
+        logging.warning("Unknown RATE_LIMIT_BACKEND %r, using local buckets", name)
+    return LocalBuckets(max_keys)
+
+
+class RouteLimit:
+    """Per-client ``rate`` (requests/s) and ``burst``, and the class's ``concurrency``."""
+
+    def __init__(self, name, rate, burst, concurrency):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.concurrency = int(concurrency)
+        self.slots = threading.BoundedSemaphore(self.concurrency) if self.concurrency > 0 else None
+
+
+class Rejected:
+    """Why admit() turned a request away: HTTP ``status``, ``error`` text and ``retry_after`` seconds."""
+
+    __slots__ = ("status", "error", "retry_after")
+
+    def __init__(self, status, error, retry_after):
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+    def headers(self):
+        return {"Retry-After": str(max(1, int(self.retry_after + 0.999)))}
+
+
+class AdmissionController:
+    """
+    ``admit(route_class, client)`` takes a concurrency slot for that class
+    (concurrency <= 0 disables it) and then a token from the client's
+    bucket (rate <= 0 disables the check), giving the slot back if the
+    client is over its rate. On success the caller must
+    ``release(route_class)`` when the request is done; otherwise it gets a
+    Rejected. Concurrency slots are per process: each worker protects its
+    own threads.
+    """
+
+    def __init__(self, backend, limits):
+        self.backend = backend
+        self.limits = {limit.name: limit for limit in limits}
+        self._lock = threading.Lock()
+        self.stats = {"admitted": 0, "rate_limited": 0, "saturated": 0, "backend_errors": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def admit(self, route_class, client):
+        limit = self.limits.get(route_class)
+        if limit is None:
+            return None
+        # the slot first: a request turned away with 503 costs the client no token
+        if limit.slots is not None and not limit.slots.acquire(blocking=False):
+            self._count("saturated")
+            return Rejected(503, "Server busy, please retry shortly", 1.0)
+        if limit.rate > 0:
+            try:
+                allowed, retry_after = self.backend.take(f"{route_class}|{client}", limit.rate, limit.burst)
+            except sqlite3.Error:
+                # a shared store that is down should not take the API with it
+                logging.exception("Rate limit backend failed; admitting request")
+                self._count("backend_errors")
+                allowed, retry_after = True, 0.0
+            if not allowed:
+                if limit.slots is not None:
+                    limit.slots.release()
+                self._count("rate_limited")
+                return Rejected(429, "Too many requests", retry_after)
+        self._count("admitted")
+        return None
+
+    def release(self, route_class):
+        limit = self.limits.get(route_class)
+        if limit is not None and limit.slots is not None:
+            limit.slots.release()
@@ -0,0 +1,34 @@
+# backend/services/request_profiler.py
+# Runs a random sample of requests under cProfile and dumps the stats to
+# PROFILE_DIR, one .prof file per request (open with pstats or snakeviz).
+
+import os
+import time
+import random
+import cProfile
+
+
+class SamplingProfiler:
+    """Profiles ``percent`` % of requests; keeps at most ``max_files`` dumps."""
+
+    def __init__(self, percent=0.0, directory="profiles", max_files=500):
+        self.rate = max(0.0, min(100.0, float(percent))) / 100.0
+        self.directory = directory
+        self.max_files = int(max_files)
+        self.captured = 0
+
+    def maybe_start(self):
+        if self.rate <= 0 or random.random() >= self.rate or self.captured >= self.max_files:
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler, label):
+        profiler.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        safe = label.strip("/").replace("/", "_") or "root"
+        path = os.path.join(self.directory, f"{safe}-{os.getpid()}-{time.time_ns()}.prof")
+        profiler.dump_stats(path)
+        self.captured += 1
+        return path
@@ -0,0 +1,77 @@
+# backend/services/result_cache.py
+# LRU + TTL cache of /predict results keyed on quantized sensor readings.
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Maps (readings rounded to ``precision`` decimals, model version) to a
+    scored result. Holds at most ``max_size`` entries, least recently used
+    evicted first, and an entry older than ``ttl`` seconds counts as a miss.
+
+    Readings that round to the same key share the result of the first one
+    scored, so ``precision`` should sit below the sensors' noise floor.
+    The model version is part of the key, so after a reload the previous
+    version's entries are never hit and age out of the LRU (and the TTL);
+    nothing is cleared while requests on both versions are in flight.
+    """
+
+    def __init__(self, max_size=50000, ttl=300.0, precision=2):
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl)
+        self.precision = int(precision)
+        self._entries = OrderedDict()  # key -> (result, stored_at)
+        self._version = None  # most recently stored, for metrics()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def key(self, values, version):
+        return tuple(round(v, self.precision) for v in values) + (version,)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._version = key[-1]
+            self._entries[key] = (result, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "precision": self.precision,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
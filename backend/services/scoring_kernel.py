@@ -0,0 +1,131 @@
+# backend/services/scoring_kernel.py
+# Clip / z-score / logistic / RF blend as a handful of numpy operations over
+# arrays precomputed from stats_table.json, for one row or many.
+
+import math
+import threading
+
+import numpy as np
+
+
+class ScoringKernel:
+    """
+    Built once per stats table. ``mean``, ``inv_std``, ``lo`` and ``hi`` are
+    contiguous float64 arrays in ``features`` order (a zero std is treated
+    as 1, as the per-row scoring always did).
+
+    ``prepare`` clips and z-scores an (n, F) block into per-thread scratch
+    buffers that are reused across calls, so its results are only valid
+    until the same thread calls it again. The buffers are feature-major
+    (F, n) so every ufunc runs over long contiguous rows; the views handed
+    back are (n, F). ``blend`` returns fresh arrays.
+
+    For a single reading, numpy's per-call overhead outweighs the arithmetic,
+    so ``prepare_row`` / ``blend_row`` do the same steps on Python floats
+    over the same precomputed constants.
+    """
+
+    def __init__(self, stats, features, z_threshold, alpha, z0, rf_weight=0.45):
+        self.features = list(features)
+        self.mean = np.ascontiguousarray([stats[f]["mean"] for f in features], dtype=np.float64)
+        std = np.array([stats[f]["std"] for f in features], dtype=np.float64)
+        self.inv_std = np.ascontiguousarray(1.0 / np.where(std != 0, std, 1.0))
+        self.lo = np.ascontiguousarray([stats[f]["min"] for f in features], dtype=np.float64)
+        self.hi = np.ascontiguousarray([stats[f]["max"] for f in features], dtype=np.float64)
+        self.z_threshold = float(z_threshold)
+        self.alpha = float(alpha)
+        self.z0 = float(z0)
+        self.rf_weight = float(rf_weight)
+        # (F, 1) column views for broadcasting over feature-major buffers
+        self._cols = tuple(a[:, np.newaxis] for a in (self.mean, self.inv_std, self.lo, self.hi))
+        self._row_consts = tuple(zip(
+            self.lo.tolist(), self.hi.tolist(), self.mean.tolist(), self.inv_std.tolist()
+        ))
+        self._local = threading.local()
+
+    def _buffers(self, n):
+        buf = getattr(self._local, "buf", None)
+        if buf is None or buf[-1].shape[0] < n:
+            cap = 1
+            while cap < n:
+                cap *= 2
+            F = len(self.features)
+            buf = (
+                np.empty((F, cap)),               # processed
+                np.empty((F, cap)),               # |z|
+                np.empty((F, cap), dtype=bool),   # out of range
+                np.empty((F, cap), dtype=bool),   # scratch mask
+                np.empty(cap),                    # max |z|
+            )
+            self._local.buf = buf
+        return [b[..., :n] for b in buf]
+
+    def prepare(self, raw):
+        """
+        raw: (n, F) or (F,) readings. Returns (processed, out_of_range,
+        max_abs_z) views into this thread's scratch buffers.
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:
+            raw = raw[np.newaxis, :]
+        processed, z, out_of_range, mask, max_abs_z = self._buffers(raw.shape[0])
+        mean, inv_std, lo, hi = self._cols
+
+        np.copyto(processed, raw.T)
+        np.less(processed, lo, out=out_of_range)
+        np.greater(processed, hi, out=mask)
+        np.logical_or(out_of_range, mask, out=out_of_range)
+
+        # max(lo, min(x, hi)) as in /predict: fmax also maps NaN to lo
+        np.minimum(processed, hi, out=processed)
+        np.fmax(processed, lo, out=processed)
+
+        np.subtract(processed, mean, out=z)
+        np.multiply(z, inv_std, out=z)
+        np.abs(z, out=z)
+        np.copyto(max_abs_z, z[0])
+        for row in z[1:]:
+            np.maximum(max_abs_z, row, out=max_abs_z)
+        return processed.T, out_of_range.T, max_abs_z
+
+    def zscores(self, raw):
+        """Signed z-scores of the clipped (n, F) readings, as a fresh array."""
+        z = np.minimum(np.asarray(raw, dtype=np.float64), self.hi)
+        np.fmax(z, self.lo, out=z)
+        z -= self.mean
+        z *= self.inv_std
+        return z
+
+    def blend(self, max_abs_z, rf_prob=None):
+        """(abnormal, prob) from max |z| and the RF failure probability (or None)."""
+        abnormal = max_abs_z > self.z_threshold
+        prob = np.subtract(max_abs_z, self.z0)
+        prob *= -self.alpha
+        np.exp(prob, out=prob)
+        prob += 1.0
+        np.reciprocal(prob, out=prob)
+        if rf_prob is not None:
+            prob *= 1.0 - self.rf_weight
+            prob += self.rf_weight * np.asarray(rf_prob, dtype=np.float64)
+        np.clip(prob, 0.0, 1.0, out=prob)
+        return abnormal, prob
+
+    def prepare_row(self, values):
+        """Single-row prepare on floats -> (processed, out_of_range flags, max_abs_z)."""
+        processed, out_of_range = [], []
+        max_abs_z = 0.0
+        for x, (lo, hi, mean, inv_std) in zip(values, self._row_consts):
+            out_of_range.append(x < lo or x > hi)
+            x = max(lo, min(x, hi))
+            processed.append(x)
+            z = abs((x - mean) * inv_std)
+            if z > max_abs_z:
+                max_abs_z = z
+        return processed, out_of_range, max_abs_z
+
+    def blend_row(self, max_abs_z, rf_prob=None):
+        """Single-row blend -> (abnormal, prob)."""
+        prob = 1.0 / (1.0 + math.exp(-self.alpha * (max_abs_z - self.z0)))
+        if rf_prob is not None:
+            prob = prob * (1.0 - self.rf_weight) + self.rf_weight * float(rf_prob)
+        return max_abs_z > self.z_threshold, min(1.0, max(0.0, prob))
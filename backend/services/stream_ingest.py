@@ -0,0 +1,112 @@
+# backend/services/stream_ingest.py
+# Incremental readers for streamed telemetry uploads (NDJSON or CSV).
+# Records are parsed one line at a time and grouped into bounded chunks,
+# so memory use does not grow with the length of the upload.
+
+import csv
+import json
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+def iter_lines(stream, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Yield (line_no, text) for each line of a binary stream.
+    Over-long lines are yielded as (line_no, None) and skipped.
+    """
+    line_no = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_no += 1
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            # drain the rest of the over-long line
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line_bytes + 1)
+            yield line_no, None
+            continue
+        yield line_no, line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+def iter_ndjson_records(lines):
+    """Yield (line_no, record, error) from NDJSON lines; blank lines are skipped."""
+    for line_no, text in lines:
+        if text is None:
+            yield line_no, None, "Line too long"
+            continue
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            yield line_no, None, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def iter_csv_records(lines):
+    """Yield (line_no, record, error) from CSV lines; the first line is the header."""
+    header = None
+    for line_no, text in lines:
+        if text is None:
+            yield line_no, None, "Line too long"
+            continue
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, f"Expected {len(header)} columns"
+            continue
+        yield line_no, dict(zip(header, values)), None
+
+
+def iter_chunks(records, chunk_size):
+    """Group an iterable into lists of at most chunk_size items."""
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def aiter_lines(chunks, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Async form of iter_lines over an async iterable of byte chunks (e.g. an
+    ASGI request body). Yields the same (line_no, text) pairs.
+    """
+    line_no = 0
+    buf = b""
+    too_long = False
+    async for chunk in chunks:
+        buf += chunk
+        while True:
+            end = buf.find(b"\n")
+            if end < 0:
+                if len(buf) > max_line_bytes:
+                    # keep discarding until the line ends
+                    too_long = True
+                    buf = b""
+                break
+            line, buf = buf[:end], buf[end + 1:]
+            line_no += 1
+            if too_long or len(line) > max_line_bytes:
+                too_long = False
+                yield line_no, None
+                continue
+            yield line_no, line.decode("utf-8", errors="replace").rstrip("\r")
+    if buf or too_long:
+        line_no += 1
+        if too_long or len(buf) > max_line_bytes:
+            yield line_no, None
+        else:
+            yield line_no, buf.decode("utf-8", errors="replace").rstrip("\r")
@@ -1,16 +1,22 @@
-import bcrypt
-import pymysql
 from datetime import datetime
 from config import Config
-from database import get_db_connection
+from database import get_db_connection, IntegrityError
+from services.password_hasher import PasswordHasher
+
+password_hasher = PasswordHasher(
+    workers=Config.HASH_WORKERS,
+    queue_limit=Config.HASH_QUEUE_LIMIT,
+    rounds=Config.BCRYPT_ROUNDS,
+    timeout=Config.HASH_TIMEOUT_S
+)
 
 def hash_password(password):
-    """Hash the password using bcrypt"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    """Hash the password using bcrypt (raises HasherSaturated when overloaded)"""
+    return password_hasher.hash(password)
 
 def check_password(password, hashed_password):
-    """Verify password"""
-    return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    """Verify password (raises HasherSaturated when overloaded)"""
+    return password_hasher.check(password, hashed_password)
 
 def create_user(name, email, password):
     """Create a new user"""
@@ -26,7 +32,7 @@ def create_user(name, email, password):
             try:
                 cursor.execute(sql, (name, email, hashed, created_at))
                 conn.commit()
-            except pymysql.err.IntegrityError:
+            except IntegrityError:
                 raise ValueError("Email already exists")
 
     return {
@@ -43,11 +49,13 @@ def authenticate_user(email, password):
             cursor.execute(sql, (email,))
             user = cursor.fetchone()
 
-            if not user:
-                return None
+    # bcrypt runs after the connection is back in the pool, so a login storm
+    # waits on the hasher queue without holding DB connections
+    if not user:
+        return None
 
-            if not check_password(password, user["password_hash"]):
-                return None
+    if not check_password(password, user["password_hash"]):
+        return None
 
     return {
         "id": user["id"],
@@ -1,6 +1,14 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
 import jwt
+from flask import request, jsonify, g
 from datetime import datetime, timedelta
 from config import Config
+from services.metrics import stage
 
 def generate_token(user):
     """
@@ -16,3 +24,95 @@ def generate_token(user):
 
     token = jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm="HS256")
     return token
+
+def decode_token(token):
+    """Verify signature and expiry; raises jwt.InvalidTokenError on failure."""
+    return jwt.decode(
+        token, Config.JWT_SECRET_KEY, algorithms=["HS256"],
+        options={"require": ["exp"]}
+    )
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed decode_token, keyed by the
+    SHA-256 of the token so raw bearer tokens are not kept in memory.
+    Entries are dropped once their ``exp`` claim is reached.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()  # digest -> (claims, exp)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, now=None):
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, token, claims):
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._entries[key] = (claims, claims["exp"])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+token_cache = VerifiedTokenCache(Config.JWT_CACHE_SIZE)
+
+def verify_token(token, cache=None):
+    """Claims for a valid token, served from ``cache`` when it was verified before."""
+    if cache is not None:
+        claims = cache.get(token)
+        if claims is not None:
+            return claims
+    claims = decode_token(token)
+    if cache is not None:
+        cache.put(token, claims)
+    return claims
+
+def check_authorization(header):
+    """(claims, None) for a valid 'Bearer <jwt>' header value, else (None, error)."""
+    scheme, _, token = (header or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, "Missing bearer token"
+    try:
+        with stage("auth", "jwt_verify"):
+            return verify_token(token.strip(), token_cache), None
+    except jwt.ExpiredSignatureError:
+        return None, "Token expired"
+    except jwt.InvalidTokenError:
+        return None, "Invalid token"
+
+def token_required(view):
+    """Reject requests without a valid 'Authorization: Bearer <jwt>' header (401)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.API_AUTH_REQUIRED:
+            return view(*args, **kwargs)
+
+        # admission control may already have verified this request's token
+        if g.get("jwt_claims") is None:
+            claims, error = check_authorization(request.headers.get("Authorization"))
+            if error is not None:
+                return jsonify({"error": error}), 401
+            g.jwt_claims = claims
+        return view(*args, **kwargs)
+    return wrapper
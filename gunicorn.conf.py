@@ -0,0 +1,43 @@
+# gunicorn.conf.py — picked up automatically by `gunicorn backend.app:app`
+import os
+import sys
+
+# Load the app (model + stats) once in the master before forking, so workers
+# start warm and share the loaded pages copy-on-write. With
+# INFERENCE_ENGINE=mmap the model arrays are file mappings shared through the
+# page cache, so they stay shared for the life of the workers.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Workers only share the model pages if the master loaded it before forking,
+# so a preloaded master loads it at import instead of in a warm-up thread.
+if preload_app:
+    os.environ.setdefault("MODEL_WARMUP", "eager")
+
+
+def _metrics_module():
+    backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    from services import metrics
+    return metrics
+
+
+def on_starting(server):
+    # per-worker /metrics snapshots from a previous run would be merged in
+    metrics_dir = os.getenv("METRICS_DIR", "")
+    if metrics_dir:
+        _metrics_module().clear_directory(metrics_dir)
+
+
+def worker_exit(server, worker):
+    # last snapshot from the exiting worker, so child_exit folds its final counts
+    if os.getenv("METRICS_DIR", ""):
+        _metrics_module().metrics.flush()
+
+
+def child_exit(server, worker):
+    # runs in the master once the worker is gone, so nothing rewrites the file:
+    # its counters move into the aggregate and its replacement starts from zero
+    metrics_dir = os.getenv("METRICS_DIR", "")
+    if metrics_dir:
+        _metrics_module().fold_snapshot(metrics_dir, worker.pid)